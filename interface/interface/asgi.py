@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
+from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'interface.settings')
 
 application = get_asgi_application()
+
+# ASGI servers such as uvicorn do not serve static files, so they are served by django while DEBUG is on, as
+# manage.py runserver does
+if settings.DEBUG:
+    application = ASGIStaticFilesHandler(application)
@@ -0,0 +1,105 @@
+import os
+import threading
+
+import yaml
+
+
+class ConfigIndex:
+    """
+    In process index of the yaml config files within a folder, keyed by config file name without its extension. The
+    files in the folder are found again only when the modified time of one of its directories changes, as happens when
+    a config is added, removed or renamed. Each config is parsed again only when its own modified time changes, so a
+    request never parses more than the configs which have changed since the last request.
+    """
+
+    def __init__(self, folder: str, summarise: callable):
+        """
+        :param folder: folder containing the yaml config files, searched recursively
+        :param summarise: function taking the parsed content of a config file and returning the details kept in the
+        index for it
+        """
+        self.folder = folder
+        self.summarise = summarise
+        self.lock = threading.Lock()
+
+        # Modified time of each directory within the folder, path of each config and the details of each config read
+        self.directories = None
+        self.paths = {}
+        self.entries = {}
+
+    def is_stale(self) -> bool:
+        # Adding, removing or renaming a config or directory changes the modified time of the directory containing it
+        if self.directories is None:
+            return True
+
+        try:
+            return any(os.stat(path).st_mtime_ns != modified for path, modified in self.directories.items())
+        except FileNotFoundError:
+            return True
+
+    def refresh(self) -> None:
+        if not self.is_stale():
+            return
+
+        self.directories, self.paths = {}, {}
+        for path, _, files in os.walk(self.folder):
+            self.directories[path] = os.stat(path).st_mtime_ns
+            self.paths.update({file[:-4]: os.path.join(path, file) for file in files if file.endswith(".yml")})
+
+        self.entries = {name: entry for name, entry in self.entries.items() if name in self.paths}
+
+    def read_entry(self, name: str) -> dict:
+        # Configs edited in place do not change the modified time of their directory, so each config is checked
+        path = self.paths[name]
+        modified = os.stat(path).st_mtime_ns
+        entry = self.entries.get(name)
+
+        if entry is None or entry['path'] != path or entry['modified'] != modified:
+            with open(path, "r") as file:
+                details = self.summarise(yaml.safe_load(file))
+
+            entry = self.entries[name] = {'name': name, 'path': path, 'config_file': os.path.split(path)[-1],
+                                          'modified': modified, **details}
+
+        return entry
+
+    def all(self) -> list:
+        with self.lock:
+            self.refresh()
+
+            return [self.read_entry(name) for name in sorted(self.paths)]
+
+    def get(self, name: str) -> dict:
+        """
+        Looks up a single config by name, only that config is parsed again if it has changed
+        :param name: config file name without its extension
+        :return: dictionary containing the path and details of the config, or None when there is no such config
+        """
+        with self.lock:
+            self.refresh()
+
+            return self.read_entry(name) if name in self.paths else None
+
+
+class RenderedFile:
+    """
+    Keeps the rendered content of a file, which is rendered again only when the file's modified time changes.
+    """
+
+    def __init__(self, path: str, render: callable):
+        self.path = path
+        self.render = render
+        self.lock = threading.Lock()
+        self.modified = None
+        self.content = None
+
+    def get(self) -> str:
+        with self.lock:
+            modified = os.stat(self.path).st_mtime_ns
+
+            if modified != self.modified:
+                with open(self.path, 'r') as file:
+                    self.content = self.render(file.read())
+                self.modified = modified
+
+        return self.content
@@ -31,6 +31,7 @@ ALLOWED_HOSTS = []
 # Application definition
 
 INSTALLED_APPS = [
+    'jobs.apps.JobsConfig',
     'run_chain.apps.RunChainConfig',
     'run_model.apps.RunModelConfig',
     'django.contrib.admin',
@@ -79,9 +80,19 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'timeout': 20,
+        },
     }
 }
 
+# Job queue
+# Model and model chain runs are queued and run by this many worker processes, with at most JOB_MAX_QUEUED runs waiting
+
+JOB_WORKERS = 2
+
+JOB_MAX_QUEUED = 20
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
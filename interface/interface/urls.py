@@ -23,6 +23,7 @@ urlpatterns = [
     path('', views.home, name='home'),
     path('run_chain/', include("run_chain.urls")),
     path('run_model/', include("run_model.urls")),
+    path('jobs/', include("jobs.urls")),
     path('admin/', admin.site.urls),
     path("repo_info/", views.repo, name="repo")
 ]
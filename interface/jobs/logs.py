@@ -0,0 +1,154 @@
+import asyncio
+import datetime
+import json
+import os
+
+from django.utils import formats, timezone
+
+from .models import Job
+from .queue import get_log_paths
+
+# Most bytes of a log file read at once, both for each page of a log and each event of a log stream
+LOG_PAGE_BYTES = 64 * 1024
+
+# Seconds between checks of the log files for new lines, and between keep alive comments on an idle stream
+POLL_SECONDS = 0.5
+KEEP_ALIVE_SECONDS = 15
+
+
+def decode_lines(data: bytes) -> list:
+    return data.decode('utf-8', errors='replace').splitlines()
+
+
+def read_forward(path: str, offset: int, final: bool = False) -> tuple:
+    """
+    Reads the complete lines of a log file from a byte offset, at most LOG_PAGE_BYTES at a time. A line still being
+    written is left for the next read unless the log is final
+    :param path: path of the log file
+    :param offset: byte offset to read from, a log file shorter than the offset has been restarted and is read again
+    :param final: the log file will not be written to again, so a last line without a line ending is read
+    :return: tuple containing the list of lines read and the byte offset to read from next
+    """
+    if not os.path.isfile(path):
+        return [], 0
+
+    with open(path, 'rb') as file:
+        if offset > os.fstat(file.fileno()).st_size:
+            offset = 0
+
+        file.seek(offset)
+        data = file.read(LOG_PAGE_BYTES)
+
+    end = data.rfind(b"\n") + 1
+
+    # The end of a final log is read in full, and lines longer than a page are read a page at a time
+    if (final and len(data) < LOG_PAGE_BYTES) or (end == 0 and len(data) == LOG_PAGE_BYTES):
+        end = len(data)
+
+    return decode_lines(data[:end]), offset + end
+
+
+def read_backward(path: str, end: int = None) -> tuple:
+    """
+    Reads the complete lines of a log file before a byte offset, at most LOG_PAGE_BYTES at a time, so a long log can be
+    paged through from its latest lines to its first
+    :param path: path of the log file
+    :param end: byte offset to read up to, the end of the last complete line of the log file when not given
+    :return: tuple containing the list of lines read, the byte offset of the first line and the byte offset read up to
+    """
+    if not os.path.isfile(path):
+        return [], 0, 0
+
+    with open(path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        end = size if end is None else min(end, size)
+        start = max(0, end - LOG_PAGE_BYTES)
+
+        file.seek(start)
+        data = file.read(end - start)
+
+    # The latest line may still be being written, so the page ends at the last complete line
+    if end == size and b"\n" in data:
+        end = start + data.rfind(b"\n") + 1
+        data = data[:end - start]
+
+    # The page starts at the first complete line unless it starts at the beginning of the log
+    if start > 0 and b"\n" in data[:-1]:
+        skip = data.find(b"\n") + 1
+        start, data = start + skip, data[skip:]
+
+    return decode_lines(data), start, end
+
+
+def read_tails(job: Job) -> dict:
+    # The latest page of each model's log is shown first, earlier pages are loaded on request. Each job has its own
+    # log files, so a log file which exists was written by this job
+    tails = {}
+    for name, path in get_log_paths(job).items():
+        lines, start, end = read_backward(path)
+        tails[name] = {'lines': lines, 'start': start, 'end': end}
+
+    return tails
+
+
+def format_event(event: str, data: dict, event_id: str = None) -> str:
+    # Server sent events are separated by a blank line, the event id is sent back by the browser when it reconnects
+    message = f"event: {event}\n" + ("" if event_id is None else f"id: {event_id}\n")
+
+    return message + f"data: {json.dumps(data)}\n\n"
+
+
+def format_time(time: datetime.datetime) -> str:
+    # Times are formatted as the job pages format them
+    return "" if time is None else formats.date_format(timezone.localtime(time), "DATETIME_FORMAT")
+
+
+def get_status(job: Job) -> dict:
+    return {'status': job.status, 'label': job.get_status_display(), 'finished': job.is_finished,
+            'started_at': format_time(job.started_at), 'finished_at': format_time(job.finished_at),
+            'duration': "" if job.duration is None else str(job.duration), 'error': job.error}
+
+
+async def stream_logs(job_id: int, offsets: dict):
+    """
+    Follows the log files of every model run by a job, sending each batch of new lines as a server sent event along
+    with any change to the job's status, until the job has finished and every log has been read
+    :param job_id: primary key of the job
+    :param offsets: dictionary containing the byte offset of each model's log to follow from, models not included are
+    followed from the start of their log
+    :return: asynchronous iterator of server sent events
+    """
+    job = await Job.objects.aget(pk=job_id)
+    paths = get_log_paths(job)
+    offsets = {name: int(offsets.get(name, 0)) for name in paths}
+    status, idle = None, 0.0
+
+    while True:
+        job = await Job.objects.aget(pk=job_id)
+
+        # Logs are read once more after the job finishes, so lines written as it finished are not missed
+        sent = False
+        for name, path in paths.items():
+            lines, offsets[name] = await asyncio.to_thread(read_forward, path, offsets[name], job.is_finished)
+
+            if lines:
+                yield format_event("log", {'model': name, 'lines': lines}, event_id=json.dumps(offsets))
+                sent = True
+
+        # Statuses are sent as they change, rather than each time the duration of a running job goes up
+        if status is None or job.status != status['status']:
+            status = get_status(job)
+            yield format_event("status", status)
+
+        if job.is_finished and not sent:
+            yield format_event("end", get_status(job))
+            return
+
+        # Idle streams send a comment now and then, so proxies do not close the connection
+        if not sent:
+            idle += POLL_SECONDS
+            if idle >= KEEP_ALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep alive\n\n"
+
+            await asyncio.sleep(POLL_SECONDS)
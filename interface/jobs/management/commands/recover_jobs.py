@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from jobs.queue import fail_interrupted_jobs
+
+
+class Command(BaseCommand):
+    help = "Marks the jobs left running when the web server stopped as failed, run once before starting the server."
+
+    def handle(self, *args, **options):
+        failed = fail_interrupted_jobs()
+
+        self.stdout.write(f"{failed} interrupted jobs marked as failed.")
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.6 on 2026-10-18 15:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='log_paths',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,48 @@
+import datetime
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUSES = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed")]
+
+    MODEL = "model"
+    CHAIN = "chain"
+    KINDS = [(MODEL, "Model"), (CHAIN, "Model Chain")]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    name = models.CharField(max_length=200)
+    config_path = models.CharField(max_length=500)
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED, db_index=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    # Path of the log file each model run by the job writes to, saved when the job is submitted
+    log_paths = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"Job {self.pk}: {self.get_kind_display()} {self.name} ({self.status})"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in [self.SUCCEEDED, self.FAILED]
+
+    @property
+    def duration(self) -> datetime.timedelta:
+        # Running jobs show the time they have been running so far, to the nearest second
+        if self.started_at is None:
+            return None
+
+        duration = (self.finished_at or timezone.now()) - self.started_at
+
+        return datetime.timedelta(seconds=round(duration.total_seconds()))
@@ -0,0 +1,150 @@
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Job
+from .worker import execute_job, setup_worker
+
+logger = logging.getLogger(__name__)
+
+# Functions run by the worker processes for each kind of job, and the functions finding the logs of each kind of job
+RUNNERS = {Job.MODEL: "run_model.views.run_model", Job.CHAIN: "run_chain.views.run_chain"}
+LOG_PATHS = {Job.MODEL: "run_model.views.get_log_paths", Job.CHAIN: "run_chain.views.get_log_paths"}
+
+
+class QueueFull(Exception):
+    pass
+
+
+def find_log_paths(job: Job) -> dict:
+    """
+    Names the log file of each model run by a job after the job, so no two jobs write to the same log file
+    :param job: saved job whose log files are named
+    :return: dictionary containing the path of each model's log file
+    """
+    return import_string(LOG_PATHS[job.kind])(job.config_path, job.pk)
+
+
+def get_log_paths(job: Job) -> dict:
+    """
+    Gets the log file of each model run by a job, as saved when the job was submitted
+    :param job: job whose logs are found
+    :return: dictionary containing the path of each model's log file, which may not exist until the model starts
+    """
+    return job.log_paths
+
+
+class JobQueue:
+    """
+    Runs model and model chain jobs in a fixed size pool of worker processes, so runs never block the web server and
+    no more than JOB_WORKERS runs happen at once however many users launch them. Jobs are saved to the database when
+    submitted, so their state can be shown on every page and survives the web server being restarted.
+    """
+
+    def __init__(self, max_workers: int, max_queued: int):
+        self.max_workers = max_workers
+        self.max_queued = max_queued
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        # Each job runs in a new process, so the logging set up by one model run does not carry over to the next
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=setup_worker,
+                                                mp_context=multiprocessing.get_context('spawn'),
+                                                max_tasks_per_child=1)
+        return self.executor
+
+    def dispatch(self, job: Job) -> None:
+        with self.lock:
+            try:
+                future = self.get_executor().submit(execute_job, job.pk)
+
+            # A worker process which died leaves the pool unusable, so a new pool is started
+            except BrokenProcessPool:
+                logger.warning("Job worker pool is broken and has been restarted.")
+                self.executor = None
+                future = self.get_executor().submit(execute_job, job.pk)
+
+        future.add_done_callback(lambda done: self.finish(job.pk, done))
+
+    @staticmethod
+    def finish(job_id: int, future: Future) -> None:
+        # Jobs whose worker process died never record that they finished, so they are marked as failed here
+        error = future.exception()
+
+        if error is not None:
+            Job.objects.filter(pk=job_id, status__in=[Job.QUEUED, Job.RUNNING]).update(
+                status=Job.FAILED, error=f"{type(error).__name__}: {error}", finished_at=timezone.now())
+            connection.close()
+
+    def submit(self, kind: str, name: str, config_path: str) -> Job:
+        """
+        Saves a job to the database and queues it to run once a worker process is free
+        :param kind: kind of job, either Job.MODEL or Job.CHAIN
+        :param name: name of the model or model chain config
+        :param config_path: path of the model metadata or model chain config yaml
+        :return: the queued job
+        """
+        # The queued jobs are counted and the job is saved in one transaction, so concurrent submissions can not both
+        # pass the limit, and the job is only dispatched once it is saved
+        with self.lock, transaction.atomic():
+            if Job.objects.filter(status=Job.QUEUED).count() >= self.max_queued:
+                raise QueueFull(f"There are already {self.max_queued} jobs waiting to run, try again once some "
+                                f"finish.")
+
+            job = Job.objects.create(kind=kind, name=name, config_path=config_path)
+
+            # The log files are named after the job, so their paths are saved once the job has its primary key. The
+            # job's pages and the run itself use the saved paths, whatever day the job is run or viewed on
+            try:
+                job.log_paths = find_log_paths(job)
+                job.save(update_fields=['log_paths'])
+
+            # A config which can not be read still gets a job, which fails with the error when it runs
+            except Exception as error:
+                logger.warning(f"Log files of job {job.pk} could not be found: {type(error).__name__}: {error}")
+
+        self.dispatch(job)
+
+        return job
+
+    def recover(self) -> None:
+        # Jobs left queued are queued again. Every web server process does this, which is safe as each job is claimed
+        # by the first worker to start it, so a job queued by several processes still only runs once
+        for job in Job.objects.filter(status=Job.QUEUED).order_by('created_at'):
+            self.dispatch(job)
+
+
+def fail_interrupted_jobs() -> int:
+    """
+    Marks the jobs left running by a web server which has stopped as failed, as they can not be resumed. This is run
+    once by the recover_jobs management command before the web server starts, rather than by each web server process,
+    since the processes of a running server can not tell which jobs the others are running
+    :return: number of jobs marked as failed
+    """
+    return Job.objects.filter(status=Job.RUNNING).update(status=Job.FAILED, finished_at=timezone.now(),
+                                                         error="The web server stopped while the job was running.")
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue() -> JobQueue:
+    # The queue is started by the first request which needs it, rather than whenever django is set up
+    global _queue
+
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(max_workers=settings.JOB_WORKERS, max_queued=settings.JOB_MAX_QUEUED)
+            _queue.recover()
+
+    return _queue
@@ -0,0 +1,476 @@
+import io
+import os
+import tempfile
+from concurrent.futures import Future
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .logs import read_backward, read_forward, stream_logs
+from .models import Job
+from .queue import JobQueue, QueueFull
+from .worker import execute_job
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+def run_succeeds(config_path: str, log_paths: dict) -> None:
+    pass
+
+
+def run_fails(config_path: str, log_paths: dict) -> None:
+    raise ValueError(f"Config {config_path} is invalid.")
+
+
+def find_log_paths(config_path: str, job_id: int) -> dict:
+    return {'example_model': f"model_logs/example_model_job{job_id}.log"}
+
+
+def find_no_log_paths(config_path: str, job_id: int) -> dict:
+    raise FileNotFoundError(f"Config {config_path} does not exist.")
+
+
+def failed_future(error: Exception) -> Future:
+    future = Future()
+    future.set_exception(error)
+    return future
+
+
+"""
+Unit tests for the job queue contained within jobs.queue
+"""
+
+
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.queue = JobQueue(max_workers=1, max_queued=2)
+        dispatch = mock.patch.object(JobQueue, 'dispatch')
+        self.dispatch = dispatch.start()
+        self.addCleanup(dispatch.stop)
+        log_paths = mock.patch.dict("jobs.queue.LOG_PATHS", {kind: "jobs.tests.find_log_paths" for kind in
+                                                              [Job.MODEL, Job.CHAIN]})
+        log_paths.start()
+        self.addCleanup(log_paths.stop)
+
+    def test_submit_1(self):
+        """
+        Testing that a submitted job is saved as queued and dispatched to the worker pool
+        """
+        # Act
+        job = self.queue.submit(Job.MODEL, "example_model", "config/example_model.yml")
+
+        # Assert
+        saved = Job.objects.get(pk=job.pk)
+        self.assertEqual(saved.status, Job.QUEUED)
+        self.assertEqual((saved.kind, saved.name, saved.config_path),
+                         (Job.MODEL, "example_model", "config/example_model.yml"))
+        self.dispatch.assert_called_once_with(job)
+
+    def test_submit_2(self):
+        """
+        Testing that jobs are turned away once max_queued jobs are waiting, without saving or dispatching them
+        """
+        # Arrange
+        self.queue.submit(Job.MODEL, "model_1", "model_1.yml")
+        self.queue.submit(Job.CHAIN, "chain_1", "chain_1.yml")
+
+        # Act & Assert
+        with self.assertRaises(QueueFull):
+            self.queue.submit(Job.MODEL, "model_2", "model_2.yml")
+
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertEqual(self.dispatch.call_count, 2)
+
+    def test_submit_3(self):
+        """
+        Testing that running and finished jobs do not count towards the queue limit
+        """
+        # Arrange
+        Job.objects.create(kind=Job.MODEL, name="model_1", config_path="model_1.yml", status=Job.RUNNING)
+        Job.objects.create(kind=Job.MODEL, name="model_2", config_path="model_2.yml", status=Job.SUCCEEDED)
+        Job.objects.create(kind=Job.MODEL, name="model_3", config_path="model_3.yml", status=Job.QUEUED)
+
+        # Act
+        job = self.queue.submit(Job.MODEL, "model_4", "model_4.yml")
+
+        # Assert
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 2)
+        self.dispatch.assert_called_once_with(job)
+
+    def test_submit_4(self):
+        """
+        Testing that each job saves its own log paths when submitted, so runs of the same model never share a log file
+        """
+        # Act
+        first = self.queue.submit(Job.MODEL, "example_model", "example_model.yml")
+        second = self.queue.submit(Job.MODEL, "example_model", "example_model.yml")
+
+        # Assert
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.log_paths, {'example_model': f"model_logs/example_model_job{first.pk}.log"})
+        self.assertEqual(second.log_paths, {'example_model': f"model_logs/example_model_job{second.pk}.log"})
+
+    def test_submit_5(self):
+        """
+        Testing that a job whose log paths can not be found is still saved and dispatched, so it fails when it runs
+        """
+        # Act
+        with mock.patch.dict("jobs.queue.LOG_PATHS", {Job.MODEL: "jobs.tests.find_no_log_paths"}), \
+                self.assertLogs("jobs.queue", level="WARNING"):
+            job = self.queue.submit(Job.MODEL, "example_model", "missing.yml")
+
+        # Assert
+        job.refresh_from_db()
+        self.assertEqual(job.log_paths, {})
+        self.dispatch.assert_called_once_with(job)
+
+    def test_recover_1(self):
+        """
+        Testing that jobs left queued are dispatched again in the order they were made, leaving running jobs alone
+        """
+        # Arrange
+        running = Job.objects.create(kind=Job.MODEL, name="model_1", config_path="model_1.yml", status=Job.RUNNING)
+        queued = [Job.objects.create(kind=Job.MODEL, name=f"model_{num}", config_path=f"model_{num}.yml")
+                  for num in range(2, 4)]
+
+        # Act
+        self.queue.recover()
+
+        # Assert
+        running.refresh_from_db()
+        self.assertEqual(running.status, Job.RUNNING)
+        self.assertEqual([call.args[0] for call in self.dispatch.call_args_list], queued)
+
+    def test_recover_jobs_1(self):
+        """
+        Testing that the recover_jobs command marks the jobs left running as failed, leaving other jobs alone
+        """
+        # Arrange
+        running = Job.objects.create(kind=Job.MODEL, name="model_1", config_path="model_1.yml", status=Job.RUNNING)
+        queued = Job.objects.create(kind=Job.MODEL, name="model_2", config_path="model_2.yml")
+
+        # Act
+        call_command("recover_jobs", stdout=io.StringIO())
+
+        # Assert
+        running.refresh_from_db()
+        queued.refresh_from_db()
+        self.assertEqual(running.status, Job.FAILED)
+        self.assertIsNotNone(running.finished_at)
+        self.assertEqual(queued.status, Job.QUEUED)
+        self.dispatch.assert_not_called()
+
+
+"""
+Unit tests for the job state transitions contained within jobs.worker and jobs.queue
+"""
+
+
+class JobStateTests(TransactionTestCase):
+
+    def setUp(self):
+        # Arrange
+        self.job = Job.objects.create(kind=Job.MODEL, name="example_model", config_path="example_model.yml",
+                                      log_paths={'example_model': "model_logs/example_model_job1.log"})
+
+    def test_execute_job_1(self):
+        """
+        Testing that a job which runs successfully moves from queued to succeeded, recording its start and finish
+        """
+        # Act
+        with mock.patch.dict("jobs.queue.RUNNERS", {Job.MODEL: "jobs.tests.run_succeeds"}):
+            execute_job(self.job.pk)
+
+        # Assert
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.SUCCEEDED)
+        self.assertTrue(self.job.is_finished)
+        self.assertEqual(self.job.error, "")
+        self.assertLessEqual(self.job.started_at, self.job.finished_at)
+
+    def test_execute_job_2(self):
+        """
+        Testing that a job which raises an error moves to failed with the traceback of the error
+        """
+        # Act
+        with mock.patch.dict("jobs.queue.RUNNERS", {Job.MODEL: "jobs.tests.run_fails"}):
+            execute_job(self.job.pk)
+
+        # Assert
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, Job.FAILED)
+        self.assertIn("Config example_model.yml is invalid.", self.job.error)
+        self.assertIsNotNone(self.job.finished_at)
+
+    def test_execute_job_3(self):
+        """
+        Testing that a job is marked as running while its model runs
+        """
+        # Arrange
+        statuses = []
+
+        def record_status(config_path: str, log_paths: dict) -> None:
+            statuses.append(Job.objects.get(pk=self.job.pk).status)
+
+        # Act
+        with mock.patch("django.utils.module_loading.import_string", return_value=record_status):
+            execute_job(self.job.pk)
+
+        # Assert
+        self.assertEqual(statuses, [Job.RUNNING])
+
+    def test_execute_job_4(self):
+        """
+        Testing that a job dispatched twice only runs once, as the second worker finds it already claimed
+        """
+        # Arrange
+        runs = []
+
+        # Act
+        with mock.patch("django.utils.module_loading.import_string",
+                        return_value=lambda config_path, log_paths: runs.append((config_path, log_paths))):
+            execute_job(self.job.pk)
+            execute_job(self.job.pk)
+
+        # Assert
+        self.job.refresh_from_db()
+        self.assertEqual(runs, [("example_model.yml", {'example_model': "model_logs/example_model_job1.log"})])
+        self.assertEqual(self.job.status, Job.SUCCEEDED)
+
+    def test_finish_1(self):
+        """
+        Testing that a job whose worker process died is marked as failed, while finished jobs are left unchanged
+        """
+        # Arrange
+        finished = Job.objects.create(kind=Job.MODEL, name="model_2", config_path="model_2.yml",
+                                      status=Job.SUCCEEDED)
+
+        # Act
+        JobQueue.finish(self.job.pk, failed_future(RuntimeError("worker died")))
+        JobQueue.finish(finished.pk, failed_future(RuntimeError("worker died")))
+
+        # Assert
+        self.job.refresh_from_db()
+        finished.refresh_from_db()
+        self.assertEqual(self.job.status, Job.FAILED)
+        self.assertEqual(self.job.error, "RuntimeError: worker died")
+        self.assertEqual(finished.status, Job.SUCCEEDED)
+
+
+"""
+Unit tests for the log readers contained within jobs.logs
+"""
+
+
+class LogReadTests(SimpleTestCase):
+
+    def setUp(self):
+        # Arrange
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "model.log")
+
+    def write_log(self, data: bytes) -> None:
+        with open(self.path, 'wb') as file:
+            file.write(data)
+
+    def test_read_forward_1(self):
+        """
+        Testing that complete lines are read from an offset, and a partial trailing line is left for the next read
+        """
+        # Arrange
+        self.write_log(b"line 1\nline 2\npartial")
+
+        # Act
+        first = read_forward(self.path, 0)
+        second = read_forward(self.path, 7)
+        final = read_forward(self.path, first[1], final=True)
+
+        # Assert
+        self.assertEqual(first, (["line 1", "line 2"], 14))
+        self.assertEqual(second, (["line 2"], 14))
+        self.assertEqual(final, (["partial"], 21))
+
+    def test_read_forward_2(self):
+        """
+        Testing that a log shorter than the offset is read again from its start, as the log has been restarted
+        """
+        # Arrange
+        self.write_log(b"new line\n")
+
+        # Act & Assert
+        self.assertEqual(read_forward(self.path, 100), (["new line"], 9))
+
+    def test_read_forward_3(self):
+        """
+        Testing that empty and missing logs return no lines
+        """
+        # Arrange
+        self.write_log(b"")
+
+        # Act & Assert
+        self.assertEqual(read_forward(self.path, 0), ([], 0))
+        self.assertEqual(read_forward(self.path, 0, final=True), ([], 0))
+        self.assertEqual(read_forward(self.path + ".missing", 5), ([], 0))
+
+    def test_read_forward_4(self):
+        """
+        Testing that logs are read a page at a time, and a line longer than a page is split between pages
+        """
+        # Arrange
+        self.write_log(b"abc\ndefghijklmnop\n")
+
+        # Act
+        with mock.patch("jobs.logs.LOG_PAGE_BYTES", 8):
+            first = read_forward(self.path, 0)
+            second = read_forward(self.path, first[1])
+            third = read_forward(self.path, second[1])
+
+        # Assert
+        self.assertEqual(first, (["abc"], 4))
+        self.assertEqual(second, (["defghijk"], 12))
+        self.assertEqual(third, (["lmnop"], 18))
+
+    def test_read_backward_1(self):
+        """
+        Testing that the latest page ends at the last complete line, leaving a partial trailing line unread
+        """
+        # Arrange
+        self.write_log(b"line 1\nline 2\npartial")
+
+        # Act & Assert
+        self.assertEqual(read_backward(self.path), (["line 1", "line 2"], 0, 14))
+
+    def test_read_backward_2(self):
+        """
+        Testing that earlier pages are read up to an offset and start at the first complete line
+        """
+        # Arrange
+        self.write_log(b"line 1\nline 2\nline 3\n")
+
+        # Act
+        with mock.patch("jobs.logs.LOG_PAGE_BYTES", 10):
+            latest = read_backward(self.path)
+            earlier = read_backward(self.path, end=latest[1])
+            first = read_backward(self.path, end=earlier[1])
+
+        # Assert
+        self.assertEqual(latest, (["line 3"], 14, 21))
+        self.assertEqual(earlier, (["line 2"], 7, 14))
+        self.assertEqual(first, (["line 1"], 0, 7))
+
+    def test_read_backward_3(self):
+        """
+        Testing that empty and missing logs return no lines, and offsets past the end of a log are read up to its end
+        """
+        # Arrange
+        self.write_log(b"")
+
+        # Act & Assert
+        self.assertEqual(read_backward(self.path), ([], 0, 0))
+        self.assertEqual(read_backward(self.path + ".missing", end=10), ([], 0, 0))
+
+        self.write_log(b"line 1\n")
+        self.assertEqual(read_backward(self.path, end=100), (["line 1"], 0, 7))
+
+
+"""
+Unit tests for the log views contained within jobs.views
+"""
+
+
+class LogViewTests(TestCase):
+
+    def setUp(self):
+        # Arrange
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.path = os.path.join(folder.name, "model.log")
+        with open(self.path, 'wb') as file:
+            file.write(b"line 1\nline 2\n")
+
+        self.job = Job.objects.create(kind=Job.MODEL, name="example_model", config_path="example_model.yml",
+                                      status=Job.SUCCEEDED, log_paths={'example_model': self.path})
+
+    def test_detail_1(self):
+        """
+        Testing that a job's page shows the log saved on the job, and not the log of a later run of the same model
+        """
+        # Arrange
+        later_path = os.path.join(os.path.dirname(self.path), "later_model.log")
+        with open(later_path, 'wb') as file:
+            file.write(b"later line\n")
+        later = Job.objects.create(kind=Job.MODEL, name="example_model", config_path="example_model.yml",
+                                   status=Job.RUNNING, log_paths={'example_model': later_path})
+
+        # Act
+        response = self.client.get(reverse("jobs:detail", args=[self.job.pk]))
+        later_response = self.client.get(reverse("jobs:detail", args=[later.pk]))
+
+        # Assert
+        self.assertContains(response, "line 2")
+        self.assertNotContains(response, "later line")
+        self.assertContains(later_response, "later line")
+        self.assertNotContains(later_response, "line 2")
+
+    def test_log_page_1(self):
+        """
+        Testing that a page of a log is returned up to the requested offset
+        """
+        # Act
+        response = self.client.get(reverse("jobs:log_page", args=[self.job.pk]), {'model': "example_model", 'end': 7})
+
+        # Assert
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'model': "example_model", 'lines': ["line 1"], 'start': 0, 'end': 7})
+
+    def test_log_page_2(self):
+        """
+        Testing that a malformed or negative end offset is turned away with a bad request rather than a server error
+        """
+        for end in ["abc", "-5", "1.5"]:
+            # Act
+            response = self.client.get(reverse("jobs:log_page", args=[self.job.pk]),
+                                       {'model': "example_model", 'end': end})
+
+            # Assert
+            self.assertEqual(response.status_code, 400)
+
+    def test_log_stream_1(self):
+        """
+        Testing that malformed log offsets are turned away with a bad request, from the query or a reconnecting browser
+        """
+        url = reverse("jobs:log_stream", args=[self.job.pk])
+
+        for offsets in ["not json", "[1, 2]", '{"example_model": "abc"}', '{"example_model": -1}']:
+            # Act
+            query_response = self.client.get(url, {'offsets': offsets})
+            header_response = self.client.get(url, headers={'Last-Event-ID': offsets})
+
+            # Assert
+            self.assertEqual(query_response.status_code, 400)
+            self.assertEqual(header_response.status_code, 400)
+
+    def test_stream_logs_1(self):
+        """
+        Testing that the log stream of a finished job sends the lines of the log saved on the job and then ends
+        """
+        # Arrange
+        async def collect() -> list:
+            return [event async for event in stream_logs(self.job.pk, {})]
+
+        # Act
+        events = async_to_sync(collect)()
+
+        # Assert
+        self.assertTrue(events[0].startswith("event: log\n"))
+        self.assertIn('"lines": ["line 1", "line 2"]', events[0])
+        self.assertTrue(events[-1].startswith("event: end\n"))
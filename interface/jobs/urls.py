@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = "jobs"
+urlpatterns = [
+    path("", views.index, name="index"),
+    path("<int:job_id>/", views.detail, name="detail"),
+    path("<int:job_id>/logs/", views.log_page, name="log_page"),
+    path("<int:job_id>/stream/", views.log_stream, name="log_stream"),
+]
@@ -0,0 +1,86 @@
+import json
+
+from django.http import Http404, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+
+from .logs import read_backward, read_tails, stream_logs
+from .models import Job
+from .queue import get_log_paths
+
+# Number of the most recent jobs listed on the jobs page
+RECENT_JOBS = 50
+
+
+def parse_offset(value: str) -> int:
+    # Byte offsets sent by the browser are checked, so a malformed request is turned away rather than failing
+    offset = int(value)
+
+    if offset < 0:
+        raise ValueError(f"Log offset {offset} is negative.")
+
+    return offset
+
+
+def parse_offsets(value: str) -> dict:
+    # The offsets of a log stream are a json object containing the byte offset of each model's log
+    offsets = json.loads(value)
+
+    if not isinstance(offsets, dict):
+        raise ValueError("Log offsets must be a json object.")
+
+    return {str(name): parse_offset(offset) for name, offset in offsets.items()}
+
+
+def index(request):
+    jobs = Job.objects.all()[:RECENT_JOBS]
+
+    return render(request, "jobs/index.html", {'jobs': jobs})
+
+
+def detail(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+
+    # Only the latest page of each log is sent with the page, later lines are streamed and earlier lines are paged
+    model_logs = read_tails(job)
+
+    log_offsets = {name: val['end'] for name, val in model_logs.items()}
+
+    return render(request, "jobs/detail.html", context={'job': job, 'model_logs': model_logs,
+                                                        'log_offsets': log_offsets})
+
+
+def log_page(request, job_id):
+    job = get_object_or_404(Job, pk=job_id)
+    paths = get_log_paths(job)
+
+    model = request.GET.get('model')
+    if model not in paths:
+        raise Http404(f"Job {job_id} has no model {model}.")
+
+    try:
+        end = parse_offset(request.GET.get('end', 0))
+    except (TypeError, ValueError):
+        return HttpResponseBadRequest("The end of a log page must be a byte offset.")
+
+    lines, start, end = read_backward(paths[model], end=end)
+
+    return JsonResponse({'model': model, 'lines': lines, 'start': start, 'end': end})
+
+
+async def log_stream(request, job_id):
+    # Browsers reconnecting to the stream send back the log offsets of the last event they received
+    offsets = request.headers.get('Last-Event-ID') or request.GET.get('offsets') or "{}"
+
+    try:
+        offsets = parse_offsets(offsets)
+    except (TypeError, ValueError):
+        return HttpResponseBadRequest("Log offsets must be a json object of byte offsets.")
+
+    if not await Job.objects.filter(pk=job_id).aexists():
+        raise Http404(f"Job {job_id} does not exist.")
+
+    response = StreamingHttpResponse(stream_logs(job_id, offsets), content_type="text/event-stream")
+    response['Cache-Control'] = "no-cache"
+    response['X-Accel-Buffering'] = "no"
+
+    return response
@@ -0,0 +1,44 @@
+import traceback
+
+import django
+
+
+def setup_worker() -> None:
+    # Worker processes are started fresh, so django is set up before they read or update any jobs
+    django.setup()
+
+
+def execute_job(job_id: int) -> None:
+    """
+    Runs a queued job within a worker process, recording when it starts and finishes in the database. Django models
+    are imported here rather than with the module, as the module is imported by worker processes before django is set up
+    :param job_id: primary key of the job
+    """
+    from django.db import connection
+    from django.utils import timezone
+    from django.utils.module_loading import import_string
+
+    from .models import Job
+    from .queue import RUNNERS
+
+    # Jobs are claimed with a single conditional update, so a job dispatched more than once only runs once
+    claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(status=Job.RUNNING, started_at=timezone.now())
+
+    if not claimed:
+        connection.close()
+        return
+
+    job = Job.objects.get(pk=job_id)
+
+    # The database connection is not held open while the job runs
+    connection.close()
+
+    try:
+        import_string(RUNNERS[job.kind])(job.config_path, job.log_paths)
+        status, error = Job.SUCCEEDED, ""
+
+    except Exception:
+        status, error = Job.FAILED, traceback.format_exc()
+
+    Job.objects.filter(pk=job_id).update(status=status, error=error, finished_at=timezone.now())
+    connection.close()
@@ -1,10 +1,15 @@
-import datetime
 import os
 import sys
-from glob import glob
 
 import yaml
-from django.shortcuts import render
+from django.contrib import messages
+from django.http import Http404
+from django.shortcuts import redirect, render
+
+from interface.config_index import ConfigIndex
+from jobs.models import Job
+from jobs.queue import QueueFull, get_queue
+from run_model.views import get_log_path
 
 PY_FILE_DIR = os.path.abspath(os.path.dirname(__file__))
 PY_ROOT_DIR = os.path.abspath(os.path.join(PY_FILE_DIR, ".."))
@@ -15,57 +20,45 @@ sys.path.append(os.path.join(PY_REPO_DIR, "src"))
 from framework.model_chain import ModelChain
 
 
-def index(request):
-    path = os.path.join(PY_REPO_DIR, CONFIG_DIR)
-    configs = [file
-               for p, subdir, files in os.walk(path)
-               for file in glob(os.path.join(p, "*.yml"))]
+def summarise_config(config: dict) -> dict:
+    return {'models_in_chain': list(config['models'])}
+
 
-    model_info = []
-    for num, item in enumerate(configs):
-        with open(item, "r") as file:
-            params = yaml.safe_load(file)
+# Model chain configs are read once and then only again when they change
+CONFIG_INDEX = ConfigIndex(os.path.join(PY_REPO_DIR, CONFIG_DIR), summarise_config)
 
-            model_info += [{'index': num + 1,
-                            'config_file': os.path.split(item)[-1],
-                            'models_in_chain': params['models'].keys()}]
+
+def index(request):
+    model_info = [{'index': num + 1, **item} for num, item in enumerate(CONFIG_INDEX.all())]
 
     return render(request, "run_chain/index.html", {'configs': model_info})
 
 
 def run(request, model_id):
-    path = os.path.join(PY_REPO_DIR, CONFIG_DIR)
-    path = [file
-            for p, subdir, files in os.walk(path)
-            for file in glob(os.path.join(p, "*.yml")) if model_id == os.path.split(file)[-1][:-4]][0]
+    config = CONFIG_INDEX.get(model_id)
+    if config is None:
+        raise Http404(f"There is no model chain config {model_id}.")
+    path = config['path']
 
-    model_logs = run_chain(path, request)
+    # The model chain is run by a job worker, so the page returns straight away with the job to follow
+    try:
+        job = get_queue().submit(Job.CHAIN, model_id, path)
+    except QueueFull as error:
+        messages.add_message(request, messages.WARNING, str(error))
+        return redirect("jobs:index")
 
-    return render(request, "run_chain/run.html",
-                  context={'model_id': model_id, 'model_logs': model_logs})
+    return redirect("jobs:detail", job_id=job.pk)
 
 
-def run_chain(path, request):
-    model_chain = ModelChain(path)
+def run_chain(path, log_paths=None):
+    model_chain = ModelChain(path, log_paths=log_paths)
 
     model_chain.run_chain()
 
-    # Get model logs for each model in the chain
+
+def get_log_paths(path, job_id):
+    # Get the model log file of the job for each model in the chain
     with open(path, 'r') as file:
         config = yaml.safe_load(file)['models']
 
-    model_logs = {}
-    for key, val in config.items():
-        with open(os.path.join(PY_REPO_DIR, val['config']), 'r') as file:
-            log_info = yaml.safe_load(file)['parameters']['model_parameters']
-
-        log_name = log_info['log_name']
-        if '{date}' in log_name:
-            log_name = log_name.format(date=datetime.date.today())
-
-        with open(os.path.join(PY_REPO_DIR, log_info['log_location'], log_name) + ".log", 'r') as file:
-            logs = file.read().splitlines()
-
-        model_logs[key] = logs
-
-    return model_logs
+    return {key: get_log_path(val['config'], job_id) for key, val in config.items()}
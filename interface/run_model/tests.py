@@ -1,3 +1,195 @@
+import datetime
+import os
+import tempfile
+from unittest import mock
+
+import markdown
 from django.test import TestCase
+from django.urls import reverse
+
+from interface.config_index import ConfigIndex, RenderedFile
+
+from . import views
+
+"""
+Define fixed data to be used across tests
+"""
+
+CONFIG = """
+config:
+  model_id: "{model_id}"
+  model_type: "ifrs9"
+  type: "{type}"
+"""
+
+MODEL_CONFIG = """
+parameters:
+  model_parameters:
+    log_name: "example_model_{date}"
+    log_location: "model_logs"
+"""
+
+
+"""
+Unit tests for the config index and rendered README used by the views contained within run_model.views
+"""
+
+
+class ConfigIndexTests(TestCase):
+
+    def setUp(self):
+        # Arrange
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = folder.name
+        self.readme_path = os.path.join(self.folder, "README.md")
+        self.config_folder = os.path.join(self.folder, "model_metadata")
+        os.makedirs(self.config_folder)
+
+        # Modified times are set explicitly, so each change is seen however coarse the file system's timestamps are
+        self.modified = 1_000_000_000_000_000_000
+
+        self.write_config("model_a", model_id="model-a", type="pandas")
+        self.write_file(self.readme_path, "First readme")
+
+        self.index = ConfigIndex(self.config_folder, views.summarise_config)
+        self.readme = RenderedFile(self.readme_path, markdown.markdown)
+        for name, val in {'CONFIG_INDEX': self.index, 'README': self.readme}.items():
+            patch = mock.patch.object(views, name, val)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def touch(self, path: str) -> None:
+        self.modified += 1_000_000_000
+        os.utime(path, ns=(self.modified, self.modified))
+
+    def write_file(self, path: str, content: str) -> None:
+        with open(path, 'w') as file:
+            file.write(content)
+        self.touch(path)
+
+    def edit_config(self, name: str, **kwargs) -> None:
+        self.write_file(os.path.join(self.config_folder, f"{name}.yml"), CONFIG.format(**kwargs))
+
+    def write_config(self, name: str, **kwargs) -> None:
+        # Adding a config changes the modified time of its directory
+        self.edit_config(name, **kwargs)
+        self.touch(self.config_folder)
+
+    def remove_config(self, name: str) -> None:
+        os.remove(os.path.join(self.config_folder, f"{name}.yml"))
+        self.touch(self.config_folder)
+
+    def get_index(self):
+        return self.client.get(reverse("run_model:index"))
+
+    def test_config_index_1(self):
+        """
+        Testing that adding a config adds it to the cached listing and the rendered model list
+        """
+        # Arrange
+        self.get_index()
+
+        # Act
+        self.write_config("model_b", model_id="model-b", type="polars")
+        response = self.get_index()
+
+        # Assert
+        self.assertEqual([entry['name'] for entry in self.index.all()], ["model_a", "model_b"])
+        self.assertContains(response, "model_b.yml")
+        self.assertContains(response, "model-b")
+
+    def test_config_index_2(self):
+        """
+        Testing that editing a config in place parses it again, without its directory changing
+        """
+        # Arrange
+        self.get_index()
+
+        # Act
+        self.edit_config("model_a", model_id="model-a", type="duckdb")
+        response = self.get_index()
+
+        # Assert
+        self.assertEqual(self.index.get("model_a")['type'], "duckdb")
+        self.assertContains(response, "duckdb")
+        self.assertNotContains(response, "pandas")
+
+    def test_config_index_3(self):
+        """
+        Testing that removing a config removes it from the cached listing and the rendered model list
+        """
+        # Arrange
+        self.write_config("model_b", model_id="model-b", type="polars")
+        self.get_index()
+
+        # Act
+        self.remove_config("model_b")
+        response = self.get_index()
+
+        # Assert
+        self.assertEqual([entry['name'] for entry in self.index.all()], ["model_a"])
+        self.assertIsNone(self.index.get("model_b"))
+        self.assertNotContains(response, "model_b.yml")
+
+    def test_config_index_4(self):
+        """
+        Testing that configs are only parsed again when they change
+        """
+        # Arrange
+        summarise = mock.Mock(side_effect=views.summarise_config)
+        index = ConfigIndex(self.config_folder, summarise)
+        self.write_config("model_b", model_id="model-b", type="polars")
+        index.all()
+
+        # Act
+        index.all()
+        index.get("model_a")
+        self.edit_config("model_b", model_id="model-b", type="duckdb")
+        index.all()
+
+        # Assert
+        self.assertEqual(summarise.call_count, 3)
+
+    def test_rendered_file_1(self):
+        """
+        Testing that editing the README renders it again on the repo info page
+        """
+        # Arrange
+        self.client.get(reverse("repo"))
+
+        # Act
+        self.write_file(self.readme_path, "Second readme")
+        response = self.client.get(reverse("repo"))
+
+        # Assert
+        self.assertEqual(self.readme.get(), "<p>Second readme</p>")
+        self.assertContains(response, "Second readme")
+        self.assertNotContains(response, "First readme")
+
+
+"""
+Unit tests for the log paths of model jobs contained within run_model.views
+"""
+
+
+class LogPathTests(TestCase):
+
+    def test_get_log_path_1(self):
+        """
+        Testing that each job gets its own log file, named with the date it was submitted on
+        """
+        # Arrange
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        model_config = os.path.join(folder.name, "example_model_config.yml")
+        with open(model_config, 'w') as file:
+            file.write(MODEL_CONFIG)
+
+        # Act
+        first = views.get_log_path(model_config, 1)
+        second = views.get_log_path(model_config, 2)
 
-# Create your tests here.
+        # Assert
+        self.assertEqual(os.path.basename(first), f"example_model_{datetime.date.today()}_job1.log")
+        self.assertEqual(os.path.basename(second), f"example_model_{datetime.date.today()}_job2.log")
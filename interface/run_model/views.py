@@ -2,12 +2,16 @@ import datetime
 import importlib
 import os
 import sys
-from glob import glob
 
 import markdown
 import yaml
 from django.contrib import messages
-from django.shortcuts import render
+from django.http import Http404
+from django.shortcuts import redirect, render
+
+from interface.config_index import ConfigIndex, RenderedFile
+from jobs.models import Job
+from jobs.queue import QueueFull, get_queue
 
 PY_FILE_DIR = os.path.abspath(os.path.dirname(__file__))
 PY_ROOT_DIR = os.path.abspath(os.path.join(PY_FILE_DIR, ".."))
@@ -19,68 +23,75 @@ sys.path.append(PY_REPO_DIR)
 from framework.model_wrapper import DeployWrapper
 
 
+def summarise_config(config: dict) -> dict:
+    return {key: config['config'][key] for key in ['model_id', 'model_type', 'type']}
+
+
+# Model configs and the README are read once and then only again when they change
+CONFIG_INDEX = ConfigIndex(os.path.join(PY_REPO_DIR, CONFIG_DIR), summarise_config)
+README = RenderedFile(os.path.join(PY_REPO_DIR, "README.md"), markdown.markdown)
+
+
 def home(request):
     return render(request, "run_model/home.html")
 
 
 def repo(request):
-    with open(os.path.join(PY_REPO_DIR, "README.md"), 'r') as f:
-        markdown_string = f.read()
-    readme_html = markdown.markdown(markdown_string)
+    readme_html = README.get()
 
     return render(request, "run_model/repo.html", {'readme_txt': readme_html})
 
 
 def index(request):
-    path = os.path.join(PY_REPO_DIR, CONFIG_DIR)
-    configs = [file
-               for p, subdir, files in os.walk(path)
-               for file in glob(os.path.join(p, "*.yml"))]
-
-    model_info = []
-    for num, item in enumerate(configs):
-        with open(item, "r") as file:
-            params = yaml.safe_load(file)['config']
-
-        model_info += [{'index': num + 1,
-                        'config_file': os.path.split(item)[-1],
-                        'model_id': params['model_id'],
-                        'model_type': params['model_type'],
-                        'type': params['type']}]
+    model_info = [{'index': num + 1, **item} for num, item in enumerate(CONFIG_INDEX.all())]
 
     return render(request, "run_model/index.html", {'configs': model_info})
 
 
 def run(request, model_id):
-    path = os.path.join(PY_REPO_DIR, CONFIG_DIR)
-    path = [file
-            for p, subdir, files in os.walk(path)
-            for file in glob(os.path.join(p, "*.yml")) if model_id == os.path.split(file)[-1][:-4]][0]
+    config = CONFIG_INDEX.get(model_id)
+    if config is None:
+        raise Http404(f"There is no model config {model_id}.")
+    path = config['path']
 
-    run_model(request, path)
+    # The model is run by a job worker, so the page returns straight away with the job to follow
+    try:
+        job = get_queue().submit(Job.MODEL, model_id, path)
+    except QueueFull as error:
+        messages.add_message(request, messages.WARNING, str(error))
+        return redirect("jobs:index")
 
-    return render(request, "run_model/run.html", context={'model_id': model_id})
+    return redirect("jobs:detail", job_id=job.pk)
 
 
-def run_model(request, path: str):
+def run_model(path: str, log_paths: dict = None):
     with open(path, 'r') as file:
         config = yaml.safe_load(file)['config']
 
+    # The model writes to the log file saved on its job, rather than the one shared by every run of the model
+    log_path = (log_paths or {}).get(config['model_id'])
+
     DeployWrapper(get_model_class(config), config['sys_config'],
-                  config['model_config']).run_model()
+                  config['model_config'], log_path=log_path).run_model()
+
 
-    with open(os.path.join(PY_REPO_DIR, config['model_config'])) as file:
+def get_log_paths(path: str, job_id: int) -> dict:
+    with open(path, 'r') as file:
+        config = yaml.safe_load(file)['config']
+
+    return {config['model_id']: get_log_path(config['model_config'], job_id)}
+
+
+def get_log_path(model_config: str, job_id: int) -> str:
+    with open(os.path.join(PY_REPO_DIR, model_config)) as file:
         config = yaml.safe_load(file)['parameters']['model_parameters']
 
     log_name = config['log_name']
     if '{date}' in log_name:
         log_name = log_name.format(date=datetime.date.today())
 
-    with open(os.path.join(PY_REPO_DIR, config['log_location'], log_name) + ".log", 'r') as file:
-        logs = file.read().splitlines()
-
-    for line in logs:
-        messages.add_message(request, messages.INFO, line)
+    # Each job writes its own log file, so runs of the same model on the same day do not overwrite each other's logs
+    return os.path.join(PY_REPO_DIR, config['log_location'], f"{log_name}_job{job_id}") + ".log"
 
 
 def get_model_class(model_config: dict):
@@ -0,0 +1,93 @@
+import logging
+import os
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import pandas as pd
+
+from framework.setup import read_write_data
+from framework.setup.log_format import buffer_logs, replay_logs
+
+logger = logging.getLogger()
+
+
+class DatasetRegistry:
+    """
+    Holds the outputs of the models in a model chain for the length of a chain run, keyed by the path they are saved
+    to. A later model reading one of these paths is given the typed dataframe instead of re-reading the file, whilst
+    the file is still saved in the background so every output remains on disk.
+    """
+
+    def __init__(self, max_workers: int = 2):
+        self.datasets = {}
+        self.saves = {}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="save_data")
+
+    @staticmethod
+    def get_key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def __contains__(self, path: str) -> bool:
+        return self.get_key(path) in self.datasets
+
+    def register(self, path: str, data: pd.DataFrame, save: callable) -> None:
+        # Wait for any earlier save to the same path so files are never written by two threads at once
+        self.wait(path)
+
+        self.datasets[self.get_key(path)] = data
+
+        def save_buffered() -> tuple:
+            # Hold back the logs of the save so they are written once the save is waited on
+            with buffer_logs() as records:
+                try:
+                    save()
+                    return records, None
+                except Exception as error:
+                    return records, error
+
+        self.saves[self.get_key(path)] = self.executor.submit(save_buffered)
+
+        logger.info(f"Dataset {path} is being saved in the background.")
+
+    def get(self, path: str) -> pd.DataFrame:
+        # Datasets are shared rather than copied, for readers such as duckdb which never change the data they scan
+        return self.datasets[self.get_key(path)]
+
+    def read_to_pandas(self, path: str, schema: dict) -> pd.DataFrame:
+        # Models are given a copy, so changes made by the model do not reach the file being saved or later models
+        data = self.datasets[self.get_key(path)]
+
+        return read_write_data.enforce_data_types(data[list(schema.keys())].copy(), schema)
+
+    def wait(self, path: str) -> None:
+        future = self.saves.pop(self.get_key(path), None)
+
+        if future is not None:
+            self.finish_save(path, future)
+
+    @staticmethod
+    def finish_save(path: str, future: Future) -> None:
+        records, error = future.result()
+        replay_logs(records)
+
+        if error is not None:
+            logger.error(f"Failed to save dataset {path} in the background.")
+            raise error
+
+    def discard(self, path: str) -> None:
+        self.wait(path)
+        self.datasets.pop(self.get_key(path), None)
+
+    def release(self, keep: set) -> None:
+        # Outputs which no later model reads are dropped, their saves keep their own reference to the data
+        keep = {self.get_key(path) for path in keep}
+
+        for key in [key for key in self.datasets if key not in keep]:
+            del self.datasets[key]
+
+    def close(self) -> None:
+        try:
+            for key in list(self.saves):
+                self.wait(key)
+        finally:
+            self.executor.shutdown(wait=True)
+            self.datasets = {}
@@ -0,0 +1,184 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import threading
+
+from config import PY_REPO_DIR
+from framework.model_wrapper import ModelWrapper
+
+# Increment when the contents of a fingerprint change so every model is run again
+FINGERPRINT_VERSION = 1
+
+# Fingerprints are saved alongside each output, e.g. ecl_data.csv.fingerprint
+FINGERPRINT_SUFFIX = ".fingerprint"
+
+
+def hash_file(path: str) -> str:
+    digest = hashlib.blake2b(digest_size=32)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def hash_path(path: str) -> str:
+    # Directories of parquet files are hashed on the names and contents of every file they contain
+    if not os.path.exists(path):
+        return "missing"
+
+    if not os.path.isdir(path):
+        return hash_file(path)
+
+    digest = hashlib.blake2b(digest_size=32)
+    for file in sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names):
+        digest.update(os.path.relpath(file, path).encode())
+        digest.update(hash_file(file).encode())
+
+    return digest.hexdigest()
+
+
+def get_imported_modules(path: str, module_name: str) -> set:
+    # Imports are read from the source, so imports made within functions are found without running the module
+    with open(path, 'rb') as file:
+        tree = ast.parse(file.read(), filename=path)
+
+    package = module_name if os.path.basename(path) == "__init__.py" else module_name.rpartition(".")[0]
+
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules |= {alias.name for alias in node.names}
+
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name("." * node.level + (node.module or ""), package) if node.level \
+                else node.module
+            # Names imported from a package may themselves be modules
+            modules |= {base} | {f"{base}.{alias.name}" for alias in node.names}
+
+    return modules
+
+
+def find_module_file(module_name: str) -> str:
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return None
+
+    if spec is None or spec.origin is None or not spec.origin.endswith(".py"):
+        return None
+
+    return spec.origin
+
+
+def get_source_files(module_name: str) -> list:
+    """
+    Finds the source files of a model wrapper module and of every model module it imports, directly or through other
+    model modules. Model modules are those within the models package, so changes to the framework are not included
+    :param module_name: name of the model wrapper module, e.g. models.model_wrappers.example_model_wrapper
+    :return: sorted list of source file paths
+    """
+    models_dir = os.path.normcase(os.path.join(os.path.abspath(PY_REPO_DIR), "models"))
+    files = set()
+    modules = [module_name]
+
+    while modules:
+        name = modules.pop()
+        path = find_module_file(name)
+
+        if path is None or path in files:
+            continue
+
+        if name != module_name and not os.path.normcase(path).startswith(models_dir):
+            continue
+
+        files.add(path)
+        modules += [val for val in get_imported_modules(path, name) if val.split(".")[0] == "models"]
+
+    return sorted(files)
+
+
+def get_schema_path(schema: str | tuple) -> str:
+    if isinstance(schema, tuple):
+        return os.path.join(os.path.dirname(schema[0].__file__), schema[1])
+
+    return schema
+
+
+def hash_schemas(schemas: dict) -> dict:
+    return {key: hash_path(get_schema_path(val)) for key, val in schemas.items()}
+
+
+def fingerprint_model(model_wrapper: type, module_name: str, model_config: dict, data_dir: str,
+                      known_inputs: dict = None) -> str:
+    """
+    Fingerprints a model run from everything which can change its outputs: the contents of its inputs, its model config,
+    its parameters file, its schema files and the source of the model
+    :param model_wrapper: ModelWrapper class of the model
+    :param module_name: name of the module containing the model wrapper
+    :param model_config: dictionary containing the model config yaml's content
+    :param data_dir: directory the datasets of the model config are found in
+    :param known_inputs: dictionary containing the fingerprints of inputs saved by earlier models, keyed by their path,
+    which are used in place of hashing the input files
+    :return: fingerprint of the model run
+    """
+    known_inputs = known_inputs or {}
+    wrapper = model_wrapper()
+
+    inputs = {}
+    for key, val in model_config['model_data']['inputs'].items():
+        path = get_path_key(os.path.join(data_dir, ModelWrapper.read_dataset_config(val)['path']))
+        inputs[key] = known_inputs[path] if path in known_inputs else hash_path(path)
+
+    parameters_file = model_config['parameters']['model_parameters'].get('parameters_file', "")
+    parameter_schemas = wrapper.define_parameter_schemas()
+    schemas = {'inputs': hash_schemas(wrapper.define_input_schemas()),
+               'outputs': hash_schemas(wrapper.define_output_schemas()),
+               'parameters': None if parameter_schemas is None else hash_path(get_schema_path(parameter_schemas))}
+
+    source = {os.path.relpath(path, PY_REPO_DIR): hash_file(path) for path in get_source_files(module_name)}
+
+    content = {'version': FINGERPRINT_VERSION, 'model': f"{module_name}.{model_wrapper.__name__}", 'inputs': inputs,
+               'config': model_config, 'schemas': schemas, 'source': source,
+               'parameters': hash_path(os.path.join(data_dir, parameters_file)) if parameters_file else None}
+
+    return hashlib.blake2b(json.dumps(content, sort_keys=True, default=str).encode(), digest_size=32).hexdigest()
+
+
+def get_path_key(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def get_fingerprint_path(path: str) -> str:
+    return os.path.abspath(path) + FINGERPRINT_SUFFIX
+
+
+def read_fingerprint(path: str) -> str:
+    fingerprint_path = get_fingerprint_path(path)
+
+    if not os.path.isfile(fingerprint_path):
+        return None
+
+    with open(fingerprint_path) as file:
+        return json.load(file).get('fingerprint')
+
+
+def write_fingerprint(path: str, fingerprint: str, model_name: str) -> None:
+    # Fingerprints are renamed into place once written, so a partly written fingerprint is never read
+    fingerprint_path = get_fingerprint_path(path)
+
+    with open(f"{fingerprint_path}.{threading.get_ident()}.tmp", 'w') as file:
+        json.dump({'fingerprint': fingerprint, 'model': model_name}, file)
+    os.replace(f"{fingerprint_path}.{threading.get_ident()}.tmp", fingerprint_path)
+
+
+def remove_fingerprint(path: str) -> None:
+    if os.path.isfile(get_fingerprint_path(path)):
+        os.remove(get_fingerprint_path(path))
+
+
+def is_up_to_date(paths: set, fingerprint: str) -> bool:
+    # Outputs are up to date when every output exists and was saved by a run with the same fingerprint
+    return all(os.path.exists(path) and read_fingerprint(path) == fingerprint for path in paths)
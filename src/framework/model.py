@@ -7,6 +7,13 @@ logger = logging.getLogger()
 
 
 class BaseModel(ABC):
+    # Name of the input dataset the model is row-local over, i.e. each row of the model output depends only on one row
+    # of this dataset and the other inputs in full. Declaring it allows the model to be run batch by batch.
+    row_local_input: str = None
+
+    # Columns the model joins its inputs on. Rows are only ever combined with rows sharing the same values of these
+    # columns, so the model can be run in parallel on partitions of its inputs split by any of them.
+    join_keys: list = None
 
     def __init__(self, input_data: dict, parameters: pd.DataFrame()):
         self.model_data: dict = input_data
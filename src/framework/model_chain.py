@@ -1,24 +1,69 @@
 import importlib
+import logging
+import multiprocessing
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 
 from config import PY_REPO_DIR
+from framework import fingerprint
+from framework.dataset_registry import DatasetRegistry
 from framework.model_wrapper import DeployWrapper
 from framework.model_wrapper import ModelWrapper
-from framework.setup.log_format import headers
-from framework.setup.read_write_data import read_yaml
+from framework.setup.log_format import get_handlers, headers
+from framework.setup.schema_registry import SchemaRegistry
 from config import PY_ROOT_DIR
 
+logger = logging.getLogger()
+
+
+def run_model_process(model_path: str, model: str, sys_config_path: str, config_path: str,
+                      log_path: str = None) -> float:
+    """
+    Runs a single model of a model chain within a worker process
+    :param model_path: path of the model wrapper module starting from the src directory
+    :param model: name of the model wrapper class
+    :param sys_config_path: path of the system config yaml
+    :param config_path: path of the model config yaml
+    :param log_path: path of the model's log file, the log_location and log_name of its model config when not given
+    :return: execution time of the model in seconds
+    """
+    start = time.perf_counter()
+
+    # Models run side by side would interleave their console logs, so only warnings and errors reach the console.
+    # The full log of each model is still written to its own log file
+    for handler in get_handlers():
+        if type(handler) is logging.StreamHandler:
+            handler.setLevel(logging.WARNING)
+
+    model_class = getattr(importlib.import_module(model_path), model)
+    DeployWrapper(model_class, sys_config_path, config_path, log_path=log_path).run_model()
+
+    return time.perf_counter() - start
+
 
 class ModelChain:
 
-    def __init__(self, config_path: str):
-        self.sys_config_path = self.read_config(config_path)['config']['sys_config']
-        self.chain_config = self.read_config(config_path)['models']
+    def __init__(self, config_path: str, log_paths: dict = None):
+        config = self.read_config(config_path)
+        self.sys_config_path = config['config']['sys_config']
+        self.chain_config = config['models']
+
+        # Models are run one at a time unless the chain config allows independent models to run side by side
+        self.max_workers = int(config['config'].get('max_workers', 1))
+        memory_budget = config['config'].get('memory_budget_gb')
+        self.memory_budget = None if memory_budget is None else float(memory_budget) * 1000000000
+
+        # Fingerprints of the outputs saved or found up to date during the chain run, keyed by their path
+        self.fingerprints = {}
+
+        # Log files given for the run of each model, keyed by model name, replace those set in the model configs
+        self.log_paths = log_paths or {}
 
     @staticmethod
     def read_config(path: str) -> dict:
         path = os.path.join(PY_ROOT_DIR, path)
-        config_dict = read_yaml(path=path)
+        config_dict = SchemaRegistry().read_config(path=path)
 
         return config_dict
 
@@ -27,11 +72,283 @@ class ModelChain:
         model_class = getattr(importlib.import_module(model_config['model_path']), model_config['model'])
         return model_class
 
-    def run_chain(self) -> None:
-        for model_name, model_config in self.chain_config.items():
-            headers(f"Executing Model '{model_name}'")
+    def get_data_dir(self) -> str:
+        return os.path.join(PY_ROOT_DIR, self.read_config(self.sys_config_path)['data']['data_folder'])
+
+    def get_data_paths(self, model_config: dict, data_type: str) -> set:
+        data_dir = self.get_data_dir()
+        datasets = self.read_config(model_config['config'])['model_data'][data_type]
+
+        return {os.path.normcase(os.path.abspath(os.path.join(data_dir, ModelWrapper.read_dataset_config(val)['path'])))
+                for val in datasets.values()}
+
+    def get_input_paths(self, model_config: dict) -> set:
+        # Paths of the input datasets read by a model in the chain, used to find the outputs later models still need
+        return self.get_data_paths(model_config, 'inputs')
+
+    def get_output_paths(self, model_config: dict) -> set:
+        return self.get_data_paths(model_config, 'outputs')
+
+    def get_dependencies(self) -> dict:
+        """
+        Builds the dependency graph of the chain. A model depends on an earlier model in the chain config when it reads
+        a dataset the earlier model saves, saves a dataset the earlier model reads, or saves to the same path. Further
+        dependencies can be declared with depends_on in the chain config
+        :return: dictionary containing the set of models each model depends on
+        """
+        inputs = {name: self.get_input_paths(config) for name, config in self.chain_config.items()}
+        outputs = {name: self.get_output_paths(config) for name, config in self.chain_config.items()}
+
+        dependencies = {}
+        for num, (name, config) in enumerate(self.chain_config.items()):
+            dependencies[name] = {earlier for earlier in list(self.chain_config)[:num] if
+                                  inputs[name] & outputs[earlier] or outputs[name] & inputs[earlier] or
+                                  outputs[name] & outputs[earlier]}
+
+            depends_on = config.get('depends_on') or []
+            depends_on = [depends_on] if isinstance(depends_on, str) else list(depends_on)
+
+            unknown = [model for model in depends_on if model not in self.chain_config]
+            if unknown:
+                raise ValueError(f"Model '{name}' depends on {unknown} which are not models in the chain.")
+
+            dependencies[name] |= set(depends_on)
+
+        self.check_cycles(dependencies)
+
+        return dependencies
+
+    @staticmethod
+    def check_cycles(dependencies: dict) -> None:
+        # Models are removed once everything they depend on is removed, any models left depend on each other
+        remaining = {name: set(val) for name, val in dependencies.items()}
+
+        while True:
+            ready = [name for name, val in remaining.items() if not val & remaining.keys()]
+            if not ready:
+                break
+            for name in ready:
+                del remaining[name]
+
+        if remaining:
+            raise ValueError(f"Models {sorted(remaining)} depend on each other and can not be ordered.")
+
+    @staticmethod
+    def get_downstream(dependencies: dict, name: str) -> set:
+        downstream = set()
+        new = {name}
+
+        while new:
+            new = {model for model, val in dependencies.items() if val & new and model not in downstream}
+            downstream |= new
+
+        return downstream
+
+    def get_memory_estimate(self, model_name: str) -> float:
+        # Models declaring memory_gb in the chain config use it, others are estimated from the size of their inputs
+        memory = self.chain_config[model_name].get('memory_gb')
+
+        if memory is not None:
+            return float(memory) * 1000000000
+
+        size = 0
+        for path in self.get_input_paths(self.chain_config[model_name]):
+            if os.path.isdir(path):
+                size += sum(os.path.getsize(os.path.join(root, file)) for root, _, files in os.walk(path)
+                            for file in files)
+            elif os.path.isfile(path):
+                size += os.path.getsize(path)
+
+        return size
+
+    def get_fingerprint(self, model_name: str) -> str:
+        # Inputs saved by earlier models in the chain are fingerprinted by the run which saved them, Make style, so
+        # large outputs are not hashed again and background saves do not need to finish first
+        model_config = self.chain_config[model_name]
+
+        return fingerprint.fingerprint_model(self.get_model_class(model_config), model_config['model_path'],
+                                             self.read_config(model_config['config']), self.get_data_dir(),
+                                             known_inputs=self.fingerprints)
+
+    def check_up_to_date(self, model_name: str, force: bool) -> tuple:
+        """
+        Fingerprints a model and checks whether its outputs were saved by a run with the same fingerprint. Models which
+        are not up to date have their old fingerprints removed, so outputs left part written by a failed run are never
+        taken to be up to date
+        :param model_name: name of the model in the chain config
+        :param force: run the model even when its outputs are up to date
+        :return: tuple containing the fingerprint of the model and whether its outputs are up to date
+        """
+        model_fingerprint = self.get_fingerprint(model_name)
+        output_paths = self.get_output_paths(self.chain_config[model_name])
+
+        if not force and fingerprint.is_up_to_date(output_paths, model_fingerprint):
+            logger.info(f"Model '{model_name}' is up to date and will not be run.")
+            self.fingerprints.update({path: model_fingerprint for path in output_paths})
+            return model_fingerprint, True
+
+        for path in output_paths:
+            fingerprint.remove_fingerprint(path)
+
+        return model_fingerprint, False
+
+    def save_fingerprint(self, model_name: str, model_fingerprint: str) -> None:
+        for path in self.get_output_paths(self.chain_config[model_name]):
+            fingerprint.write_fingerprint(path, model_fingerprint, model_name)
+            self.fingerprints[path] = model_fingerprint
+
+    def run_chain(self, force: bool = False) -> None:
+        """
+        Runs every model in the chain once every model it depends on has run. Models whose fingerprint is unchanged
+        since their outputs were saved, and whose outputs still exist, are not run again
+        :param force: run every model even when its outputs are up to date
+        """
+        dependencies = self.get_dependencies()
+        self.fingerprints = {}
+
+        for name, val in dependencies.items():
+            if val:
+                logger.info(f"Model '{name}' runs after {sorted(val)}.")
+
+        if self.max_workers > 1:
+            failed, skipped = self.run_chain_parallel(dependencies, force)
+        else:
+            failed, skipped = self.run_chain_sequential(dependencies, force)
+
+        if failed:
+            raise RuntimeError(f"Models {list(failed)} failed to run and downstream models {skipped} were not run, "
+                               f"see above logs.") from next(iter(failed.values()))
+
+    def skip_downstream(self, dependencies: dict, name: str, pending: list, skipped: list) -> None:
+        for model in self.get_downstream(dependencies, name):
+            if model in pending:
+                pending.remove(model)
+                skipped.append(model)
+                logger.warning(f"Model '{model}' will not be run as it depends on model '{name}' which failed.")
+
+    def run_chain_sequential(self, dependencies: dict, force: bool = False) -> tuple:
+        # Outputs are handed to later models in memory for the length of the chain run
+        dataset_registry = DatasetRegistry()
+        pending = list(self.chain_config)
+        completed, failed, skipped = set(), {}, []
+
+        try:
+            while pending:
+                # Models are run in chain config order once every model they depend on has run
+                model_name = next(name for name in pending if dependencies[name] <= completed)
+                pending.remove(model_name)
+                model_config = self.chain_config[model_name]
+
+                headers(f"Executing Model '{model_name}'")
+
+                try:
+                    model_fingerprint, up_to_date = self.check_up_to_date(model_name, force)
+
+                    if not up_to_date:
+                        model_class = self.get_model_class(model_config)
+
+                        deploy_wrapper = DeployWrapper(model_class, self.sys_config_path, model_config['config'],
+                                                       dataset_registry=dataset_registry,
+                                                       log_path=self.log_paths.get(model_name))
+                        deploy_wrapper.run_model()
+
+                        # Fingerprints are only saved once the outputs saving in the background are finished
+                        for path in self.get_output_paths(model_config):
+                            dataset_registry.wait(path)
+                        self.save_fingerprint(model_name, model_fingerprint)
+
+                    completed.add(model_name)
+
+                except Exception as error:
+                    # The log file of a failed model is already closed by DeployWrapper.run_model
+                    logger.error(f"Model '{model_name}' failed with {type(error).__name__}: {error}")
+                    failed[model_name] = error
+                    self.skip_downstream(dependencies, model_name, pending, skipped)
+
+                dataset_registry.release(keep=set().union(*[self.get_input_paths(self.chain_config[name])
+                                                            for name in pending]))
+
+        finally:
+            dataset_registry.close()
+
+        return failed, skipped
+
+    def run_chain_parallel(self, dependencies: dict, force: bool = False) -> tuple:
+        """
+        Runs each model in its own worker process as soon as every model it depends on has run, with at most
+        max_workers models and, where a memory budget is set, the memory budget's worth of models running at once.
+        Datasets are handed between models through the files they save
+        :param dependencies: dictionary containing the set of models each model depends on
+        :param force: run every model even when its outputs are up to date
+        :return: tuple containing the errors of failed models and the list of models skipped as they depend on a
+        failed model
+        """
+        pending = list(self.chain_config)
+        completed, failed, skipped = set(), {}, []
+        running, fingerprints = {}, {}
+
+        # Each model is run in a new process, so nothing one model leaves behind can affect another
+        with ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'),
+                                 max_tasks_per_child=1) as executor:
+
+            while pending or running:
+
+                # Models are fingerprinted as they become ready, models found to be up to date are completed straight
+                # away which can make later models ready in turn
+                checking = [name for name in pending if dependencies[name] <= completed and name not in fingerprints]
+                while checking:
+                    for model_name in checking:
+                        try:
+                            fingerprints[model_name], up_to_date = self.check_up_to_date(model_name, force)
+
+                        except Exception as error:
+                            logger.error(f"Model '{model_name}' failed with {type(error).__name__}: {error}")
+                            pending.remove(model_name)
+                            failed[model_name] = error
+                            self.skip_downstream(dependencies, model_name, pending, skipped)
+                            continue
+
+                        if up_to_date:
+                            pending.remove(model_name)
+                            completed.add(model_name)
+                            del fingerprints[model_name]
+
+                    checking = [name for name in pending if dependencies[name] <= completed and
+                                name not in fingerprints]
+
+                for model_name in [name for name in pending if dependencies[name] <= completed]:
+                    memory = self.get_memory_estimate(model_name)
+                    memory_used = sum(val[1] for val in running.values())
+
+                    if len(running) >= self.max_workers:
+                        break
+
+                    # A model larger than the memory budget is still run once nothing else is running
+                    if running and self.memory_budget is not None and memory_used + memory > self.memory_budget:
+                        continue
+
+                    model_config = self.chain_config[model_name]
+                    future = executor.submit(run_model_process, model_config['model_path'], model_config['model'],
+                                             self.sys_config_path, model_config['config'],
+                                             self.log_paths.get(model_name))
+                    running[future] = (model_name, memory)
+                    pending.remove(model_name)
+
+                    logger.info(f"Model '{model_name}' has started.")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+                for future in finished:
+                    model_name, _ = running.pop(future)
+
+                    try:
+                        logger.info(f"Model '{model_name}' ran successfully in {future.result():0.4f} seconds.")
+                        self.save_fingerprint(model_name, fingerprints.pop(model_name))
+                        completed.add(model_name)
 
-            model_class = self.get_model_class(model_config)
+                    except Exception as error:
+                        logger.error(f"Model '{model_name}' failed with {type(error).__name__}: {error}")
+                        failed[model_name] = error
+                        self.skip_downstream(dependencies, model_name, pending, skipped)
 
-            DeployWrapper(model_class, self.sys_config_path,
-                          model_config['config']).run_model()
+        return failed, skipped
@@ -1,15 +1,24 @@
 import datetime
+import functools
 import logging
 import os
 import time
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 
 from config import PY_ROOT_DIR
+from framework.dataset_registry import DatasetRegistry
+from framework.partition_pool import PartitionPool
 from framework.setup import read_write_data
-from framework.setup.log_format import (headers, create_logging_file, remove_handler,
-                                        create_logging_file_handler_detailed, initiate_logger)
+from framework.setup.duckdb_engine import DuckDBEngine
+from framework.setup.read_cache import ReadCache
+from framework.setup.schema_registry import SchemaRegistry
+from framework.setup.write_data import IStreamWriteData, StreamWriteCSV, StreamWriteParquet, StreamWriteZip
+from framework.setup.log_format import (headers, buffer_logs, replay_logs, create_logging_file_handler_detailed,
+                                        initiate_logger, start_queue_logging, start_run_logging, stop_run_logging,
+                                        log_run)
 
 initiate_logger()
 logger = logging.getLogger()
@@ -20,6 +29,7 @@ class ModelWrapper(ABC):
     def __init__(self):
         self.data_dict = {}
         self.parameters = {}
+        self.engine = None
 
     @property
     def parameters(self) -> dict:
@@ -37,15 +47,146 @@ class ModelWrapper(ABC):
     def data_dict(self, value: dict) -> None:
         self._data_dict = value
 
+    @property
+    def engine(self) -> DuckDBEngine:
+        # Models with type duckdb run their sql through the engine their inputs are read into
+        return self._engine
+
+    @engine.setter
+    def engine(self, value: DuckDBEngine) -> None:
+        self._engine = value
+
     @staticmethod
     def read_schemas(schema_dict: dict) -> dict:
 
-        schema_dict = {key: read_write_data.read_json(path=val) for key, val in schema_dict.items()}
+        # Schemas are compiled once per process and shared, so they are read only
+        schema_dict = {key: SchemaRegistry().read_schema(path=val) for key, val in schema_dict.items()}
 
         return schema_dict
 
     @staticmethod
-    def read_data_to_pandas(model_config: dict, file_schemas: dict, base_path: str) -> dict:
+    def read_dataset_config(dataset_config: str | dict) -> dict:
+        # Datasets are defined in the model config yaml either by their path or by a dictionary containing the path
+        # and optional settings such as an input row filter or output parquet partitioning
+        if isinstance(dataset_config, dict):
+            return dataset_config
+
+        return {'path': dataset_config}
+
+    @staticmethod
+    def wait_for_dataset(path: str, registry: DatasetRegistry = None) -> None:
+        # Files still being saved in the background by an earlier model in a model chain are finished before reading
+        if registry is not None:
+            registry.wait(path)
+
+    @staticmethod
+    def read_file_to_pandas(name: str, path: str, schema: dict, batch_size: int = None,
+                            filters: str = None) -> pd.DataFrame:
+
+        file_type = path.split(".")[-1]
+
+        if file_type in ["csv", "zip"]:
+
+            data = read_write_data.read_csv_to_pandas(path=path, schema=schema, batch_size=batch_size,
+                                                      filters=filters)
+
+        elif file_type in ["pqt", "parquet"]:
+
+            data = read_write_data.read_parquet_to_pandas(path=path, schema=schema, batch_size=batch_size,
+                                                          filters=filters)
+
+        else:
+            raise ValueError(f"Dataset '{name}' has unsupported file type '{file_type}'.")
+
+        return data
+
+    @staticmethod
+    def read_dataset_to_pandas(name: str, path: str, schema: dict, batch_size: int = None, filters: str = None,
+                               dtype_backend: str = 'numpy_nullable', downcast: str = None,
+                               registry: DatasetRegistry = None, cache: ReadCache = None) -> pd.DataFrame:
+
+        logger.info(f"Reading dataset '{name}'.")
+
+        schema = read_write_data.convert_schema_pandas(schema, dtype_backend=dtype_backend)
+
+        # Outputs of earlier models in a model chain are taken from memory unless they are filtered or streamed
+        if registry is not None and path in registry and batch_size is None and filters is None:
+
+            logger.info(f"Dataset '{name}' is taken from the output of an earlier model in the chain.")
+            data = registry.read_to_pandas(path=path, schema=schema)
+
+        else:
+
+            ModelWrapper.wait_for_dataset(path=path, registry=registry)
+
+            def read() -> pd.DataFrame:
+                return ModelWrapper.read_file_to_pandas(name=name, path=path, schema=schema, batch_size=batch_size,
+                                                        filters=filters)
+
+            # Loaded datasets are served from the read cache when it is enabled, streamed datasets are always read
+            if cache is not None and batch_size is None:
+                data = cache.read_to_pandas(path=path, schema=schema, read=read, filters=filters)
+            else:
+                data = read()
+
+        if batch_size is not None:
+            logger.info(f"Dataset '{name}' will be streamed in batches of {batch_size} rows.")
+        else:
+            logger.info(f"Dataset '{name}' is loaded with dimensions: {len(data.columns)} x {len(data)}.")
+
+        # Streamed batches are not downcast, as each batch could be given different datatypes
+        if downcast == 'auto' and batch_size is None:
+            data = read_write_data.downcast_data_types(data)
+            logger.info(f"Dataset '{name}' has been downcast saving {data.attrs['downcast_bytes_saved']} bytes.")
+
+        return data
+
+    @staticmethod
+    def read_data_to_pandas(model_config: dict, file_schemas: dict, base_path: str, max_workers: int = 1,
+                            batch_sizes: dict = None, dtype_backend: str = 'numpy_nullable',
+                            downcast: str = None, registry: DatasetRegistry = None, cache: ReadCache = None) -> dict:
+
+        inputs = {key: ModelWrapper.read_dataset_config(val) for key, val in model_config['inputs'].items()}
+        batch_sizes = {} if batch_sizes is None else batch_sizes
+
+        def read(name: str) -> pd.DataFrame:
+            return ModelWrapper.read_dataset_to_pandas(name=name, path=os.path.join(base_path, inputs[name]['path']),
+                                                       schema=file_schemas[name], batch_size=batch_sizes.get(name),
+                                                       filters=inputs[name].get('filter'), dtype_backend=dtype_backend,
+                                                       downcast=downcast, registry=registry, cache=cache)
+
+        if max_workers <= 1 or len(inputs) <= 1:
+            return {key: read(key) for key in inputs}
+
+        logger.info(f"Reading {len(inputs)} datasets concurrently with {min(max_workers, len(inputs))} workers.")
+
+        def read_buffered(name: str) -> tuple:
+            # Hold back the logs of each dataset so they can be written as one block once all reads finish
+            with buffer_logs() as records:
+                try:
+                    return read(name), records, None
+                except Exception as error:
+                    return None, records, error
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="read_data") as executor:
+            futures = {key: executor.submit(read_buffered, key) for key in inputs}
+
+        data_dict = {}
+        for key, future in futures.items():
+            data, records, error = future.result()
+            replay_logs(records)
+
+            if error is not None:
+                logger.error(f"Failed to read dataset '{key}' from {inputs[key]['path']}.")
+                raise error
+
+            data_dict[key] = data
+
+        return data_dict
+
+    @staticmethod
+    def read_data_to_spark(model_config: dict, file_schemas: dict, base_path: str,
+                           registry: DatasetRegistry = None) -> dict:
 
         data_dict = {}
 
@@ -53,56 +194,292 @@ class ModelWrapper(ABC):
 
             logger.info(f"Reading dataset '{key}'.")
 
-            schema = read_write_data.convert_schema_pandas(file_schemas[key])
-            file_type = val.split(".")[-1]
-            val = os.path.join(base_path, val)
+            dataset = ModelWrapper.read_dataset_config(val)
+            file_type = dataset['path'].split(".")[-1]
+            path = os.path.join(base_path, dataset['path'])
+
+            ModelWrapper.wait_for_dataset(path=path, registry=registry)
 
             if file_type in ["csv", "zip"]:
 
-                data_dict[key] = read_write_data.read_csv_to_pandas(path=val, schema=schema)
+                data_dict[key] = read_write_data.read_csv_to_spark(path=path, schema=file_schemas[key],
+                                                                   filters=dataset.get('filter'))
 
             elif file_type in ["pqt", "parquet"]:
 
-                data_dict[key] = read_write_data.read_parquet_to_pandas(path=val, schema=schema)
+                data_dict[key] = read_write_data.read_parquet_to_spark(path=path, schema=file_schemas[key],
+                                                                       filters=dataset.get('filter'))
 
-            logger.info(
-                f"Dataset '{key}' is loaded with dimensions: {len(data_dict[key].columns)} x {len(data_dict[key])}.")
+            else:
+                raise ValueError(f"Dataset '{key}' has unsupported file type '{file_type}'.")
+
+            # Spark reads lazily, rows are only read from disk once the model's outputs are written
+            logger.info(f"Dataset '{key}' is loaded with {len(data_dict[key].columns)} columns.")
 
         return data_dict
 
     @staticmethod
-    def read_data_to_spark(model_config: dict, file_schemas: dict) -> dict:
-        pass
+    def read_data_to_polars(model_config: dict, file_schemas: dict, base_path: str,
+                            registry: DatasetRegistry = None) -> dict:
+
+        data_dict = {}
+
+        for key, val in model_config['inputs'].items():
+
+            logger.info(f"Reading dataset '{key}'.")
+
+            dataset = ModelWrapper.read_dataset_config(val)
+            file_type = dataset['path'].split(".")[-1]
+            path = os.path.join(base_path, dataset['path'])
+
+            ModelWrapper.wait_for_dataset(path=path, registry=registry)
+
+            if file_type in ["csv", "zip"]:
+
+                data_dict[key] = read_write_data.read_csv_to_polars(path=path, schema=file_schemas[key],
+                                                                    filters=dataset.get('filter'))
+
+            elif file_type in ["pqt", "parquet"]:
+
+                data_dict[key] = read_write_data.read_parquet_to_polars(path=path, schema=file_schemas[key],
+                                                                        filters=dataset.get('filter'))
+
+            else:
+                raise ValueError(f"Dataset '{key}' has unsupported file type '{file_type}'.")
+
+            # Polars scans lazily, rows are only read from disk once the model's outputs are written
+            logger.info(f"Dataset '{key}' is scanned with {len(data_dict[key].collect_schema())} columns.")
+
+        return data_dict
 
     @staticmethod
-    def write_data_from_pandas(data_dict: dict, model_config: dict, file_schemas: dict, base_path: str) -> None:
+    def read_data_to_duckdb(model_config: dict, file_schemas: dict, base_path: str, engine: DuckDBEngine,
+                            registry: DatasetRegistry = None) -> dict:
+
+        data_dict = {}
+
+        for key, val in model_config['inputs'].items():
+
+            logger.info(f"Reading dataset '{key}'.")
+
+            dataset = ModelWrapper.read_dataset_config(val)
+            file_type = dataset['path'].split(".")[-1]
+            path = os.path.join(base_path, dataset['path'])
+
+            # Within a model chain outputs held in memory are registered with duckdb rather than read from disk
+            if registry is not None and path in registry and dataset.get('filter') is None:
+
+                logger.info(f"Dataset '{key}' is registered with duckdb from an earlier model in the model chain.")
+
+                data = engine.register(f"{key}_registered", registry.get(path))
+                data_dict[key] = read_write_data.enforce_data_types_duckdb(data, file_schemas[key], dataframe_name=key)
+
+            elif file_type in ["csv", "zip"]:
+
+                ModelWrapper.wait_for_dataset(path=path, registry=registry)
+                data_dict[key] = read_write_data.read_csv_to_duckdb(connection=engine.connection, path=path,
+                                                                    schema=file_schemas[key],
+                                                                    filters=dataset.get('filter'))
+
+            elif file_type in ["pqt", "parquet"]:
+
+                ModelWrapper.wait_for_dataset(path=path, registry=registry)
+                data_dict[key] = read_write_data.read_parquet_to_duckdb(connection=engine.connection, path=path,
+                                                                        schema=file_schemas[key],
+                                                                        filters=dataset.get('filter'))
+
+            else:
+                raise ValueError(f"Dataset '{key}' has unsupported file type '{file_type}'.")
+
+            # Each dataset can be queried by its name within model sql, rows are only read once the outputs are written
+            engine.create_view(key, data_dict[key])
+            logger.info(f"Dataset '{key}' is available to duckdb with {len(data_dict[key].columns)} columns.")
+
+        return data_dict
+
+    @staticmethod
+    def write_dataset_from_pandas(name: str, data: pd.DataFrame, output: dict, schema: dict, base_path: str) -> None:
+
+        logger.info(f"Writing dataset '{name}' with dimensions {len(data.columns)} x {len(data)}.")
+
+        file_type = output['path'].split(".")[-1]
+        path = os.path.join(base_path, output['path'])
+
+        if file_type in ["csv"]:
+
+            read_write_data.write_csv_from_pandas(data=data, path=path, schema=schema)
+
+        elif file_type in ["pqt", "parquet"]:
+
+            read_write_data.write_parquet_from_pandas(data=data, path=path, schema=schema,
+                                                      partition_cols=output.get('partition_cols'),
+                                                      row_group_size=output.get('row_group_size'),
+                                                      compression=output.get('compression', 'gzip'),
+                                                      target_file_size=output.get('target_file_size'))
+
+        elif file_type in ['zip']:
+
+            read_write_data.write_zip_from_pandas(data=data, path=path, schema=schema)
+
+        logger.info(f"Dataset '{name}' has been saved.")
+
+    @staticmethod
+    def write_data_from_pandas(data_dict: dict, model_config: dict, file_schemas: dict, base_path: str,
+                               registry: DatasetRegistry = None) -> None:
 
         for key, val in model_config['outputs'].items():
 
-            logger.info(f"Writing dataset '{key}' with dimensions {len(data_dict[key].columns)} x "
-                        f"{len(data_dict[key])}.")
+            output = ModelWrapper.read_dataset_config(val)
+
+            if registry is None:
+                ModelWrapper.write_dataset_from_pandas(name=key, data=data_dict[key], output=output,
+                                                       schema=file_schemas[key], base_path=base_path)
+
+            # Within a model chain the output is kept in memory for later models and saved in the background
+            else:
+                registry.register(path=os.path.join(base_path, output['path']), data=data_dict[key],
+                                  save=functools.partial(ModelWrapper.write_dataset_from_pandas, name=key,
+                                                         data=data_dict[key], output=output,
+                                                         schema=file_schemas[key], base_path=base_path))
+
+    @staticmethod
+    def open_writers_from_pandas(model_config: dict, file_schemas: dict, base_path: str,
+                                 registry: DatasetRegistry = None) -> dict:
+
+        writers = {}
+
+        for key, val in model_config['outputs'].items():
 
             schema = file_schemas[key]
-            file_type = val.split(".")[-1]
-            val = os.path.join(base_path, val)
+            output = ModelWrapper.read_dataset_config(val)
+            file_type = output['path'].split(".")[-1]
+            val = os.path.join(base_path, output['path'])
+
+            # Outputs saved incrementally replace any dataset an earlier model in a model chain saved to the same path
+            if registry is not None:
+                registry.discard(val)
+
+            if file_type in ["csv"]:
+
+                writers[key] = StreamWriteCSV(path=val, schema=schema)
+
+            elif file_type in ["pqt", "parquet"]:
+
+                writers[key] = StreamWriteParquet(path=val, schema=schema, partition_cols=output.get('partition_cols'),
+                                                  row_group_size=output.get('row_group_size'),
+                                                  compression=output.get('compression', 'gzip'),
+                                                  target_file_size=output.get('target_file_size'))
+
+            elif file_type in ['zip']:
+
+                writers[key] = StreamWriteZip(path=val, schema=schema)
+
+            logger.info(f"Dataset '{key}' will be saved incrementally to {output['path']}.")
+
+        return writers
+
+    @staticmethod
+    def write_data_from_polars(data_dict: dict, model_config: dict, file_schemas: dict, base_path: str,
+                               registry: DatasetRegistry = None) -> None:
+
+        for key, val in model_config['outputs'].items():
+
+            logger.info(f"Writing dataset '{key}'.")
+
+            output = ModelWrapper.read_dataset_config(val)
+            file_type = output['path'].split(".")[-1]
+            path = os.path.join(base_path, output['path'])
+
+            # Polars outputs replace any dataset an earlier model in a model chain saved to the same path
+            if registry is not None:
+                registry.discard(path)
 
             if file_type in ["csv"]:
 
-                read_write_data.write_csv_from_pandas(data=data_dict[key], path=val, schema=schema)
+                read_write_data.write_csv_from_polars(data=data_dict[key], path=path, schema=file_schemas[key])
 
             elif file_type in ["pqt", "parquet"]:
 
-                read_write_data.write_parquet_from_pandas(data=data_dict[key], path=val, schema=schema)
+                read_write_data.write_parquet_from_polars(data=data_dict[key], path=path, schema=file_schemas[key],
+                                                          partition_cols=output.get('partition_cols'),
+                                                          row_group_size=output.get('row_group_size'),
+                                                          compression=output.get('compression', 'gzip'),
+                                                          target_file_size=output.get('target_file_size'))
 
             elif file_type in ['zip']:
 
-                read_write_data.write_zip_from_pandas(data=data_dict[key], path=val, schema=schema)
+                read_write_data.write_zip_from_polars(data=data_dict[key], path=path, schema=file_schemas[key])
 
             logger.info(f"Dataset '{key}' has been saved.")
 
     @staticmethod
-    def write_data_from_spark(model_config: dict, file_schemas: dict) -> None:
-        pass
+    def write_data_from_duckdb(data_dict: dict, model_config: dict, file_schemas: dict, base_path: str,
+                               engine: DuckDBEngine, registry: DatasetRegistry = None) -> None:
+
+        writers = ModelWrapper.open_writers_from_pandas(model_config=model_config, file_schemas=file_schemas,
+                                                        base_path=base_path, registry=registry)
+
+        try:
+            for key, writer in writers.items():
+
+                logger.info(f"Writing dataset '{key}'.")
+
+                # The query of each output is run here and its result streamed to file in arrow record batches
+                data = read_write_data.enforce_data_types_duckdb(data_dict[key], file_schemas[key], dataframe_name=key)
+
+                for batch in engine.batches(data):
+                    writer.write(batch)
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        for key in writers:
+            logger.info(f"Dataset '{key}' has been saved.")
+
+    @staticmethod
+    def write_data_from_spark(data_dict: dict, model_config: dict, file_schemas: dict, base_path: str,
+                              registry: DatasetRegistry = None) -> None:
+
+        for key, val in model_config['outputs'].items():
+
+            logger.info(f"Writing dataset '{key}'.")
+
+            output = ModelWrapper.read_dataset_config(val)
+            file_type = output['path'].split(".")[-1]
+            path = os.path.join(base_path, output['path'])
+
+            # Spark outputs replace any dataset an earlier model in a model chain saved to the same path
+            if registry is not None:
+                registry.discard(path)
+
+            if file_type in ["csv"]:
+
+                read_write_data.write_csv_from_spark(data=data_dict[key], path=path, schema=file_schemas[key])
+
+            elif file_type in ["pqt", "parquet"]:
+
+                if output.get('row_group_size') is not None or output.get('target_file_size') is not None:
+                    logger.warning(f"Dataset '{key}' defines a row_group_size or target_file_size, which are not "
+                                   f"used by spark. Spark saves a parquet file for each partition of the data.")
+
+                read_write_data.write_parquet_from_spark(data=data_dict[key], path=path, schema=file_schemas[key],
+                                                         partition_cols=output.get('partition_cols'),
+                                                         compression=output.get('compression', 'gzip'))
+
+            elif file_type in ['zip']:
+
+                read_write_data.write_zip_from_spark(data=data_dict[key], path=path, schema=file_schemas[key])
+
+            logger.info(f"Dataset '{key}' has been saved.")
+
+    def define_row_local_input(self) -> str:
+        # Models are run over the full input data unless the wrapper declares an input the model is row-local over
+        return None
+
+    def define_join_keys(self) -> list:
+        # Models are only run in partitions when the wrapper declares the columns the model joins its inputs on
+        return None
 
     @staticmethod
     def data_pre_processing() -> dict:
@@ -131,8 +508,11 @@ class ModelWrapper(ABC):
 
 class DeployWrapper:
 
-    def __init__(self, model_wrapper: ModelWrapper, sys_config: str, model_config: str):
+    def __init__(self, model_wrapper: ModelWrapper, sys_config: str, model_config: str,
+                 dataset_registry: DatasetRegistry = None, log_path: str = None):
         self.model_wrapper = model_wrapper()
+        self.dataset_registry = dataset_registry
+        self.log_path = log_path
         self.sys_config = self.read_config(sys_config)
         self.model_config = self.read_config(model_config)
         self.start_logging()
@@ -140,11 +520,20 @@ class DeployWrapper:
     def start_logging(self) -> None:
         name = self.model_config['parameters']['model_parameters']['log_name']
         path = os.path.join(PY_ROOT_DIR, self.model_config['parameters']['model_parameters']['log_location'])
-        create_logging_file(create_logging_file_handler_detailed, path, name)
+
+        # A log path given for the run, e.g. by the interface so each job writes its own log file, replaces the config's
+        if self.log_path is not None:
+            path, name = os.path.split(os.path.splitext(self.log_path)[0])
+
+        # Log records are formatted and written from a background thread when queue logging is enabled
+        if (self.sys_config.get('logging') or {}).get('queue', False):
+            start_queue_logging()
+
+        # Each run writes its own log file, so models run at the same time in one process do not share log files
+        self.log_run_id = start_run_logging(create_logging_file_handler_detailed, path, name)
 
     def stop_logging(self) -> None:
-        name = self.model_config['parameters']['model_parameters']['log_name']
-        remove_handler(name)
+        stop_run_logging(self.log_run_id)
 
     def get_data_dir(self) -> os.path:
         return os.path.join(PY_ROOT_DIR, self.sys_config['data']['data_folder'])
@@ -160,30 +549,159 @@ class DeployWrapper:
         logger.info(f"Model ID '{log_config['model_id']}' is Running.")
 
     def run_model(self) -> None:
+        # Records logged while the model runs, including by threads replaying their logs, go to this run's log file
+        try:
+            with log_run(self.log_run_id):
+                self.execute_model()
+
+        # The duckdb engine and the run's log file are closed whether or not the model ran successfully
+        finally:
+            self.close_duckdb_engine()
+            self.stop_logging()
+
+    def execute_model(self) -> None:
         start = time.perf_counter()
 
         self.config_logs(self.model_config['parameters']['model_parameters'])
 
+        batch_input = self.get_batch_input()
+
         headers("Reading Input Data")
-        input_data = self.get_inputs()
+        input_data = self.get_inputs(batch_input=batch_input)
         parameters = self.get_parameters()
 
-        self.model_wrapper.data_dict = input_data
         self.model_wrapper.parameters = parameters
 
-        headers("Executing Model")
-        output_data = self.model_wrapper.run_model()
+        partition_keys = self.get_partition_keys(batch_input=batch_input)
+
+        if batch_input is None and partition_keys is None:
+            headers("Executing Model")
+            self.model_wrapper.data_dict = input_data
+            output_data = self.model_wrapper.run_model()
+
+            headers("Writing Output Data")
+            self.post_outputs(data_dict=output_data)
+
+        elif batch_input is None:
+            headers(f"Executing Model in Partitions of {partition_keys}")
+            output_data = PartitionPool(partition_keys=partition_keys,
+                                        max_workers=self.get_partition_workers()).run(
+                model_wrapper=type(self.model_wrapper), input_data=input_data, parameters=parameters)
+
+            headers("Writing Output Data")
+            self.post_outputs(data_dict=output_data)
 
-        headers("Writing Output Data")
-        self.post_outputs(data_dict=output_data)
+        else:
+            headers(f"Executing Model in Batches of '{batch_input}'")
+            self.run_model_in_batches(input_data=input_data, batch_input=batch_input)
 
-        logger.info("Output Data Saved Successfully.")
+        # Only pandas outputs of a model chain are saved in the background
+        if self.dataset_registry is None or batch_input is not None or \
+                self.model_config['parameters']['model_parameters']['type'].lower() != "pandas":
+            logger.info("Output Data Saved Successfully.")
+        else:
+            logger.info("Output Data is being Saved in the Background.")
         headers(f"Model '{self.model_config['parameters']['model_parameters']['model_id']}' Ran Successfully")
 
         end = time.perf_counter()
         logger.info(f"Model execution time: {end - start:0.4f} seconds.")
 
-        self.stop_logging()
+    def run_model_in_batches(self, input_data: dict, batch_input: str) -> None:
+        # The outputs of each batch are checked and appended to the output datasets as soon as they are computed, so
+        # the full outputs are never held in memory
+        output_schemas = self.model_wrapper.read_schemas(schema_dict=self.model_wrapper.define_output_schemas())
+
+        writers = self.model_wrapper.open_writers_from_pandas(model_config=self.model_config['model_data'],
+                                                              file_schemas=output_schemas,
+                                                              base_path=self.get_data_dir(),
+                                                              registry=self.dataset_registry)
+
+        try:
+            for num, batch in enumerate(input_data[batch_input]):
+                logger.info(f"Running model on batch {num + 1} of dataset '{batch_input}' with {len(batch)} rows.")
+
+                self.model_wrapper.data_dict = {**input_data, batch_input: batch}
+
+                output_data = self.check_outputs(data_dict=self.model_wrapper.run_model(),
+                                                 output_schemas=output_schemas)
+
+                self.write_output_batch(data_dict=output_data, writers=writers)
+
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        for key in writers:
+            logger.info(f"Dataset '{key}' has been saved.")
+
+    @staticmethod
+    def write_output_batch(data_dict: dict, writers: dict[str, IStreamWriteData]) -> None:
+
+        for key, writer in writers.items():
+
+            logger.info(f"Writing batch of dataset '{key}' with {len(data_dict[key])} rows.")
+
+            writer.write(data_dict[key])
+
+    def get_batch_input(self) -> str:
+        # Batch execution requires both a batch size in the model config yaml and a row-local model
+        batch_size = self.model_config['parameters']['model_parameters'].get('batch_size')
+        batch_input = self.model_wrapper.define_row_local_input()
+
+        if batch_size is None:
+            return None
+
+        if batch_input is None:
+            logger.warning("A batch size is defined in the model config but the model does not declare a row-local "
+                           "input. The model will be run over the full input data.")
+            return None
+
+        if self.model_config['parameters']['model_parameters']['type'].lower() != "pandas":
+            logger.warning("Batch execution is only available for pandas models. The model will be run over the full "
+                           "input data.")
+            return None
+
+        return batch_input
+
+    def get_partition_keys(self, batch_input: str = None) -> list:
+        # Partitioned execution requires partition keys in the model config yaml which the model joins its inputs on
+        partition_keys = self.model_config['parameters']['model_parameters'].get('partition_keys')
+        join_keys = self.model_wrapper.define_join_keys()
+
+        if partition_keys is None:
+            return None
+
+        partition_keys = [partition_keys] if isinstance(partition_keys, str) else list(partition_keys)
+
+        if join_keys is None:
+            logger.warning("Partition keys are defined in the model config but the model does not declare its join "
+                           "keys. The model will be run over the full input data.")
+            return None
+
+        # Partitions split on any other column would separate rows the model joins together, giving incorrect results
+        invalid_keys = [key for key in partition_keys if key not in join_keys]
+        if invalid_keys:
+            logger.error(f"Partition keys {invalid_keys} are not join keys of the model.")
+            raise ValueError(f"Partition keys must be a subset of the model's join keys {join_keys}, the partition "
+                             f"keys {invalid_keys} are not join keys.")
+
+        if self.model_config['parameters']['model_parameters']['type'].lower() != "pandas":
+            logger.warning("Partitioned execution is only available for pandas models. The model will be run over the "
+                           "full input data.")
+            return None
+
+        if batch_input is not None:
+            logger.warning("Partitioned execution is not used for models run in batches. The model will be run in "
+                           "batches on a single process.")
+            return None
+
+        return partition_keys
+
+    def get_partition_workers(self) -> int:
+        # Number of worker processes the partitions are run on, every core is used when not defined in the config yaml
+        partition_workers = self.model_config['parameters']['model_parameters'].get('partition_workers')
+
+        return None if partition_workers is None else int(partition_workers)
 
     def get_parameters_from_file(self) -> pd.DataFrame:
         # Reading in parameters file defined in model config yaml
@@ -193,7 +711,7 @@ class DeployWrapper:
 
             if self.model_wrapper.define_parameter_schemas() is not None:
 
-                parameters_schema = read_write_data.read_json(path=self.model_wrapper.define_parameter_schemas())
+                parameters_schema = SchemaRegistry().read_schema(path=self.model_wrapper.define_parameter_schemas())
 
                 parameters_path = os.path.join(self.get_data_dir(), parameters_path)
                 parameters_schema = read_write_data.convert_schema_pandas(parameters_schema)
@@ -258,46 +776,175 @@ class DeployWrapper:
 
             raise TypeError(f"Incorrect DataTypes and/or DataColumns see above logs.")
 
-    def post_outputs(self, data_dict: dict) -> None:
+    def check_outputs(self, data_dict: dict, output_schemas: dict) -> dict:
 
         if not isinstance(data_dict, dict):
             raise TypeError(f"Model output is not returning a dictionary of dataframes and is instead returning a "
                             f"{type(data_dict).__name__}.")
 
-        output_schemas = self.model_wrapper.read_schemas(schema_dict=self.model_wrapper.define_output_schemas())
-
         self.memory_usage(data_dict, 'output')
 
+        # Downcast inputs can carry compact datatypes into the outputs, which are cast back to the output schemas
+        if self.get_downcast() is not None:
+            data_dict = self.restore_output_types(data_dict, output_schemas)
+
         self.check_data_conformance(data_dict, output_schemas)
 
+        return data_dict
+
+    def post_outputs(self, data_dict: dict) -> None:
+
+        output_schemas = self.model_wrapper.read_schemas(schema_dict=self.model_wrapper.define_output_schemas())
+
+        data_dict = self.check_outputs(data_dict=data_dict, output_schemas=output_schemas)
+
         if self.model_config['parameters']['model_parameters']['type'].lower() == "pandas":
 
             self.model_wrapper.write_data_from_pandas(data_dict=data_dict, model_config=self.model_config['model_data'],
-                                                      file_schemas=output_schemas, base_path=self.get_data_dir())
+                                                      file_schemas=output_schemas, base_path=self.get_data_dir(),
+                                                      registry=self.dataset_registry)
 
         elif self.model_config['parameters']['model_parameters']['type'].lower() == "pyspark":
 
             self.model_wrapper.write_data_from_spark(data_dict=data_dict, model_config=self.model_config['model_data'],
-                                                     file_schemas=output_schemas, base_path=self.get_data_dir())
+                                                     file_schemas=output_schemas, base_path=self.get_data_dir(),
+                                                     registry=self.dataset_registry)
+
+        elif self.model_config['parameters']['model_parameters']['type'].lower() == "polars":
+
+            # The lazy queries of the model outputs are only run here, as each output is written
+            self.model_wrapper.write_data_from_polars(data_dict=data_dict, model_config=self.model_config['model_data'],
+                                                      file_schemas=output_schemas, base_path=self.get_data_dir(),
+                                                      registry=self.dataset_registry)
+
+        elif self.model_config['parameters']['model_parameters']['type'].lower() == "duckdb":
+
+            # The model's sql is only run here, the engine is closed by run_model once every output has been written
+            self.model_wrapper.write_data_from_duckdb(data_dict=data_dict, model_config=self.model_config['model_data'],
+                                                      file_schemas=output_schemas, base_path=self.get_data_dir(),
+                                                      engine=self.model_wrapper.engine, registry=self.dataset_registry)
+
+    def get_read_workers(self) -> int:
+        # Number of input datasets read concurrently, reading is sequential when not defined in the model config yaml
+        read_workers = self.model_config['parameters']['model_parameters'].get('read_workers')
+
+        return 1 if read_workers is None else int(read_workers)
+
+    def get_dtype_backend(self) -> str:
+        # Pandas datatypes are numpy backed unless the pyarrow backend is defined in the model config yaml
+        dtype_backend = self.model_config['parameters']['model_parameters'].get('dtype_backend', 'numpy_nullable')
+
+        if dtype_backend not in ['numpy_nullable', 'pyarrow']:
+            raise ValueError('Parameter "dtype_backend" is defined incorrectly. dtype_backend can take values '
+                             f'["numpy_nullable", "pyarrow"] and is currently set to {dtype_backend}.')
+
+        return dtype_backend
+
+    def get_downcast(self) -> str:
+        # Numeric inputs keep their schema datatypes unless automatic downcasting is defined in the model config yaml
+        downcast = self.model_config['parameters']['model_parameters'].get('downcast')
+
+        if downcast not in [None, 'auto']:
+            raise ValueError('Parameter "downcast" is defined incorrectly. downcast can take values ["auto"] and is '
+                             f'currently set to {downcast}.')
+
+        return downcast
+
+    def restore_output_types(self, data_dict: dict, output_schemas: dict) -> dict:
+
+        for key, val in data_dict.items():
 
-    def get_inputs(self) -> dict:
+            if isinstance(val, pd.DataFrame) and key in output_schemas:
+
+                schema = read_write_data.convert_schema_pandas(output_schemas[key],
+                                                               dtype_backend=self.get_dtype_backend())
+
+                data_dict[key] = read_write_data.enforce_data_types(val, schema)
+
+        return data_dict
+
+    def get_batch_sizes(self, batch_input: str = None) -> dict:
+
+        if batch_input is None:
+            return {}
+
+        return {batch_input: int(self.model_config['parameters']['model_parameters']['batch_size'])}
+
+    def get_read_cache(self) -> ReadCache:
+        # Parsed inputs are only cached when the read cache is enabled in the system config yaml
+        cache_config = self.sys_config.get('read_cache') or {}
+
+        if not cache_config.get('enabled', False):
+            return None
+
+        return ReadCache(cache_dir=os.path.join(PY_ROOT_DIR, cache_config['cache_folder']),
+                         max_size=int(float(cache_config['max_size_gb']) * 1000000000))
+
+    def get_duckdb_engine(self) -> DuckDBEngine:
+        engine_config = dict(self.sys_config.get('duckdb') or {})
+
+        # Spilled data is written under the project root unless an absolute temporary directory is configured
+        if engine_config.get('temp_directory') is not None:
+            engine_config['temp_directory'] = os.path.join(PY_ROOT_DIR, engine_config['temp_directory'])
+
+        return DuckDBEngine.from_config(engine_config)
+
+    def close_duckdb_engine(self) -> None:
+        # Only duckdb models start an engine, which is started when their inputs are read
+        if self.model_wrapper.engine is not None:
+            self.model_wrapper.engine.close()
+            self.model_wrapper.engine = None
+
+    def get_inputs(self, batch_input: str = None) -> dict:
         input_schemas = self.model_wrapper.read_schemas(schema_dict=self.model_wrapper.define_input_schemas())
+        read_cache = self.get_read_cache()
 
         if self.model_config['parameters']['model_parameters']['type'].lower() == "pandas":
 
             input_data = self.model_wrapper.read_data_to_pandas(model_config=self.model_config['model_data'],
                                                                 file_schemas=input_schemas,
-                                                                base_path=self.get_data_dir())
+                                                                base_path=self.get_data_dir(),
+                                                                max_workers=self.get_read_workers(),
+                                                                batch_sizes=self.get_batch_sizes(batch_input),
+                                                                dtype_backend=self.get_dtype_backend(),
+                                                                downcast=self.get_downcast(),
+                                                                registry=self.dataset_registry, cache=read_cache)
 
         elif self.model_config['parameters']['model_parameters']['type'].lower() == "pyspark":
 
+            # The spark session is started with the settings in the system config yaml before any data is read
+            read_write_data.get_spark_session(config=self.sys_config.get('spark'))
+
             input_data = self.model_wrapper.read_data_to_spark(model_config=self.model_config['model_data'],
                                                                file_schemas=input_schemas,
-                                                               base_path=self.get_data_dir())
+                                                               base_path=self.get_data_dir(),
+                                                               registry=self.dataset_registry)
+
+        elif self.model_config['parameters']['model_parameters']['type'].lower() == "polars":
+
+            input_data = self.model_wrapper.read_data_to_polars(model_config=self.model_config['model_data'],
+                                                                file_schemas=input_schemas,
+                                                                base_path=self.get_data_dir(),
+                                                                registry=self.dataset_registry)
+
+        elif self.model_config['parameters']['model_parameters']['type'].lower() == "duckdb":
+
+            # The duckdb engine is started with the settings in the system config yaml before any data is read
+            self.model_wrapper.engine = self.get_duckdb_engine()
+
+            input_data = self.model_wrapper.read_data_to_duckdb(model_config=self.model_config['model_data'],
+                                                                file_schemas=input_schemas,
+                                                                base_path=self.get_data_dir(),
+                                                                engine=self.model_wrapper.engine,
+                                                                registry=self.dataset_registry)
 
         else:
-            raise ImportError('Parameter "Type" is defined incorrectly. Type can take values ["pandas", "pyspark"] and '
-                              f'is currently set to {self.sys_config["model_parameters"]["type"]}.')
+            raise ImportError('Parameter "Type" is defined incorrectly. Type can take values ["pandas", "pyspark", '
+                              '"polars", "duckdb"] and is currently set to '
+                              f'{self.model_config["parameters"]["model_parameters"]["type"]}.')
+
+        if read_cache is not None:
+            read_cache.log_stats()
 
         self.memory_usage(input_data, 'input')
 
@@ -305,8 +952,17 @@ class DeployWrapper:
 
     @staticmethod
     def memory_usage(data_dict: dict, data_type: str) -> None:
-        memory_usage = sum([df.memory_usage(index=True).sum() for df in data_dict.values()])
-        logger.info(f"Total memory usage of the {data_type} data is {memory_usage * 0.0000000001}GB.")
+        # Datasets streamed in batches are not held in memory and are excluded. Python string values are only counted
+        # with a deep memory inspection, which is needed to compare against arrow backed strings
+        memory_usage = sum([df.memory_usage(index=True, deep=True).sum() for df in data_dict.values()
+                            if isinstance(df, pd.DataFrame)])
+        logger.info(f"Total memory usage of the {data_type} data is {memory_usage * 0.000000001}GB.")
+
+        # Datasets read with automatic downcasting record the bytes saved by their compact datatypes
+        bytes_saved = sum([df.attrs.get('downcast_bytes_saved', 0) for df in data_dict.values()
+                           if isinstance(df, pd.DataFrame)])
+        if bytes_saved > 0:
+            logger.info(f"Downcasting saved {bytes_saved * 0.000000001}GB of the {data_type} data memory usage.")
 
     def run_schema_conformance(self, data_dict: dict, schema_dict: dict) -> dict:
         data_errors = {}
@@ -315,22 +971,37 @@ class DeployWrapper:
 
             if self.model_config['parameters']['model_parameters']['type'].lower() == "pandas":
 
-                schema = read_write_data.convert_schema_output_pandas(schema_dict[key])
+                schema = read_write_data.convert_schema_output_pandas(schema_dict[key],
+                                                                      dtype_backend=self.get_dtype_backend())
 
                 data_errors[key] = read_write_data.schema_conformance_pandas(data=val, schema=schema,
                                                                              dataframe_name=key)
 
-            elif self.model_config['parameters']['model_parameters']['type'].lower() == "spark":
+            elif self.model_config['parameters']['model_parameters']['type'].lower() == "pyspark":
 
                 schema = read_write_data.convert_schema_spark(schema_dict[key])
 
                 data_errors[key] = read_write_data.schema_conformance_spark(data=val, schema=schema, dataframe_name=key)
 
+            elif self.model_config['parameters']['model_parameters']['type'].lower() == "polars":
+
+                schema = read_write_data.convert_schema_polars(schema_dict[key])
+
+                data_errors[key] = read_write_data.schema_conformance_polars(data=val, schema=schema,
+                                                                             dataframe_name=key)
+
+            elif self.model_config['parameters']['model_parameters']['type'].lower() == "duckdb":
+
+                schema = read_write_data.convert_schema_duckdb(schema_dict[key])
+
+                data_errors[key] = read_write_data.schema_conformance_duckdb(data=val, schema=schema,
+                                                                             dataframe_name=key)
+
         return data_errors
 
     @staticmethod
     def read_config(path: str) -> dict:
         path = os.path.join(PY_ROOT_DIR, path)
-        config_dict = read_write_data.read_yaml(path=path)
+        config_dict = SchemaRegistry().read_config(path=path)
 
         return config_dict
@@ -0,0 +1,182 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from framework.joins import normalise_key
+from framework.setup.log_format import buffer_logs, replay_logs
+
+logger = logging.getLogger()
+
+
+def partition_dataset(data: pd.DataFrame, keys: list, partitions: int) -> list:
+    """
+    Hash partitions the rows of a dataset on its key columns, rows sharing the same key values are always given the
+    same partition whichever dataset they are in
+    :param data: pandas dataframe object
+    :param keys: list of the columns to partition on
+    :param partitions: number of partitions
+    :return: list containing the row positions of each partition, in their original order
+    """
+    hashes = pd.util.hash_pandas_object(pd.DataFrame({key: normalise_key(data[key]) for key in keys}),
+                                        index=False).to_numpy()
+
+    partition = hashes % np.uint64(partitions)
+
+    return [np.flatnonzero(partition == num) for num in range(partitions)]
+
+
+def write_table(data: pd.DataFrame, path: str) -> str:
+    # Partitions are exchanged with the worker processes as uncompressed arrow ipc files, which are memory mapped when
+    # read instead of being pickled and copied through the process pool
+    feather.write_feather(pa.Table.from_pandas(data, preserve_index=False), path, compression='uncompressed')
+
+    return path
+
+
+def read_table(path: str) -> pd.DataFrame:
+    # The pandas metadata saved alongside the table restores the original pandas datatypes
+    return feather.read_table(path, memory_map=True).to_pandas()
+
+
+def make_picklable(records: list) -> list:
+    # Log records are sent back from the worker processes with their messages already formatted
+    for record in records:
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+
+    return records
+
+
+def restore_row_order(outputs: list, rows: list) -> pd.DataFrame:
+    """
+    Concatenates the outputs of the partitions, restoring the row order of the driving input when every partition
+    output has one row for each row of the driving input in the partition
+    :param outputs: list containing the pandas dataframe output by each partition
+    :param rows: list containing the row positions of the driving input in each partition, in their original order
+    :return: pandas dataframe in the row order of the driving input, otherwise in partition order
+    """
+    data = pd.concat(outputs, ignore_index=True)
+
+    if rows is None or [len(output) for output in outputs] != [len(val) for val in rows]:
+        return data
+
+    # Each output row is put back at the position its driving input row had before partitioning
+    order = np.empty(len(data), dtype=np.int64)
+    order[np.concatenate(rows)] = np.arange(len(data))
+
+    return data.take(order).reset_index(drop=True)
+
+
+def run_partition(model_wrapper: type, parameters: pd.DataFrame, paths: dict, folder: str, num: int) -> tuple:
+    """
+    Runs the model over a single partition of its inputs within a worker process
+    :param model_wrapper: ModelWrapper class of the model
+    :param parameters: pandas dataframe containing the model parameters
+    :param paths: dictionary containing the arrow ipc file of each input partition
+    :param folder: folder the output partitions are saved to
+    :param num: number of the partition
+    :return: tuple containing the arrow ipc file of each output partition and the log records of the model run
+    """
+    # Hold back the logs of the partition so they are written as one block by the main process
+    with buffer_logs() as records:
+        wrapper = model_wrapper()
+        wrapper.parameters = parameters
+        wrapper.data_dict = {key: read_table(path) for key, path in paths.items()}
+
+        output_data = wrapper.run_model()
+
+        if not isinstance(output_data, dict):
+            raise TypeError(f"Model output is not returning a dictionary of dataframes and is instead returning a "
+                            f"{type(output_data).__name__}.")
+
+        output_paths = {key: write_table(val, os.path.join(folder, f"output-{key}-{num}.arrow"))
+                        for key, val in output_data.items()}
+
+    return output_paths, make_picklable(records)
+
+
+class PartitionPool:
+    """
+    Runs a model over disjoint partitions of its inputs in parallel worker processes. Every input is hash partitioned
+    on the partition keys, so all rows sharing the same key values are given to the same worker. This gives the same
+    results as a single run of the model only when the model combines rows solely on keys which include the partition
+    keys, which is checked against the join keys the model declares.
+
+    The first input is the driving input of the model. The original positions of its rows in each partition are kept
+    by the pool, rather than added to the model inputs, and outputs with one row for each row of the driving input,
+    e.g. after a left merge onto it, are put back in the order of the driving input.
+    """
+
+    def __init__(self, partition_keys: list, max_workers: int = None):
+        self.partition_keys = list(partition_keys)
+        self.max_workers = os.cpu_count() if max_workers is None else int(max_workers)
+
+    def check_inputs(self, input_data: dict) -> None:
+        for key, val in input_data.items():
+
+            if not isinstance(val, pd.DataFrame):
+                raise TypeError(f"Dataset '{key}' is a {type(val).__name__}, partitioned execution requires pandas "
+                                f"dataframes.")
+
+            missing_keys = [col for col in self.partition_keys if col not in val.columns]
+            if missing_keys:
+                raise ValueError(f"Dataset '{key}' is missing the partition keys {missing_keys}.")
+
+    def run(self, model_wrapper: type, input_data: dict, parameters: pd.DataFrame) -> dict:
+        """
+        Runs the model over each partition of its inputs and concatenates the partitioned outputs
+        :param model_wrapper: ModelWrapper class of the model, which is created again within each worker process
+        :param input_data: dictionary containing the input pandas dataframes
+        :param parameters: pandas dataframe containing the model parameters
+        :return: dictionary containing the output pandas dataframes, in the row order of the driving input where
+        the outputs have one row for each of its rows, otherwise in partition order
+        """
+        self.check_inputs(input_data)
+
+        with tempfile.TemporaryDirectory(prefix="partitions_") as folder:
+
+            # Split every input into the same partitions and save them for the worker processes
+            paths = [{} for _ in range(self.max_workers)]
+            driving_rows = None
+            for key, val in input_data.items():
+                partitions = partition_dataset(val, self.partition_keys, self.max_workers)
+                for num, rows in enumerate(partitions):
+                    paths[num][key] = write_table(val.take(rows), os.path.join(folder, f"input-{key}-{num}.arrow"))
+
+                # The row positions of the driving input are kept so its order can be restored in the outputs
+                driving_rows = partitions if driving_rows is None else driving_rows
+
+            logger.info(f"Inputs are split into {self.max_workers} partitions on {self.partition_keys}.")
+
+            # Workers are started fresh rather than forked, as the logging and reader threads already running would be
+            # copied into them in whatever state they are in
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     mp_context=multiprocessing.get_context('spawn')) as executor:
+                futures = [executor.submit(run_partition, model_wrapper, parameters, paths[num], folder, num)
+                           for num in range(self.max_workers)]
+
+                # Results are collected in partition order, so the outputs are the same on every run
+                output_paths = []
+                for num, future in enumerate(futures):
+                    try:
+                        partition_paths, records = future.result()
+                    except Exception:
+                        logger.error(f"Partition {num + 1} of {self.max_workers} failed to run.")
+                        raise
+
+                    logger.info(f"Partition {num + 1} of {self.max_workers} has been run.")
+                    replay_logs(records)
+                    output_paths.append(partition_paths)
+
+            output_data = {key: restore_row_order([read_table(partition[key]) for partition in output_paths],
+                                                  driving_rows) for key in output_paths[0]}
+
+        return output_data
@@ -0,0 +1,87 @@
+import logging
+import os
+
+import pyarrow as pa
+
+from framework.setup import read_write_data
+
+logger = logging.getLogger()
+
+
+class DuckDBEngine:
+    """
+    Embedded duckdb database used by models with type duckdb. Input files are queried in place and in memory arrow
+    datasets are registered without being copied, so models express their joins and aggregations as sql which duckdb
+    runs within a fixed memory limit, spilling to the temporary directory once the limit is reached. Results are read
+    back as arrow record batches so outputs can be written without holding the full result in memory. The row order of
+    results is not guaranteed unless the sql orders them.
+    """
+
+    def __init__(self, memory_limit: str = None, temp_directory: str = None, threads: int = None,
+                 batch_size: int = 1000000):
+        if read_write_data.duckdb is None:
+            raise ImportError("Models with type duckdb require duckdb to be installed.")
+
+        # Insertion order is not kept so results can spill to disk without reordering rows, joins and aggregations
+        # reorder rows whatever this setting, so outputs are only in a fixed order when the model's sql orders them
+        config = {'preserve_insertion_order': False}
+        if memory_limit is not None:
+            config['memory_limit'] = str(memory_limit)
+        if temp_directory is not None:
+            os.makedirs(temp_directory, exist_ok=True)
+            config['temp_directory'] = temp_directory
+        if threads is not None:
+            config['threads'] = int(threads)
+
+        self.connection = read_write_data.duckdb.connect(database=":memory:", config=config)
+        self.batch_size = batch_size
+
+        logger.info(f"Started duckdb engine with memory limit {self.setting('memory_limit')} and "
+                    f"{self.setting('threads')} threads, spilling to {self.setting('temp_directory')}.")
+
+    @classmethod
+    def from_config(cls, config: dict = None) -> "DuckDBEngine":
+        """
+        Creates an engine from the duckdb section of the system config
+        :param config: dictionary containing the memory_limit, temp_directory, threads and batch_size settings
+        :return: duckdb engine
+        """
+        config = config or {}
+
+        return cls(memory_limit=config.get('memory_limit'), temp_directory=config.get('temp_directory'),
+                   threads=config.get('threads'), batch_size=config.get('batch_size', 1000000))
+
+    def setting(self, name: str) -> str:
+        return self.connection.sql(f"SELECT current_setting({read_write_data.quote_literal(name)})").fetchone()[0]
+
+    def register(self, name: str, data: any) -> any:
+        """
+        Registers an in memory dataset as a view, arrow tables are scanned in place rather than copied
+        :param name: name the dataset is queried by
+        :param data: pyarrow table or pandas dataframe
+        :return: duckdb relation over the dataset
+        """
+        self.connection.register(name, data)
+
+        return self.connection.view(name)
+
+    def create_view(self, name: str, relation: any) -> any:
+        """
+        Names a relation so model sql can refer to it, the relation's query is only run when the view is queried
+        :param name: name the dataset is queried by
+        :param relation: duckdb relation
+        :return: the passed relation
+        """
+        relation.create_view(name, replace=True)
+
+        return relation
+
+    def sql(self, query: str) -> any:
+        return self.connection.sql(query)
+
+    def batches(self, relation: any) -> pa.RecordBatchReader:
+        # Results are streamed in batches so they are never held in memory in full
+        return relation.to_arrow_reader(self.batch_size)
+
+    def close(self) -> None:
+        self.connection.close()
@@ -1,14 +1,49 @@
+import atexit
+import contextvars
 import datetime
 import logging
 import math
 import os
+import queue
 import re
 import sys
+import threading
+import uuid
+from contextlib import contextmanager
 from logging import LogRecord
+from logging.handlers import QueueHandler, QueueListener
 from typing import Callable
 
+DETAILED_FORMAT = "[%(asctime)s] %(levelname)s [%(name)s.%(module)s.%(funcName)s: %(lineno)d] %(message)s"
+SIMPLE_FORMAT = "%(message)s"
 
-class CustomFormatter(logging.Formatter):
+_log_buffer = threading.local()
+
+# Listener writing the queued log records from a background thread, set while queue logging is running
+_queue_listener = None
+_queue_lock = threading.Lock()
+
+# Id of the model run the current thread or asyncio task is logging for, stamped onto every log record it creates
+_log_run = contextvars.ContextVar('log_run', default=None)
+
+
+class LayoutFormatter(logging.Formatter):
+    """
+    Formats records logged with extra={'simple': True} with the simple layout and all other records with the handler's
+    own layout, so the formatters of the handlers never need to be swapped to write headers and lines
+    """
+
+    def __init__(self, fmt: str = DETAILED_FORMAT):
+        super().__init__(fmt)
+        self.simple = logging.Formatter(SIMPLE_FORMAT)
+
+    def format(self, record) -> str:
+        if getattr(record, 'simple', False):
+            return self.simple.format(record)
+        return super().format(record)
+
+
+class CustomFormatter(LayoutFormatter):
     grey = '\x1b[38;21m'
     blue = '\x1b[38;5;39m'
     yellow = '\x1b[38;5;226m'
@@ -17,7 +52,7 @@ class CustomFormatter(logging.Formatter):
     reset = '\x1b[0m'
 
     def __init__(self, fmt):
-        super().__init__()
+        super().__init__(fmt)
         self.fmt = fmt
         self.FORMATS = {
             logging.DEBUG: self.grey + self.fmt + self.reset,
@@ -26,11 +61,14 @@ class CustomFormatter(logging.Formatter):
             logging.ERROR: self.red + self.fmt + self.reset,
             logging.CRITICAL: self.bold_red + self.fmt + self.reset
         }
+        # The formatter of each level is built once rather than for every record
+        self.formatters = {level: logging.Formatter(log_fmt) for level, log_fmt in self.FORMATS.items()}
 
-    def format(self, record) -> logging.Formatter.format:
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
-        return formatter.format(record)
+    def format(self, record) -> str:
+        # Headers and lines are written to the console without colour
+        if getattr(record, 'simple', False):
+            return self.simple.format(record)
+        return self.formatters.get(record.levelno, self.simple).format(record)
 
 
 def headers(message: str) -> None:
@@ -39,52 +77,25 @@ def headers(message: str) -> None:
     line_num_end = line_num_start if len(message) % 2 == 0 else line_num_start + 1
     lines_start = ''.join(['-' for _ in range(line_num_start)])
     lines_end = ''.join(['-' for _ in range(line_num_end)])
-    print()
-    print(lines_start + ' ' + message + ' ' + lines_end)
-    print()
 
-    simple_file_format()
-    logging.info("", extra={'block': ['console']})
-    logging.info(lines_start + ' ' + message + ' ' + lines_end + "\n", extra={'block': ['console']})
-    detailed_file_format()
+    # Records marked as simple are written without the detailed layout by every handler
+    logging.info("", extra={'simple': True})
+    logging.info(lines_start + ' ' + message + ' ' + lines_end + "\n", extra={'simple': True})
 
 
 def lines() -> None:
     output = "".join(["-" for _ in range(152)])
 
-    print(output)
-
-    simple_file_format()
-    logging.info(output, extra={'block': ['console']})
-    detailed_file_format()
+    logging.info(output, extra={'simple': True})
 
 
 def no_format(message: str) -> None:
-    simple_file_format()
-    logging.info(message, extra={'block': ['console']})
-    print(message)
-    detailed_file_format()
-
-
-def detailed_file_format() -> None:
-    for handler in logging.getLogger().handlers:
-        if isinstance(handler, logging.FileHandler):
-            fl_format = logging.Formatter("[%(asctime)s] %(levelname)s [%(name)s.%(module)s.%(funcName)s:"
-                                          " %(lineno)d] %(message)s")
-            handler.setFormatter(fl_format)
-
-
-def simple_file_format() -> None:
-    for handler in logging.getLogger().handlers:
-        if isinstance(handler, logging.FileHandler):
-            handler.setFormatter(logging.Formatter('%(message)s'))
+    logging.info(message, extra={'simple': True})
 
 
 def create_logging_file_handler_detailed(path: str) -> logging.FileHandler:
     fl_handler = logging.FileHandler(path, 'w+')
-    fl_format = logging.Formatter("[%(asctime)s] %(levelname)s [%(name)s.%(module)s.%(funcName)s:"
-                                  " %(lineno)d] %(message)s")
-    fl_handler.setFormatter(fl_format)
+    fl_handler.setFormatter(LayoutFormatter(DETAILED_FORMAT))
     fl_handler.setLevel(logging.DEBUG)
     fl_handler.addFilter(build_handler_filters('file'))
     return fl_handler
@@ -92,14 +103,13 @@ def create_logging_file_handler_detailed(path: str) -> logging.FileHandler:
 
 def create_logging_file_handler_simple(path: str) -> logging.FileHandler:
     fl_handler = logging.FileHandler(path, 'w+')
-    fl_format = logging.Formatter("%(message)s")
-    fl_handler.setFormatter(fl_format)
+    fl_handler.setFormatter(LayoutFormatter(SIMPLE_FORMAT))
     fl_handler.setLevel(logging.DEBUG)
     fl_handler.addFilter(build_handler_filters('file'))
     return fl_handler
 
 
-def create_logging_file(file_handler, path: str, name: str, data_name: str = None) -> None:
+def format_log_name(name: str, data_name: str = None) -> str:
     format_dict = {}
     if '{date}' in name:
         format_dict['date'] = datetime.date.today()
@@ -110,15 +120,20 @@ def create_logging_file(file_handler, path: str, name: str, data_name: str = Non
     if format_dict:
         name = name.format(**format_dict)
 
-    if sum([1 for handler in logging.getLogger().handlers if name in str(handler)]) < 1:
+    return name
+
+
+def create_logging_file(file_handler, path: str, name: str, data_name: str = None) -> None:
+    name = format_log_name(name, data_name)
+
+    if sum([1 for handler in get_handlers() if name in str(handler)]) < 1:
         fil_handler = file_handler(os.path.join(path, name) + ".log")
-        logging.getLogger().addHandler(fil_handler)
+        add_handler(fil_handler)
 
 
 def create_logging_sys_handler_detailed() -> logging.StreamHandler:
     sys_handler = logging.StreamHandler(sys.stdout)
-    cn_format = CustomFormatter(
-        "[%(asctime)s] %(levelname)s [%(name)s.%(module)s.%(funcName)s: %(lineno)d] %(message)s")
+    cn_format = CustomFormatter(DETAILED_FORMAT)
     sys_handler.setFormatter(cn_format)
     sys_handler.setLevel(logging.DEBUG)
     sys_handler.addFilter(build_handler_filters('console'))
@@ -127,19 +142,44 @@ def create_logging_sys_handler_detailed() -> logging.StreamHandler:
 
 def create_logging_sys_handler_simple() -> logging.StreamHandler:
     sys_handler = logging.StreamHandler(sys.stdout)
-    cn_format = CustomFormatter("%(message)s")
+    cn_format = CustomFormatter(SIMPLE_FORMAT)
     sys_handler.setFormatter(cn_format)
     sys_handler.setLevel(logging.DEBUG)
     sys_handler.addFilter(build_handler_filters('console'))
     return sys_handler
 
 
+def get_handlers() -> list:
+    """
+    Finds the handlers writing log records, which are held by the queue listener while queue logging is running
+    :return: list of logging handlers
+    """
+    listener = _queue_listener
+    return list(listener.handlers) if listener is not None else list(logging.getLogger().handlers)
+
+
+def add_handler(handler: logging.Handler) -> None:
+    with _queue_lock:
+        if _queue_listener is None:
+            logging.getLogger().addHandler(handler)
+        else:
+            # The listener thread reads its handlers once per record, so they are replaced rather than changed in place
+            _queue_listener.handlers = _queue_listener.handlers + (handler,)
+
+
 def remove_handler(name) -> None:
     name = re.sub("\{.*?\}", "", name)
 
-    for handler in logging.getLogger().handlers:
-        if name in str(handler):
-            logging.getLogger().removeHandler(handler)
+    # Queued records are written before their handler is removed, so log files are complete once a model finishes
+    flush_logs()
+
+    with _queue_lock:
+        for handler in get_handlers():
+            if name in str(handler):
+                if _queue_listener is None:
+                    logging.getLogger().removeHandler(handler)
+                else:
+                    _queue_listener.handlers = tuple(val for val in _queue_listener.handlers if val is not handler)
 
 
 def build_handler_filters(handler: str) -> Callable[[LogRecord], bool]:
@@ -152,6 +192,268 @@ def build_handler_filters(handler: str) -> Callable[[LogRecord], bool]:
     return handler_filter
 
 
+def is_buffering_logs() -> bool:
+    return getattr(_log_buffer, 'records', None) is not None
+
+
+def build_buffer_filter() -> Callable[[LogRecord], bool]:
+    def buffer_filter(record: logging.LogRecord) -> bool:
+        # Hold back records logged by a thread that is buffering its logs
+        if is_buffering_logs():
+            _log_buffer.records.append(record)
+            return False
+        return True
+
+    return buffer_filter
+
+
+@contextmanager
+def buffer_logs() -> list:
+    """
+    Holds back the log records emitted by the current thread so that they can be replayed as one block
+    :return: list which is filled with the held back log records
+    """
+    _log_buffer.records = []
+    try:
+        yield _log_buffer.records
+    finally:
+        _log_buffer.records = None
+
+
+def replay_logs(records: list) -> None:
+    """
+    Emits log records previously held back by buffer_logs in their original order
+    :param records: list of log records
+    """
+    for record in records:
+        # Records logged by worker threads belong to the model run replaying them
+        if getattr(record, 'run_id', None) is None:
+            record.run_id = _log_run.get()
+
+        logging.getLogger().handle(record)
+
+
 def initiate_logger() -> None:
     logging.getLogger().setLevel(logging.DEBUG)
-    logging.getLogger().addHandler(create_logging_sys_handler_detailed())
+    logging.getLogger().addFilter(build_buffer_filter())
+    add_handler(create_logging_sys_handler_detailed())
+
+
+class FlushRequest:
+    # Placed on the log queue to find out when every record queued before it has been written
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class LogQueueListener(QueueListener):
+
+    def handle(self, record) -> None:
+        if isinstance(record, FlushRequest):
+            record.done.set()
+            return
+
+        super().handle(record)
+
+
+def is_queue_logging() -> bool:
+    return _queue_listener is not None
+
+
+def start_queue_logging() -> None:
+    """
+    Moves the formatting and writing of log records to a background thread. The root logger is left with a single
+    handler which puts each record on a queue, and the handlers it had are given to a listener which writes the
+    queued records in order. Handlers added or removed later through create_logging_file and remove_handler are
+    given to, or taken from, the listener. Starting queue logging again while it is running has no effect
+    """
+    global _queue_listener
+
+    with _queue_lock:
+        if _queue_listener is not None:
+            return
+
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        log_queue = queue.SimpleQueue()
+
+        # Handler levels are kept, e.g. the console handler of a model run within a model chain only writes warnings
+        listener = LogQueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+
+        root.addHandler(QueueHandler(log_queue))
+        for handler in handlers:
+            root.removeHandler(handler)
+
+        _queue_listener = listener
+
+    # Records still queued when python exits are written before the handlers are closed
+    atexit.register(stop_queue_logging)
+
+
+def stop_queue_logging() -> None:
+    """
+    Writes every queued log record, stops the background thread and gives the handlers back to the root logger
+    """
+    global _queue_listener
+
+    with _queue_lock:
+        if _queue_listener is None:
+            return
+
+        listener, _queue_listener = _queue_listener, None
+
+        # Records logged from here on are written directly, those already queued are written before the thread stops
+        root = logging.getLogger()
+        for handler in listener.handlers:
+            root.addHandler(handler)
+        for handler in [val for val in root.handlers if isinstance(val, QueueHandler) and val.queue is listener.queue]:
+            root.removeHandler(handler)
+
+        listener.stop()
+
+
+def flush_logs() -> None:
+    """
+    Waits until every log record queued so far has been written, does nothing when queue logging is not running
+    """
+    listener = _queue_listener
+
+    if listener is None:
+        return
+
+    request = FlushRequest()
+    listener.queue.put_nowait(request)
+
+    # A listener stopped in the meantime writes its queued records as it stops, so its requests are not waited on
+    while not request.done.wait(0.1):
+        if _queue_listener is not listener:
+            return
+
+
+class RunRoutingHandler(logging.Handler):
+    """
+    Writes each log record to the log file of the model run it was logged for, found from the run id stamped on the
+    record when it was created. Records logged outside a model run are left to the other handlers, so models run at
+    the same time in one process, from threads or asyncio tasks, each write a separate log file
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.routes = {}
+        self.files = {}
+        self.routes_lock = threading.Lock()
+
+    def open_run(self, run_id: str, path: str, file_handler: Callable[[str], logging.FileHandler]) -> None:
+        # Runs logging to the same file, e.g. two runs of one model config, share its handler
+        path = os.path.abspath(path)
+
+        with self.routes_lock:
+            if path not in self.files:
+                self.files[path] = {'handler': file_handler(path), 'runs': set()}
+
+            self.files[path]['runs'].add(run_id)
+            self.routes[run_id] = self.files[path]['handler']
+
+    def close_run(self, run_id: str) -> None:
+        with self.routes_lock:
+            handler = self.routes.pop(run_id, None)
+
+            if handler is None:
+                return
+
+            path = os.path.abspath(handler.baseFilename)
+            self.files[path]['runs'].discard(run_id)
+
+            if self.files[path]['runs']:
+                return
+
+            del self.files[path]
+
+        handler.close()
+
+    def handle(self, record) -> bool:
+        handler = self.routes.get(getattr(record, 'run_id', None))
+
+        if handler is not None and record.levelno >= handler.level:
+            handler.handle(record)
+
+        return handler is not None
+
+    def emit(self, record) -> None:
+        self.handle(record)
+
+
+_run_router = RunRoutingHandler()
+_run_lock = threading.Lock()
+_stamping_run_ids = False
+
+
+def stamp_run_id(factory: Callable[..., LogRecord]) -> Callable[..., LogRecord]:
+    # Records are stamped where they are created, as queued records are written from another thread
+    def record_factory(*args, **kwargs) -> LogRecord:
+        record = factory(*args, **kwargs)
+        # Records already stamped by another record factory keep their run id unless this context has one
+        run_id = _log_run.get()
+        if run_id is not None or not hasattr(record, 'run_id'):
+            record.run_id = run_id
+        return record
+
+    return record_factory
+
+
+def enable_run_logging() -> None:
+    global _stamping_run_ids
+
+    with _run_lock:
+        if not _stamping_run_ids:
+            logging.setLogRecordFactory(stamp_run_id(logging.getLogRecordFactory()))
+            _stamping_run_ids = True
+
+        if _run_router not in get_handlers():
+            add_handler(_run_router)
+
+
+def get_log_run() -> str:
+    return _log_run.get()
+
+
+def start_run_logging(file_handler: Callable[[str], logging.FileHandler], path: str, name: str,
+                      data_name: str = None) -> str:
+    """
+    Opens the log file of a model run. Records are written to it while the run's id is set with log_run
+    :param file_handler: function creating the file handler from the path of the log file
+    :param path: folder the log file is written to
+    :param name: name of the log file without its extension, which may contain {date} and {data}
+    :param data_name: name of the dataset replacing {data} in the name of the log file
+    :return: id of the model run
+    """
+    enable_run_logging()
+
+    run_id = uuid.uuid4().hex
+    _run_router.open_run(run_id, os.path.join(path, format_log_name(name, data_name)) + ".log", file_handler)
+
+    return run_id
+
+
+def stop_run_logging(run_id: str) -> None:
+    """
+    Writes any queued records of a model run and closes its log file, once no other run is writing to the same file
+    :param run_id: id of the model run
+    """
+    flush_logs()
+    _run_router.close_run(run_id)
+
+
+@contextmanager
+def log_run(run_id: str) -> str:
+    """
+    Sets the model run which the records logged by the current thread or asyncio task are written for. Threads started
+    within the run take part in it when started with contextvars.copy_context().run
+    :param run_id: id of the model run
+    :return: id of the model run
+    """
+    token = _log_run.set(run_id)
+    try:
+        yield run_id
+    finally:
+        _log_run.reset(token)
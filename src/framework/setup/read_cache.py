@@ -0,0 +1,185 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from framework.setup import read_write_data
+
+logger = logging.getLogger()
+
+# Increment when the layout of cached files changes so older entries are no longer served
+CACHE_VERSION = 1
+
+# File in the cache folder storing the content hashes of input files, keyed by their path, size and modified time
+FINGERPRINT_FILE = "fingerprints.json"
+
+
+class ReadCache:
+    """
+    On disk cache of parsed input datasets. Entries are keyed by the content of the input file, the schema and the
+    reader options, and hold the typed data as uncompressed arrow ipc (feather) files which are memory mapped when
+    read. The least recently used entries are evicted once the cache exceeds its maximum size.
+    """
+
+    def __init__(self, cache_dir: str, max_size: int):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self.fingerprints = self.read_fingerprints()
+
+    def read_fingerprints(self) -> dict:
+        path = os.path.join(self.cache_dir, FINGERPRINT_FILE)
+
+        if not os.path.isfile(path):
+            return {}
+
+        with open(path) as file:
+            return json.load(file)
+
+    def write_fingerprints(self) -> None:
+        path = os.path.join(self.cache_dir, FINGERPRINT_FILE)
+
+        with self.lock:
+            with open(f"{path}.{threading.get_ident()}.tmp", 'w') as file:
+                json.dump(self.fingerprints, file)
+            os.replace(f"{path}.{threading.get_ident()}.tmp", path)
+
+    def hash_file(self, path: str) -> str:
+        # Files are only re-hashed when their size or modified time changes
+        stat = os.stat(path)
+        stat_key = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+        if stat_key not in self.fingerprints:
+            digest = hashlib.blake2b(digest_size=32)
+            with open(path, 'rb') as file:
+                for chunk in iter(lambda: file.read(1 << 20), b""):
+                    digest.update(chunk)
+
+            # Hashes of earlier versions of the file are no longer needed
+            with self.lock:
+                for stale_key in [key for key in self.fingerprints if key.startswith(f"{os.path.abspath(path)}|")]:
+                    del self.fingerprints[stale_key]
+                self.fingerprints[stat_key] = digest.hexdigest()
+
+        return self.fingerprints[stat_key]
+
+    def fingerprint(self, path: str) -> str:
+        # Directories of parquet files are fingerprinted on the names and contents of every file they contain
+        if os.path.isdir(path):
+            files = sorted(os.path.join(root, name) for root, _, names in os.walk(path) for name in names)
+        else:
+            files = [path]
+
+        digest = hashlib.blake2b(digest_size=32)
+        for file in files:
+            digest.update(os.path.relpath(file, path).encode())
+            digest.update(self.hash_file(file).encode())
+
+        return digest.hexdigest()
+
+    def get_key(self, path: str, schema: dict, options: dict) -> str:
+        key = {'version': CACHE_VERSION, 'file': self.fingerprint(path),
+               'schema': {column: str(dtype) for column, dtype in schema.items()},
+               'options': {option: str(value) for option, value in options.items()}}
+
+        return hashlib.blake2b(json.dumps(key, sort_keys=True).encode(), digest_size=32).hexdigest()
+
+    def read_to_pandas(self, path: str, schema: dict, read: callable, **options) -> pd.DataFrame:
+        """
+        Reads a dataset from the cache, or reads it with the passed reader and caches the result
+        :param path: path to the input file or directory
+        :param schema: dictionary containing column datatypes, as converted for pandas
+        :param read: function reading the dataset into a pandas dataframe when it is not cached
+        :param options: reader options which change the result, e.g. filters
+        :return: pandas dataframe object
+        """
+        key = self.get_key(path, schema, options)
+        entry = os.path.join(self.cache_dir, f"{key}.arrow")
+
+        if os.path.isfile(entry):
+            with self.lock:
+                self.hits += 1
+
+            # Mark the entry as recently used
+            os.utime(entry)
+            logger.info(f"Dataset {path} is read from the read cache.")
+
+            table = feather.read_table(entry, memory_map=True)
+            data = table.to_pandas(types_mapper=read_write_data.pandas_types_mapper(schema))
+
+            return read_write_data.enforce_data_types(data, schema)
+
+        with self.lock:
+            self.misses += 1
+
+        data = read()
+        self.store(entry, data, path)
+
+        return data
+
+    def store(self, entry: str, data: pd.DataFrame, path: str) -> None:
+        # Entries are written uncompressed so they can be memory mapped, and renamed into place once complete. The
+        # input path is kept in the metadata so entries can be identified when inspecting the cache
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'source': path.encode()})
+        feather.write_feather(table, f"{entry}.{threading.get_ident()}.tmp", compression='uncompressed')
+        os.replace(f"{entry}.{threading.get_ident()}.tmp", entry)
+
+        self.write_fingerprints()
+        self.evict()
+
+    def entries(self) -> list:
+        # Cached datasets ordered from the least to the most recently used
+        entries = [{'key': name[:-len(".arrow")], 'size': os.path.getsize(os.path.join(self.cache_dir, name)),
+                    'last_used': os.path.getmtime(os.path.join(self.cache_dir, name))}
+                   for name in os.listdir(self.cache_dir) if name.endswith(".arrow")]
+
+        return sorted(entries, key=lambda entry: entry['last_used'])
+
+    def get_source(self, key: str) -> str:
+        metadata = pa.ipc.open_file(pa.memory_map(os.path.join(self.cache_dir, f"{key}.arrow"))).schema.metadata
+
+        return (metadata or {}).get(b'source', b"").decode()
+
+    def evict(self) -> None:
+        entries = self.entries()
+        size = sum(entry['size'] for entry in entries)
+
+        with self.lock:
+            for entry in entries:
+                if size <= self.max_size:
+                    break
+
+                os.remove(os.path.join(self.cache_dir, f"{entry['key']}.arrow"))
+                size -= entry['size']
+                logger.info(f"Evicted read cache entry {entry['key']} to stay within the cache size limit.")
+
+    def clear(self) -> None:
+        for entry in self.entries():
+            os.remove(os.path.join(self.cache_dir, f"{entry['key']}.arrow"))
+
+        self.fingerprints = {}
+        self.write_fingerprints()
+
+    def log_stats(self) -> None:
+        logger.info(f"Read cache had {self.hits} hits and {self.misses} misses.")
+
+    def describe(self) -> str:
+        entries = self.entries()
+        lines = [f"Read cache {self.cache_dir}: {len(entries)} entries, "
+                 f"{sum(entry['size'] for entry in entries) * 0.000001:0.1f}MB of {self.max_size * 0.000001:0.1f}MB."]
+        lines += [f"  {entry['key'][:16]}  {entry['size'] * 0.000001:10.1f}MB  last used "
+                  f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['last_used']))}  "
+                  f"{self.get_source(entry['key'])}" for entry in entries[::-1]]
+
+        return "\n".join(lines)
@@ -6,6 +6,8 @@ from abc import ABC, abstractmethod
 import pandas as pd
 import yaml
 
+from framework.setup import read_write_data
+
 logger = logging.getLogger()
 
 
@@ -21,74 +23,14 @@ class IReadFile2Pandas(IReadFile):
         pass
 
     @staticmethod
-    def enforce_integers(df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Standardises the integer fields in any given dataframe
-        :param df: pandas dataframe object
-        :return: pandas dataframe with standardised integer fields
-        """
-
-        # Loop through each column and standardise integer fields
-        for column in df.columns:
-            if df[column].dtype == "Int64" and df[column].isna().all():
-                df[column] = pd.NA
-                df[column] = df[column].astype('Int64')
-            elif df[column].dtype == "Int64" and df[column].isna().any():
-                df[column] = df[column].astype('Int64')
-            elif df[column].dtype == "Int64":
-                df[column] = df[column].astype('Int64')
-
-        # Return a dataframe with standardised integer fields
-        return df
-
-    @staticmethod
-    def enforce_floats(df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Standardises the float fields in any given dataframe
-        :param df: pandas dataframe object
-        :return: pandas dataframe with standardised float fields
-        """
-        # Loop through each column and standardise float fields
-        for column in df.columns:
-            if df[column].dtype == "Float64":
-                df[column] = df[column].astype("Float64")
-
-        # Return a dataframe with standardised float fields
-        return df
-
-    @staticmethod
-    def enforce_strings(df: pd.DataFrame) -> pd.DataFrame:
-        """
-        Standardises the string fields in any given dataframe
-        :param df: pandas dataframe object
-        :return: pandas dataframe with standardised string fields
-        """
-        # Loop through each column and standardise string fields
-        for column in df.columns:
-            if df[column].dtype in ["string", "object"]:
-                df[column] = df[column].mask(df[column] == "")
-                df[column] = df[column].mask(df[column].str.lower() == "nan")
-
-        # Return a dataframe with standardised string fields
-        return df
-
-    def enforce_data_types(self, df: pd.DataFrame) -> pd.DataFrame:
+    def enforce_data_types(df: pd.DataFrame, schema: dict = None) -> pd.DataFrame:
         """
         Standardises the values in each column of the passed dataset
         :param df: pandas dataset object
+        :param schema: dictionary containing column datatypes
         :return: pandas dataset with standardised values
         """
-        # Standardise integer values
-        df = self.enforce_integers(df)
-
-        # Standardise float values
-        df = self.enforce_floats(df)
-
-        # Standardise string values
-        df = self.enforce_strings(df)
-
-        # Return a dataframe with standardised values
-        return df
+        return read_write_data.enforce_data_types(df, schema)
 
 
 class ReadCSV2Pandas(IReadFile2Pandas):
@@ -118,12 +60,8 @@ class ReadCSV2Pandas(IReadFile2Pandas):
         # Read the csv data into a pandas dataframe object
         data = pd.read_csv(**parameters)
 
-        # Apply datetime formatting to date columns - coerce nulls to pd.NaT
-        for col in [key for key, val in schema.items() if val == "datetime64[s]"]:
-            data[col] = pd.to_datetime(data[col], format="%Y-%m-%d", errors='coerce').astype('datetime64[s]')
-
-        # Ensure dataframe datatypes match the schema
-        data = self.enforce_data_types(data)
+        # Ensure dataframe datatypes match the schema - date columns are coerced to dates with nulls as pd.NaT
+        data = self.enforce_data_types(data, schema)
 
         # Return the pandas dataframe object
         return data
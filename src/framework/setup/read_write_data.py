@@ -1,12 +1,54 @@
+import ast
+import copy
+import csv
+import datetime
+import functools
+import io
+import itertools
 import json
 import logging
+import operator
 import os
-
+import re
+import shutil
+import tempfile
+import uuid
+import zipfile
+from collections.abc import Mapping
+from contextlib import contextmanager
+from types import MappingProxyType
+from typing import Iterator
+
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as pa_ds
+import pyarrow.parquet as pq
 import yaml
 
 from framework.setup.log_format import lines
 
+# Spark is only needed by models with type pyspark, so the framework can be used without it installed
+try:
+    from pyspark.sql import DataFrame as SparkDataFrame, SparkSession
+    from pyspark.sql import functions as spark_functions, types as spark_types
+except ImportError:
+    SparkDataFrame = SparkSession = spark_functions = spark_types = None
+
+# Polars is only needed by models with type polars
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# DuckDB is only needed by models with type duckdb
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
 logger = logging.getLogger()
 
 
@@ -56,43 +98,133 @@ def read_yaml(path: str) -> dict:
     return result
 
 
-def convert_schema_pandas(schema: dict) -> dict:
+# Memory compact schema datatypes and their pandas nullable datatypes
+COMPACT_TYPES = {'int32': pd.Int32Dtype(), 'int16': pd.Int16Dtype(), 'int8': pd.Int8Dtype(),
+                 'float32': pd.Float32Dtype(), 'bool': pd.BooleanDtype()}
+
+# Arrow datatypes keyed by both the schema file datatypes and the pandas datatypes they are converted into
+ARROW_TYPES = {
+    'integer': pa.int64(), 'int64': pa.int64(), 'int32': pa.int32(), 'int16': pa.int16(), 'int8': pa.int8(),
+    'float': pa.float64(), 'float64': pa.float64(), 'float32': pa.float32(),
+    'bool': pa.bool_(), 'boolean': pa.bool_(),
+    'date': pa.timestamp('s'), 'datetime64[s]': pa.timestamp('s'),
+    'string': pa.string(),
+    'category': pa.dictionary(pa.int32(), pa.string()),
+}
+
+
+def schema_type(value: str | dict) -> str:
+    """
+    Reads the datatype of a schema field. Fields are defined either by their datatype or by a dictionary containing
+    the datatype under "type" plus datatype settings, e.g. {"type": "category", "values": ["stage_1", "stage_2"]}
+    :param value: schema field definition
+    :return: lower case datatype name
+    """
+    return (value['type'] if isinstance(value, dict) else value).lower()
+
+
+def category_dtype(value: str | dict) -> pd.CategoricalDtype:
+    """
+    Builds the pandas categorical datatype of a category schema field, fixing the categories when values are declared
+    :param value: schema field definition
+    :return: pandas categorical datatype
+    """
+    return pd.CategoricalDtype(value.get('values') if isinstance(value, dict) else None)
+
+
+class CompiledSchema(Mapping):
+    """
+    Read only schema which holds each of its converted schemas once they have been derived, so a schema shared across
+    runs is only ever converted once per conversion. Converted schemas are returned as read only mappings.
+    """
+
+    def __init__(self, schema: dict):
+        self._schema = copy.deepcopy(dict(schema))
+        self._converted = {}
+
+    def __getitem__(self, key: str) -> any:
+        return self._schema[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._schema)
+
+    def __len__(self) -> int:
+        return len(self._schema)
+
+    def __repr__(self) -> str:
+        return f"CompiledSchema({self._schema})"
+
+    def convert(self, converter: callable, *args) -> MappingProxyType | pa.Schema:
+        key = (converter.__name__, args)
+
+        if key not in self._converted:
+            converted = converter(self._schema, *args)
+            self._converted[key] = MappingProxyType(converted) if isinstance(converted, dict) else converted
+
+        return self._converted[key]
+
+
+def convert_schema_pandas(schema: dict, dtype_backend: str = 'numpy_nullable') -> dict:
     """
     Converts schema values into values that are compatible with pandas.read_csv()
-    :param schema: dictionary containing columns and datatypes
+    :param schema: dictionary containing columns and datatypes, this is not changed
+    :param dtype_backend: either 'numpy_nullable' for pandas nullable datatypes or 'pyarrow' for arrow datatypes
     :return: dictionary containing columns and standardised datatypes
     """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_pandas, dtype_backend)
+
+    schema = dict(schema)
 
     # Loop through each datatype and standardise to conform with pandas
     for key, val in schema.items():
-        if val.lower() == 'integer':
+        # Categories are dictionary encoded as pandas categoricals with either datatype backend
+        if schema_type(val) == 'category':
+            schema[key] = category_dtype(val)
+        elif dtype_backend == 'pyarrow' and schema_type(val) in ARROW_TYPES:
+            schema[key] = pd.ArrowDtype(ARROW_TYPES[schema_type(val)])
+        elif schema_type(val) == 'integer':
             schema[key] = pd.Int64Dtype()
-        elif val.lower() == 'float':
+        elif schema_type(val) == 'float':
             schema[key] = pd.Float64Dtype()
-        elif val.lower() == 'date':
+        elif schema_type(val) in COMPACT_TYPES:
+            schema[key] = COMPACT_TYPES[schema_type(val)]
+        elif schema_type(val) == 'date':
             schema[key] = 'datetime64[s]'
-        elif val.lower() == 'string':
+        elif schema_type(val) == 'string':
             schema[key] = 'string'
 
     # Return the updated schema dictionary
     return schema
 
 
-def convert_schema_output_pandas(schema: dict) -> dict:
+def convert_schema_output_pandas(schema: dict, dtype_backend: str = 'numpy_nullable') -> dict:
     """
     Converts schema values into values that are compatible with pandas.to_csv()
-    :param schema: dictionary containing columns and datatypes
+    :param schema: dictionary containing columns and datatypes, this is not changed
+    :param dtype_backend: either 'numpy_nullable' for pandas nullable datatypes or 'pyarrow' for arrow datatypes
     :return: dictionary containing columns and standardised datatypes
     """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_output_pandas, dtype_backend)
+
+    schema = dict(schema)
+
     # Loop through each datatype and standardise to conform with pandas
     for key, val in schema.items():
-        if val.lower() == 'integer':
+        if schema_type(val) == 'category':
+            schema[key] = category_dtype(val)
+        elif dtype_backend == 'pyarrow' and schema_type(val) in ARROW_TYPES:
+            schema[key] = str(pd.ArrowDtype(ARROW_TYPES[schema_type(val)]))
+        elif schema_type(val) == 'integer':
             schema[key] = 'Int64'
-        elif val.lower() == 'float':
+        elif schema_type(val) == 'float':
             schema[key] = 'Float64'
-        elif val.lower() == 'date':
+        elif schema_type(val) in COMPACT_TYPES:
+            schema[key] = str(COMPACT_TYPES[schema_type(val)])
+        elif schema_type(val) == 'date':
             schema[key] = 'datetime64[s]'
-        elif val.lower() == 'string':
+        elif schema_type(val) == 'string':
             schema[key] = 'string'
 
     # Return the updated schema dictionary
@@ -102,103 +234,585 @@ def convert_schema_output_pandas(schema: dict) -> dict:
 def convert_schema_recon_pandas(schema: dict) -> dict:
     """
     Converts schema values into values that are compatible with pandas.to_csv()
-    :param schema: dictionary containing columns and datatypes
+    :param schema: dictionary containing columns and datatypes, this is not changed
     :return: dictionary containing columns and standardised datatypes
     """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_recon_pandas)
+
+    schema = dict(schema)
+
     # Loop through each datatype and standardise to conform with pandas
     for key, val in schema.items():
-        if val.lower() == 'integer':
+        if schema_type(val) == 'integer':
             schema[key] = pd.Int64Dtype()
-        elif val.lower() == 'float':
+        elif schema_type(val) == 'float':
             schema[key] = pd.Float64Dtype()
-        elif val.lower() == 'date':
+        elif schema_type(val) in COMPACT_TYPES:
+            schema[key] = COMPACT_TYPES[schema_type(val)]
+        elif schema_type(val) == 'date':
             schema[key] = 'string'
-        elif val.lower() == 'string':
+        elif schema_type(val) in ['string', 'category']:
             schema[key] = 'string'
 
     # Return the updated schema dictionary
     return schema
 
 
-def convert_schema_spark(schema: dict) -> dict:
-    # TODO: Fill in this method
-    pass
+# Compression codecs available when saving parquet files
+PARQUET_COMPRESSION = ['zstd', 'snappy', 'gzip', 'none']
 
+# Date format used by every date field in the schema files
+DATE_FORMAT = "%Y-%m-%d"
 
-def enforce_integers(df: pd.DataFrame) -> pd.DataFrame:
+
+@functools.lru_cache(maxsize=None)
+def compile_schema_arrow(schema: tuple) -> pa.Schema:
     """
-    Standardises the integer fields in any given dataframe
-    :param df: pandas dataframe object
-    :return: pandas dataframe with standardised integer fields
+    Compiles schema items into an arrow schema, cached so each distinct schema is only compiled once
+    :param schema: tuple of (column, datatype) pairs
+    :return: arrow schema
     """
+    return pa.schema([(key, val.pyarrow_dtype if isinstance(val, pd.ArrowDtype) else ARROW_TYPES[str(val).lower()])
+                      for key, val in schema])
 
-    # Loop through each column and standardise integer fields
-    for column in df.columns:
-        if df[column].dtype == "Int64" and df[column].isna().all():
-            df[column] = pd.NA
-            df[column] = df[column].astype('Int64')
-        elif df[column].dtype == "Int64" and df[column].isna().any():
-            df[column] = df[column].astype('Int64')
-        elif df[column].dtype == "Int64":
-            df[column] = df[column].astype('Int64')
-
-    # Return a dataframe with standardised integer fields
-    return df
 
+def convert_schema_arrow(schema: dict) -> pa.Schema:
+    """
+    Converts schema values into an arrow schema that is compatible with the pyarrow csv reader
+    :param schema: dictionary containing columns and datatypes, either as in the schema files or converted for pandas
+    :return: arrow schema containing columns and arrow datatypes
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_arrow)
+
+    return compile_schema_arrow(tuple((key, schema_type(val) if isinstance(val, dict) else val)
+                                      for key, val in schema.items()))
 
-def enforce_floats(df: pd.DataFrame) -> pd.DataFrame:
+
+# Comparison operators available within filter expressions, with the operator used when the operands are swapped
+FILTER_OPERATORS = {
+    ast.Eq: (operator.eq, operator.eq), ast.NotEq: (operator.ne, operator.ne),
+    ast.Lt: (operator.lt, operator.gt), ast.LtE: (operator.le, operator.ge),
+    ast.Gt: (operator.gt, operator.lt), ast.GtE: (operator.ge, operator.le),
+}
+
+
+def build_filter_expression(expression: str, column: callable, literal: callable,
+                            isin: callable = lambda field, values: field.isin(values)) -> any:
     """
-    Standardises the float fields in any given dataframe
-    :param df: pandas dataframe object
-    :return: pandas dataframe with standardised float fields
+    Parses a filter such as "year == 2024 and period_date >= '2024-01-01'" into an expression of the engine reading the
+    data. Comparisons, "in", "not in", "and", "or" and "not" are supported
+    :param expression: string containing the filter expression
+    :param column: function returning the engine's column expression for a column name
+    :param literal: function returning the engine's value for a column name and a python value or list of values
+    :param isin: function returning the engine's expression testing a column expression against a list of values
+    :return: expression combining the engine's column expressions with python operators
     """
-    # Loop through each column and standardise float fields
-    for column in df.columns:
-        if df[column].dtype == "Float64":
-            df[column] = df[column].astype("Float64")
 
-    # Return a dataframe with standardised float fields
-    return df
+    def field(node: ast.Name) -> any:
+        return column(node.id)
+
+    def value(field_node: ast.Name, node: ast.expr) -> any:
+        value = ast.literal_eval(node)
+
+        return literal(field_node.id, list(value) if isinstance(value, (list, tuple, set)) else value)
+
+    def compare(left: ast.expr, op: ast.cmpop, right: ast.expr) -> any:
+        # Allow the column to be on either side of the comparison, e.g. "2023 <= year"
+        if isinstance(left, ast.Name):
+            name, operand, swapped = left, right, False
+        elif isinstance(right, ast.Name):
+            name, operand, swapped = right, left, True
+        else:
+            raise ValueError(f"Filter expression '{expression}' must compare a column against a value.")
+
+        if isinstance(op, (ast.In, ast.NotIn)) and not swapped:
+            result = isin(field(name), value(name, operand))
+            return ~result if isinstance(op, ast.NotIn) else result
+
+        if type(op) not in FILTER_OPERATORS:
+            raise ValueError(f"Filter expression '{expression}' uses an unsupported operator.")
+
+        return FILTER_OPERATORS[type(op)][swapped](field(name), value(name, operand))
+
+    def build(node: ast.expr) -> any:
+        if isinstance(node, ast.BoolOp):
+            return functools.reduce(operator.and_ if isinstance(node.op, ast.And) else operator.or_,
+                                    [build(value) for value in node.values])
+
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ~build(node.operand)
+
+        if isinstance(node, ast.Compare):
+            # Chained comparisons such as "2023 <= year <= 2024" are combined with "and"
+            operands = [node.left] + node.comparators
+            return functools.reduce(operator.and_, [compare(operands[num], op, operands[num + 1])
+                                                    for num, op in enumerate(node.ops)])
+
+        raise ValueError(f"Filter expression '{expression}' could not be parsed.")
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as error:
+        raise ValueError(f"Filter expression '{expression}' could not be parsed.") from error
+
+    return build(tree.body)
+
+
+def check_filter_column(expression: str, name: str, columns: list) -> None:
+    if name not in columns:
+        raise ValueError(f"Filter expression '{expression}' references column '{name}' which is not in the dataset.")
+
+
+def parse_filter_expression(expression: str, schema: pa.Schema) -> pc.Expression:
+    """
+    Parses a filter such as "year == 2024 and period_date >= '2024-01-01'" into an arrow expression, values are cast to
+    the datatype of the column they filter. See build_filter_expression for the supported syntax
+    :param expression: string containing the filter expression
+    :param schema: arrow schema of the data being filtered
+    :return: arrow expression which can be pushed down into the pyarrow readers
+    """
+
+    def column(name: str) -> pc.Expression:
+        check_filter_column(expression, name, schema.names)
+        return pc.field(name)
+
+    def literal(name: str, value: any) -> pa.Scalar | pa.Array:
+        data_type = schema.field(name).type
+
+        # Dictionary encoded columns are compared against their decoded values
+        if pa.types.is_dictionary(data_type):
+            data_type = data_type.value_type
+
+        if isinstance(value, list):
+            return pa.array(value).cast(data_type)
+        return pa.scalar(value).cast(data_type)
+
+    return build_filter_expression(expression, column, literal)
+
+
+def parse_filter_expression_spark(expression: str, schema: any) -> any:
+    """
+    Parses a filter such as "year == 2024 and period_date >= '2024-01-01'" into a spark column expression, values are
+    cast to the datatype of the column they filter. See build_filter_expression for the supported syntax
+    :param expression: string containing the filter expression
+    :param schema: spark StructType of the data being filtered
+    :return: spark column expression which spark can push down into its readers
+    """
+
+    def column(name: str) -> any:
+        check_filter_column(expression, name, schema.fieldNames())
+        return spark_functions.col(name)
+
+    def literal(name: str, value: any) -> any:
+        data_type = schema[name].dataType
+
+        if isinstance(value, list):
+            return [spark_functions.lit(val).cast(data_type) for val in value]
+        return spark_functions.lit(value).cast(data_type)
+
+    return build_filter_expression(expression, column, literal)
+
+
+def parse_filter_expression_polars(expression: str, schema: dict) -> any:
+    """
+    Parses a filter such as "year == 2024 and period_date >= '2024-01-01'" into a polars expression, values are cast to
+    the datatype of the column they filter. See build_filter_expression for the supported syntax
+    :param expression: string containing the filter expression
+    :param schema: dictionary containing column polars datatypes, as converted by convert_schema_polars
+    :return: polars expression which the polars query optimiser can push down into its readers
+    """
+
+    def column(name: str) -> any:
+        check_filter_column(expression, name, list(schema.keys()))
+        return pl.col(name)
+
+    def to_value(name: str, value: any) -> any:
+        # Dates are compared as dates, as polars does not cast strings to dates
+        if schema[name] == pl.Date and isinstance(value, str):
+            return datetime.datetime.strptime(value, DATE_FORMAT).date()
+        return value
+
+    def literal(name: str, value: any) -> any:
+        data_type = pl.String if schema[name] == pl.Categorical else schema[name]
+
+        if isinstance(value, list):
+            return pl.Series([to_value(name, val) for val in value], dtype=data_type)
+        return pl.lit(to_value(name, value), dtype=data_type)
+
+    return build_filter_expression(expression, column, literal,
+                                   isin=lambda field, values: field.is_in(values.implode()))
+
+
+def parse_filter_expression_duckdb(expression: str, schema: dict) -> any:
+    """
+    Parses a filter such as "year == 2024 and period_date >= '2024-01-01'" into a duckdb expression, values are cast to
+    the datatype of the column they filter. See build_filter_expression for the supported syntax
+    :param expression: string containing the filter expression
+    :param schema: dictionary containing column duckdb datatypes, as converted by convert_schema_duckdb
+    :return: duckdb expression which duckdb can push down into its readers
+    """
+
+    def column(name: str) -> any:
+        check_filter_column(expression, name, list(schema.keys()))
+        return duckdb.ColumnExpression(quote_identifier(name))
+
+    def literal(name: str, value: any) -> any:
+        if isinstance(value, list):
+            return [duckdb.ConstantExpression(val).cast(duckdb.sqltype(schema[name])) for val in value]
+        return duckdb.ConstantExpression(value).cast(duckdb.sqltype(schema[name]))
+
+    return build_filter_expression(expression, column, literal, isin=lambda field, values: field.isin(*values))
+
+
+# Spark datatypes keyed by the schema file datatypes, categories are held as strings
+SPARK_TYPES = {} if spark_types is None else {
+    'integer': spark_types.LongType(), 'int32': spark_types.IntegerType(), 'int16': spark_types.ShortType(),
+    'int8': spark_types.ByteType(), 'float': spark_types.DoubleType(), 'float32': spark_types.FloatType(),
+    'bool': spark_types.BooleanType(), 'date': spark_types.DateType(), 'string': spark_types.StringType(),
+    'category': spark_types.StringType(),
+}
+
+# Settings of the local spark session, which can be overridden in the spark section of the system config yaml
+SPARK_DEFAULTS = {'master': "local[*]", 'app_name': "python-template", 'driver_memory': "4g", 'shuffle_partitions': 8}
+
+
+def get_spark_session(config: dict = None) -> SparkSession:
+    """
+    Gets the active spark session, or starts a local spark session using every core of the machine so no cluster is
+    needed to run pyspark models
+    :param config: dictionary of spark settings overriding SPARK_DEFAULTS
+    :return: spark session
+    """
+    if SparkSession is None:
+        raise ImportError("Models with type pyspark require the pyspark package and a Java runtime to be installed.")
+
+    config = {**SPARK_DEFAULTS, **(config or {})}
+
+    # Dates are read and written as calendar dates, so the session time zone is fixed to avoid shifting values
+    return (SparkSession.builder.master(config['master']).appName(config['app_name'])
+            .config('spark.driver.memory', config['driver_memory'])
+            .config('spark.sql.shuffle.partitions', int(config['shuffle_partitions']))
+            .config('spark.sql.session.timeZone', "UTC")
+            .getOrCreate())
+
+
+def convert_schema_spark(schema: dict) -> any:
+    """
+    Converts schema values into a spark schema
+    :param schema: dictionary containing columns and datatypes, this is not changed
+    :return: spark StructType containing columns and spark datatypes
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_spark)
+
+    if spark_types is None:
+        raise ImportError("Converting schemas for spark requires the pyspark package to be installed.")
+
+    unsupported = {key: val for key, val in schema.items() if schema_type(val) not in SPARK_TYPES}
+    if unsupported:
+        raise ValueError(f"Schema datatypes {unsupported} are not supported by spark.")
+
+    return spark_types.StructType([spark_types.StructField(key, SPARK_TYPES[schema_type(val)], nullable=True)
+                                   for key, val in schema.items()])
+
+
+def enforce_data_types_spark(data: SparkDataFrame, schema: dict, dataframe_name: str = "") -> SparkDataFrame:
+    """
+    Selects the schema columns of a spark dataframe, casting each to its schema datatype and standardising null values
+    in the same way as enforce_data_types
+    :param data: spark dataframe
+    :param schema: dictionary containing column datatypes
+    :param dataframe_name: Name of the dataset
+    :return: spark dataframe containing only the schema columns
+    """
+    spark_schema = convert_schema_spark(schema)
+
+    missing_cols = [col for col in spark_schema.fieldNames() if col not in data.columns]
+    if missing_cols:
+        raise ValueError(f"Dataset {dataframe_name} is missing the following columns {missing_cols}.")
+
+    columns = []
+    for field in spark_schema:
+        column = spark_functions.col(field.name)
+
+        # Empty strings and "nan" are nulls within string fields
+        if isinstance(field.dataType, spark_types.StringType):
+            column = spark_functions.when(~column.isin(NULL_STRINGS), column)
+
+        # Dates held as strings are parsed with the same format the framework writes them in
+        elif isinstance(field.dataType, spark_types.DateType) and \
+                isinstance(data.schema[field.name].dataType, spark_types.StringType):
+            column = spark_functions.to_date(column, "yyyy-MM-dd")
+
+        columns.append(column.cast(field.dataType).alias(field.name))
+
+    return data.select(columns)
+
+
+# Polars datatypes keyed by the schema file datatypes
+POLARS_TYPES = {} if pl is None else {
+    'integer': pl.Int64, 'int32': pl.Int32, 'int16': pl.Int16, 'int8': pl.Int8, 'float': pl.Float64,
+    'float32': pl.Float32, 'bool': pl.Boolean, 'date': pl.Date, 'string': pl.String, 'category': pl.Categorical,
+}
+
+
+def convert_schema_polars(schema: dict) -> dict:
+    """
+    Converts schema values into polars datatypes
+    :param schema: dictionary containing columns and datatypes, this is not changed
+    :return: dictionary containing columns and polars datatypes
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_polars)
+
+    if pl is None:
+        raise ImportError("Models with type polars require the polars package to be installed.")
+
+    unsupported = {key: val for key, val in schema.items() if schema_type(val) not in POLARS_TYPES}
+    if unsupported:
+        raise ValueError(f"Schema datatypes {unsupported} are not supported by polars.")
+
+    return {key: POLARS_TYPES[schema_type(val)] for key, val in schema.items()}
+
+
+def enforce_data_types_polars(data: any, schema: dict, dataframe_name: str = "") -> any:
+    """
+    Adds the selection of the schema columns to a polars lazy query, casting each to its schema datatype and
+    standardising null values in the same way as enforce_data_types
+    :param data: polars lazyframe
+    :param schema: dictionary containing column datatypes
+    :param dataframe_name: Name of the dataset
+    :return: polars lazyframe containing only the schema columns
+    """
+    polars_schema = convert_schema_polars(schema)
+    columns = data.collect_schema()
+
+    missing_cols = [col for col in polars_schema if col not in columns]
+    if missing_cols:
+        raise ValueError(f"Dataset {dataframe_name} is missing the following columns {missing_cols}.")
+
+    expressions = []
+    for col, data_type in polars_schema.items():
+        column = pl.col(col)
+
+        # Dates held as strings are parsed with the framework date format, values which are not dates become null
+        if data_type == pl.Date and columns[col] == pl.String:
+            column = column.str.to_date(DATE_FORMAT, strict=False)
+
+        # Empty strings and "nan" are nulls within string fields
+        elif data_type in [pl.String, pl.Categorical] and columns[col] == pl.String:
+            column = pl.when(~column.is_in(NULL_STRINGS)).then(column)
+
+        expressions.append(column.cast(data_type).alias(col))
+
+    return data.select(expressions)
+
+
+# Values standardised to null within string fields: empty strings and any casing of "nan"
+NULL_STRINGS = [""] + ["".join(chars) for chars in itertools.product(*zip("nan", "NAN"))]
+
+# Tokens pandas reads as null from csv files by default
+PANDAS_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN", "<NA>",
+                    "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+
+# Values read as null from csv files in every column, the pandas null tokens along with the null strings above
+CSV_NULL_STRINGS = sorted(set(PANDAS_NA_VALUES) | set(NULL_STRINGS))
+
+
+def null_string_mask(column: pd.Series) -> np.ndarray:
+    """
+    Flags the values of a string field that should be standardised to null
+    :param column: pandas series containing string values
+    :return: boolean array which is True where the value is an empty string or "nan"
+    """
+    # Arrow backed strings are checked with the arrow compute kernel, avoiding a conversion to python objects
+    if isinstance(column.dtype, pd.ArrowDtype) or getattr(column.dtype, 'storage', None) == 'pyarrow':
+        return np.asarray(pc.is_in(pa.array(column.array), value_set=pa.array(NULL_STRINGS)))
+
+    return column.isin(NULL_STRINGS).to_numpy()
+
+
+def dtype_matches(dtype: any, expected: any) -> bool:
+    """
+    Checks whether a column datatype already matches the schema datatype
+    :param dtype: datatype of the column
+    :param expected: datatype defined in the schema
+    :return: True when the column does not need to be cast
+    """
+    # Categories without declared values match any categorical column
+    if isinstance(expected, pd.CategoricalDtype) and expected.categories is None:
+        return isinstance(dtype, pd.CategoricalDtype)
+
+    return dtype == expected
 
 
-def enforce_strings(df: pd.DataFrame) -> pd.DataFrame:
+def undeclared_categories(column: pd.Series, dtype: pd.CategoricalDtype) -> list:
     """
-    Standardises the string fields in any given dataframe
-    :param df: pandas dataframe object
-    :return: pandas dataframe with standardised string fields
+    Finds the values of a column which are missing from the declared values of a category schema field
+    :param column: pandas series
+    :param dtype: pandas categorical datatype defined in the schema
+    :return: list of undeclared values
+    """
+    if dtype.categories is None:
+        return []
+
+    values = column.cat.categories if isinstance(column.dtype, pd.CategoricalDtype) else column.dropna().unique()
+
+    return sorted(set(values).difference(dtype.categories), key=str)
+
+
+def enforce_data_types(df: pd.DataFrame, schema: dict = None) -> pd.DataFrame:
+    """
+    Standardises the values in each column of the passed dataset in a single pass over the columns
+    :param df: pandas dataset object
+    :param schema: dictionary containing column datatypes, columns are only cast when their datatype differs
+    :return: pandas dataset with standardised values
     """
-    # Loop through each column and standardise string fields
+    schema = {} if schema is None else schema
+
     for column in df.columns:
-        if df[column].dtype in ["string", "object"]:
-            df[column] = df[column].mask(df[column] == "")
-            df[column] = df[column].mask(df[column].str.lower() == "nan")
+        dtype = schema.get(column)
+
+        # Cast columns which do not already have the schema datatype - coerce unparseable dates to pd.NaT
+        if dtype is not None and not dtype_matches(df[column].dtype, dtype):
+            if dtype == "datetime64[s]":
+                df[column] = pd.to_datetime(df[column], format="%Y-%m-%d", errors='coerce').astype(dtype)
+            else:
+                if isinstance(dtype, pd.CategoricalDtype) and undeclared_categories(df[column], dtype):
+                    logger.warning(f"Column {column} contains values which are not declared in the schema and will "
+                                   f"be set to null: {undeclared_categories(df[column], dtype)}.")
+                df[column] = df[column].astype(dtype)
+
+        # Standardise null string values in place, only touching the rows which hold one
+        if pd.api.types.is_string_dtype(df[column].dtype) and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            mask = null_string_mask(df[column])
+            if mask.any():
+                df.loc[mask, column] = None
 
-    # Return a dataframe with standardised string fields
+    # Return a dataframe with standardised values
     return df
 
 
-def enforce_data_types(df: pd.DataFrame) -> pd.DataFrame:
+def smallest_lossless_dtype(column: pd.Series) -> any:
+    """
+    Finds the smallest numeric datatype, of the same backend, which holds every value of the column without loss
+    :param column: pandas series
+    :return: compact datatype or None when the column cannot be downcast
+    """
+    arrow_backed = isinstance(column.dtype, pd.ArrowDtype)
+
+    # Integers are downcast to the smallest width whose range holds the column minimum and maximum
+    if pd.api.types.is_integer_dtype(column.dtype) and not pd.api.types.is_bool_dtype(column.dtype):
+        if column.isna().all():
+            return None
+        for arrow_type, dtype in [(pa.int8(), pd.Int8Dtype()), (pa.int16(), pd.Int16Dtype()),
+                                  (pa.int32(), pd.Int32Dtype())]:
+            info = np.iinfo(dtype.numpy_dtype)
+            if dtype_to_arrow(column.dtype).bit_width > arrow_type.bit_width and \
+                    info.min <= column.min() and column.max() <= info.max:
+                return pd.ArrowDtype(arrow_type) if arrow_backed else dtype
+
+    # Floats are only downcast when every value survives the round trip through float32
+    elif pd.api.types.is_float_dtype(column.dtype) and dtype_to_arrow(column.dtype) == pa.float64():
+        dtype = pd.ArrowDtype(pa.float32()) if arrow_backed else pd.Float32Dtype()
+        if column.astype(dtype).astype(column.dtype).equals(column):
+            return dtype
+
+    return None
+
+
+def downcast_data_types(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Standardises the values in each column of the passed dataset
+    Casts each numeric column to the smallest lossless datatype, recording the bytes saved in df.attrs
     :param df: pandas dataset object
-    :return: pandas dataset with standardised values
+    :return: pandas dataset with compact numeric datatypes
     """
-    # Standardise integer values
-    df = enforce_integers(df)
+    bytes_saved = 0
 
-    # Standardise float values
-    df = enforce_floats(df)
+    for column in df.columns:
+        dtype = smallest_lossless_dtype(df[column])
 
-    # Standardise string values
-    df = enforce_strings(df)
+        if dtype is not None:
+            size = df[column].memory_usage(index=False)
+            df[column] = df[column].astype(dtype)
+            bytes_saved += size - df[column].memory_usage(index=False)
+
+    df.attrs['downcast_bytes_saved'] = df.attrs.get('downcast_bytes_saved', 0) + bytes_saved
 
-    # Return a dataframe with standardised values
     return df
 
 
-def schema_conformance_spark(data: pd.DataFrame, schema: dict, dataframe_name: str = "") -> dict:
-    # TODO: Fill in this method
-    pass
+def log_correct_types(dataframe_name: str, correct_types: dict) -> None:
+    # Columns with the correct type are logged as one record rather than one record per column
+    if correct_types:
+        logger.info(f"Dataset {dataframe_name} has {len(correct_types)} columns with correct type: {correct_types}.")
+
+
+def schema_conformance_spark(data: SparkDataFrame, schema: any, dataframe_name: str = "") -> dict:
+    """
+    Checks that the passed dataset has datatypes matching the passed schema
+    :param data: spark dataframe
+    :param schema: spark StructType containing column names and datatypes
+    :param dataframe_name: Name of the dataset
+    :return: errors in dataframe-schema conformance if any
+    """
+    # Create a holding variable to store any found errors
+    errors = {'incorrect_type': [], 'incorrect_values': []}
+
+    # Spark dataframes can not be changed in place, extra columns are dropped when the dataset is written
+    extra_cols = [col for col in data.columns if col not in schema.fieldNames()]
+    if extra_cols:
+        logger.warning(f"The following columns will be dropped from dataset {dataframe_name}: {extra_cols}.")
+
+    # Check for columns in the schemas which are missing from the dataset
+    missing_cols = set(schema.fieldNames()).difference(data.columns)
+    if len(missing_cols) > 0:
+        errors['missing_columns'] = [f"Dataframe {dataframe_name} is missing the following columns {missing_cols}."]
+
+    # Check the datatypes in the dataframe match those defined in the schema
+    correct_types = {}
+    for field in data.schema:
+        if field.name not in schema.fieldNames():
+            continue
+
+        if field.dataType == schema[field.name].dataType:
+            correct_types[field.name] = field.dataType.simpleString()
+
+        # Save to error dictionary if the datatypes do not match
+        else:
+            errors['incorrect_type'] += [f"Dataframe {dataframe_name} has incorrect datatype in {field.name} expected "
+                                         f"{schema[field.name].dataType.simpleString()} got "
+                                         f"{field.dataType.simpleString()}."]
+
+    log_correct_types(dataframe_name, correct_types)
+
+    # Return a dictionary of errors between the schema and dataframe
+    return errors
+
+
+def dtype_to_arrow(dtype: any) -> pa.DataType | None:
+    """
+    Finds the arrow datatype equivalent to a pandas datatype, so numpy backed and arrow backed datatypes can be compared
+    :param dtype: pandas datatype or datatype name
+    :return: arrow datatype or None when the datatype has no arrow equivalent
+    """
+    try:
+        dtype = pd.api.types.pandas_dtype(dtype)
+    except TypeError:
+        return None
+
+    if isinstance(dtype, pd.ArrowDtype):
+        return pa.string() if pa.types.is_large_string(dtype.pyarrow_dtype) else dtype.pyarrow_dtype
+
+    if isinstance(dtype, pd.StringDtype):
+        return pa.string()
+
+    try:
+        return pa.from_numpy_dtype(getattr(dtype, 'numpy_dtype', dtype))
+    except (TypeError, pa.ArrowNotImplementedError):
+        return None
 
 
 def schema_conformance_pandas(data: pd.DataFrame, schema: dict, dataframe_name: str = "") -> dict:
@@ -210,7 +824,7 @@ def schema_conformance_pandas(data: pd.DataFrame, schema: dict, dataframe_name:
     :return: errors in dataframe-schema conformance if any
     """
     # Create a holding variable to store any found errors
-    errors = {'incorrect_type': []}
+    errors = {'incorrect_type': [], 'incorrect_values': []}
 
     # Check for column differences between schema and dataset
     extra_cols = list(set(data.columns).difference(schema.keys()))
@@ -225,162 +839,1063 @@ def schema_conformance_pandas(data: pd.DataFrame, schema: dict, dataframe_name:
         errors['missing_columns'] = [f"Dataframe {dataframe_name} is missing the following columns {missing_cols}."]
 
     # Check the datatypes in the dataframe match those defined in the schema
+    correct_types = {}
     for col in data.columns:
-        # Log a successful match if the datatypes are the same
-        if str(data[col].dtype).lower() == schema[col].lower():
-            logger.info(f"Dataset {dataframe_name} has {col} with correct type: {data[col].dtype}.")
+        # Record a match if the datatypes are the same, or are the numpy and arrow backed versions of one type
+        if str(data[col].dtype).lower() == str(schema[col]).lower() or \
+                dtype_to_arrow(data[col].dtype) == dtype_to_arrow(schema[col]) is not None:
+            correct_types[col] = str(data[col].dtype)
+
+            # Check categorical columns only contain the values declared in the schema
+            undeclared = undeclared_categories(data[col], schema[col]) \
+                if isinstance(schema[col], pd.CategoricalDtype) else []
+            if undeclared:
+                errors['incorrect_values'] += [f"Dataframe {dataframe_name} has values in {col} which are not "
+                                               f"declared in the schema: {undeclared}."]
 
         # Save to error dictionary if the datatypes do not match
         else:
             errors['incorrect_type'] += [f"Dataframe {dataframe_name} has incorrect datatype in {col} "
                                          f"expected {schema[col]} got {data[col].dtype}."]
 
+    log_correct_types(dataframe_name, correct_types)
+
     # Return a dictionary of errors between the schema and dataframe
     return errors
 
 
-def read_csv_to_pandas(path: str, schema: dict, usecols: bool = True) -> pd.DataFrame:
+def arrow_to_pandas_types(data_type: pa.DataType) -> any:
     """
-    Loads a csv or zipped csv into a pandas dataframe object
-    :param path: path to csv
-    :param schema: dictionary containing column datatypes
-    :param usecols: Boolean to choose only loading columns defined in the schema
-    :return: pandas dataframe object containing the csv data
+    Maps arrow datatypes onto the pandas nullable datatypes used throughout the framework
+    :param data_type: arrow datatype
+    :return: pandas datatype or None to use the pyarrow default conversion
     """
-    logger.info(f"Loading columns: {list(schema.keys())}")
-
-    # Define the key word arguments to be supplied to the pandas.read_csv function
-    # Read in date columns as string as kwarg date_parser has been depreciated and null dates raise errors
-    # with kwarg date_format
-    kwargs = {
-        'filepath_or_buffer': path,
-        'dtype': {k: v if v != 'datetime64[s]' else "object" for k, v in schema.items()},
-        'usecols': schema.keys(),
-        'cache_dates': True,
-        'engine': 'pyarrow',
-        # 'parse_dates': [key for key, val in schema.items() if val == 'datetime64[s]'],
-        # 'date_format': "%Y-%m-%d",
-        # 'date_parser': lambda x: pd.to_datetime(x, format="%Y-%m-%d", errors='coerce')
-    }
-
-    # Trigger the used column selection
-    if not usecols:
-        del kwargs['usecols']
-
-    # Read the csv data into a pandas dataframe object
-    data = pd.read_csv(**kwargs)
-
-    # Apply datetime formatting to date columns - coerce nulls to pd.NaT
-    for col in [key for key, val in schema.items() if val == "datetime64[s]"]:
-        data[col] = pd.to_datetime(data[col], format="%Y-%m-%d", errors='coerce').astype('datetime64[s]')
-
-    # Ensure dataframe datatypes match the schema
-    data = enforce_data_types(data)
-    lines()
-
-    # Return the pandas dataframe object
-    return data
+    return {pa.int64(): pd.Int64Dtype(), pa.int32(): pd.Int32Dtype(), pa.int16(): pd.Int16Dtype(),
+            pa.int8(): pd.Int8Dtype(), pa.float64(): pd.Float64Dtype(), pa.float32(): pd.Float32Dtype(),
+            pa.bool_(): pd.BooleanDtype(), pa.string(): pd.StringDtype(), pa.large_string(): pd.StringDtype()}.get(
+        data_type)
 
 
-def read_parquet_to_pandas(path: str, schema: dict, usecols: bool = True) -> pd.DataFrame:
+def pandas_types_mapper(schema: dict) -> callable:
     """
-    Loads a parquet into a pandas dataframe object
-    :param path: path to parquet
+    Selects how arrow data is converted into pandas, keeping arrow datatypes when the schema uses the pyarrow backend
     :param schema: dictionary containing column datatypes
-    :param usecols: Boolean to choose only loading columns defined in the schema
-    :return: pandas dataframe object containing the parquet data
+    :return: function mapping arrow datatypes onto pandas datatypes
     """
-    logger.info(f"Loading columns: {list(schema.keys())}")
-
-    # Define key word arguments - parquet files store dtypes in metadata so schema is not required when reading
-    kwargs = {
-        'path': path,
-        'columns': schema.keys(),
-        'engine': 'pyarrow',
-        'dtype_backend': 'numpy_nullable'
-    }
+    # Dictionary encoded columns are left to the default conversion into pandas categoricals
+    if any(isinstance(val, pd.ArrowDtype) for val in schema.values()):
+        return lambda data_type: None if pa.types.is_dictionary(data_type) else pd.ArrowDtype(data_type)
 
-    # Trigger the used column selection
-    if not usecols:
-        del kwargs['columns']
-
-    # Read the parquet data into a pandas dataframe object
-    data = pd.read_parquet(**kwargs)
+    return arrow_to_pandas_types
 
-    # Add datatypes from schema in case parquet file was created incorrectly
-    for column in data.columns:
-        data[column] = data[column].astype(schema[column])
 
-    # Ensure dataframe datatypes match the schema
-    data = enforce_data_types(data)
+@contextmanager
+def open_csv_source(path: str) -> any:
+    """
+    Opens a csv or zipped csv as a file object that can be streamed by the pyarrow csv reader, the zip file is closed
+    once the read finishes
+    :param path: path to csv
+    :return: file object or path to the csv data
+    """
+    if path.split(".")[-1].lower() != "zip":
+        yield path
+        return
 
-    # Return the pandas dataframe object
-    return data
+    with zipfile.ZipFile(path) as archive, archive.open(archive.namelist()[0]) as source:
+        yield source
 
 
-def read_csv_to_spark(path: str, schema: dict) -> pd.DataFrame:
-    # TODO: Fill in this method
-    pass
+def csv_convert_options(schema: dict, usecols: bool, parse_dates: bool = True) -> pa_csv.ConvertOptions:
+    """
+    Builds the pyarrow csv reader conversion options, so types, nulls and dates are parsed by arrow
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :param parse_dates: Boolean to parse date columns within the reader, otherwise they are read as strings
+    :return: pyarrow csv conversion options
+    """
+    column_types = convert_schema_arrow(schema)
 
+    if not parse_dates:
+        column_types = pa.schema([field.with_type(pa.string()) if pa.types.is_timestamp(field.type) else field
+                                  for field in column_types])
 
-def read_parquet_to_spark(path: str, schema: dict) -> pd.DataFrame:
-    # TODO: Fill in this method
-    pass
+    return pa_csv.ConvertOptions(column_types=column_types,
+                                 include_columns=list(schema.keys()) if usecols else None,
+                                 null_values=CSV_NULL_STRINGS,
+                                 strings_can_be_null=True,
+                                 timestamp_parsers=[DATE_FORMAT])
 
 
-def write_csv_from_pandas(data: pd.DataFrame, path: str, schema: dict) -> None:
+def parse_date_columns(table: pa.Table, schema: dict) -> pa.Table:
     """
-    Save dataframe data to csv file
-    :param data: pandas dataframe object
-    :param path: path to save csv file
+    Parses date columns read as strings into dates, coercing values which are not valid dates to null
+    :param table: arrow table containing csv data
     :param schema: dictionary containing column datatypes
+    :return: arrow table with parsed date columns
     """
-    # Define the key word arguments
-    kwargs = {'path_or_buf': path, 'na_rep': "", 'columns': schema.keys(), 'index': False}
+    for field in convert_schema_arrow(schema):
+        if pa.types.is_timestamp(field.type) and field.name in table.column_names:
+            column = pc.strptime(table[field.name], format=DATE_FORMAT, unit='s', error_is_null=True)
+            table = table.set_column(table.column_names.index(field.name), field.name, column)
 
-    # Save data to csv file
-    data.to_csv(**kwargs)
+    return table
 
 
-def write_parquet_from_pandas(data: pd.DataFrame, path: str, schema: dict) -> None:
+def csv_batch_to_pandas(batch: pa.Table, schema: dict) -> pd.DataFrame:
     """
-    Save dataframe data to parquet file
-    :param data: pandas dataframe object
-    :param path: path to save parquet file
+    Converts a batch of csv data into a pandas dataframe which conforms with the schema
+    :param batch: arrow table containing a batch of csv data
     :param schema: dictionary containing column datatypes
+    :return: pandas dataframe object containing the batch
     """
-    # Define the key word arguments
-    kwargs = {'path': path, 'partition_cols': schema.keys(), 'index': False, 'engine': 'pyarrow', 'compression': 'gzip'}
+    data = batch.to_pandas(types_mapper=pandas_types_mapper(schema))
 
-    # Save data to parquet file
-    data.to_parquet(**kwargs)
+    # Ensure dataframe datatypes match the schema
+    return enforce_data_types(data, schema)
 
 
-def write_zip_from_pandas(data: pd.DataFrame, path: str, schema: dict) -> None:
+def rebatch(batches: Iterator[pa.RecordBatch], batch_size: int) -> Iterator[pa.Table]:
     """
-    Save dataframe data to zip file
-    :param data: pandas dataframe object
-    :param path: path to save zip file
-    :param schema: dictionary containing column datatypes
+    Regroups a stream of arrow record batches into tables of a fixed number of rows
+    :param batches: iterator of arrow record batches
+    :param batch_size: number of rows in each returned table
+    :return: iterator of arrow tables, the final table holds the remaining rows
     """
-    # Define key word arguments
-    kwargs = {'path_or_buf': path, 'na_rep': "", 'columns': schema.keys(), 'index': False,
-              'compression': {'method': 'zip'}}
+    pending, pending_rows = [], 0
 
-    # Save data to zip file
-    data.to_csv(**kwargs)
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+
+        while pending_rows >= batch_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, batch_size)
+            pending = table.slice(batch_size).to_batches()
+            pending_rows -= batch_size
 
+    if pending_rows > 0:
+        yield pa.Table.from_batches(pending)
 
-def write_csv_from_spark(data: pd.DataFrame, path: str, schema: dict, dataframe_name: str = "") -> None:
-    # TODO: Fill in this method
-    pass
 
+def read_csv_batches_to_arrow(path: str, schema: dict, usecols: bool,
+                              filters: str = None) -> Iterator[pa.RecordBatch]:
+    """
+    Streams a csv or zipped csv into arrow record batches, applying the filter batch by batch as the file is read
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :param filters: filter expression, see parse_filter_expression
+    :return: iterator of arrow record batches containing the csv data
+    """
+    # Read in date columns as string and parse them batch by batch, so invalid dates are coerced to null rather than
+    # failing the stream part way through
+    convert_options = csv_convert_options(schema, usecols, parse_dates=False)
+    expression = None if filters is None else parse_filter_expression(filters, convert_schema_arrow(schema))
+
+    with open_csv_source(path) as source:
+        for batch in pa_csv.open_csv(source, convert_options=convert_options):
+            table = parse_date_columns(pa.Table.from_batches([batch]), schema)
 
-def write_parquet_from_spark(data: pd.DataFrame, path: str, schema: dict) -> None:
-    # TODO: Fill in this method
-    pass
+            if expression is not None:
+                table = table.filter(expression)
 
+            yield from table.to_batches()
 
-def write_zip_from_spark(data: pd.DataFrame, path: str, schema: dict) -> None:
-    # TODO: Fill in this method
-    pass
+
+def read_csv_batches_to_pandas(path: str, schema: dict, usecols: bool, batch_size: int,
+                               filters: str = None) -> Iterator[pd.DataFrame]:
+    """
+    Streams a csv or zipped csv into pandas dataframes of at most batch_size rows
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :param batch_size: number of rows in each dataframe
+    :param filters: filter expression, see parse_filter_expression
+    :return: iterator of pandas dataframes containing the csv data
+    """
+    batches_read = 0
+    for batch in rebatch(read_csv_batches_to_arrow(path, schema, usecols, filters), batch_size):
+        batches_read += 1
+        yield csv_batch_to_pandas(batch, schema)
+
+    # Always return at least one batch so an empty file yields an empty dataframe with the schema columns
+    if batches_read == 0:
+        yield csv_batch_to_pandas(convert_schema_arrow(schema).empty_table(), schema)
+
+
+def read_csv_to_pandas(path: str, schema: dict, usecols: bool = True, batch_size: int = None,
+                       filters: str = None) -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """
+    Loads a csv or zipped csv into a pandas dataframe object
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :param batch_size: number of rows to stream at a time, the whole file is loaded when not defined
+    :param filters: filter expression evaluated batch by batch as the file is read, see parse_filter_expression
+    :return: pandas dataframe object containing the csv data, or an iterator of dataframes when streaming
+    """
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+
+    # Stream the csv data in batches of rows
+    if batch_size is not None:
+        logger.info(f"Streaming in batches of {batch_size} rows.")
+        return read_csv_batches_to_pandas(path, schema, usecols, batch_size, filters)
+
+    # Filtered files are read batch by batch, so rows which do not match the filter are never held in memory
+    if filters is not None:
+        batches = list(read_csv_batches_to_arrow(path, schema, usecols, filters))
+        table = pa.Table.from_batches(batches) if batches else convert_schema_arrow(schema).empty_table()
+
+    # Parse types, nulls and dates within the multithreaded arrow csv reader
+    else:
+        table = read_csv_to_arrow(path, schema, usecols)
+
+    # Convert the arrow table into a pandas dataframe object
+    data = table.to_pandas(types_mapper=pandas_types_mapper(schema))
+
+    # Ensure dataframe datatypes match the schema
+    data = enforce_data_types(data, schema)
+    lines()
+
+    # Return the pandas dataframe object
+    return data
+
+
+def read_csv_header(path: str) -> list:
+    """
+    Reads the column names from the first line of a csv or zipped csv
+    :param path: path to csv
+    :return: list of column names in the order they are in the file
+    """
+    with open_csv_source(path) as source:
+        if isinstance(source, str):
+            with open(source, 'rb') as file:
+                line = file.readline()
+        else:
+            line = source.readline()
+
+    return next(csv.reader([line.decode('utf-8-sig')]), [])
+
+
+def is_invalid_date_error(error: pa.ArrowInvalid, path: str, schema: dict) -> bool:
+    """
+    Checks whether an arrow csv conversion error was raised by a column declared as a date in the schema
+    :param error: error raised by the arrow csv reader
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :return: True when the failing column is a date column
+    """
+    # Arrow names the failing column by its position in the file, e.g. "In CSV column #2: CSV conversion error..."
+    match = re.search(r"CSV column #(\d+)", str(error))
+    if match is None:
+        return False
+
+    header = read_csv_header(path)
+    date_columns = {field.name for field in convert_schema_arrow(schema) if pa.types.is_timestamp(field.type)}
+
+    return int(match.group(1)) < len(header) and header[int(match.group(1))] in date_columns
+
+
+def read_csv_to_arrow(path: str, schema: dict, usecols: bool = True) -> pa.Table:
+    """
+    Loads a csv or zipped csv into an arrow table, parsing types, nulls and dates within the arrow csv reader
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :return: arrow table containing the csv data
+    """
+    try:
+        with open_csv_source(path) as source:
+            table = pa_csv.read_csv(source, convert_options=csv_convert_options(schema, usecols))
+
+    # Re-read date columns as strings when they contain invalid dates and coerce those values to null, any other
+    # conversion error is raised as the file would fail to be read again
+    except pa.ArrowInvalid as error:
+        if not is_invalid_date_error(error, path, schema):
+            raise
+
+        logger.warning(f"Dates could not be parsed with format {DATE_FORMAT}, invalid dates will be set to null: "
+                       f"{error}")
+        with open_csv_source(path) as source:
+            table = pa_csv.read_csv(source, convert_options=csv_convert_options(schema, usecols, False))
+        table = parse_date_columns(table, schema)
+
+    # Return the arrow table
+    return table
+
+
+def parquet_batch_to_pandas(batch: pa.Table, schema: dict) -> pd.DataFrame:
+    """
+    Converts a batch of parquet data into a pandas dataframe which conforms with the schema
+    :param batch: arrow table containing a batch of parquet data
+    :param schema: dictionary containing column datatypes
+    :return: pandas dataframe object containing the batch
+    """
+    data = batch.to_pandas(types_mapper=pandas_types_mapper(schema))
+
+    # Ensure dataframe datatypes match the schema in case parquet file was created incorrectly
+    return enforce_data_types(data, schema)
+
+
+def open_parquet_dataset(path: str, schema: dict = None) -> pa_ds.Dataset:
+    """
+    Opens a parquet file, or hive partitioned directory of parquet files, as an arrow dataset
+    :param path: path to parquet
+    :param schema: dictionary containing column datatypes, used to type the partition columns
+    :return: arrow dataset
+    """
+    dataset = pa_ds.dataset(path, format='parquet', partitioning='hive')
+
+    if schema is None or not os.path.isdir(path) or not dataset.files:
+        return dataset
+
+    # Hive partition columns are named in the directories between the dataset root and its files
+    partition_names = [directory.split("=")[0] for directory in
+                       os.path.relpath(os.path.dirname(dataset.files[0]), path).split(os.sep) if "=" in directory]
+
+    # Partition values are stored in directory names, so their datatypes are taken from the schema instead of being
+    # inferred. Dictionary encoded partitions are read as their values and encoded when enforcing the schema
+    arrow_schema = convert_schema_arrow(schema)
+    fields = [arrow_schema.field(name) if name in arrow_schema.names else dataset.schema.field(name)
+              for name in partition_names]
+    fields = [field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+              for field in fields]
+
+    if all(dataset.schema.field(field.name).type == field.type for field in fields):
+        return dataset
+
+    return pa_ds.dataset(path, format='parquet', partitioning=pa_ds.partitioning(pa.schema(fields), flavor='hive'))
+
+
+def read_parquet_batches_to_pandas(path: str, schema: dict, usecols: bool, batch_size: int,
+                                   filters: str = None) -> Iterator[pd.DataFrame]:
+    """
+    Streams a parquet file, or directory of parquet files, row group by row group into pandas dataframes
+    :param path: path to parquet
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :param batch_size: number of rows in each dataframe
+    :param filters: filter expression, see parse_filter_expression
+    :return: iterator of pandas dataframes containing the parquet data
+    """
+    dataset = open_parquet_dataset(path, schema)
+    columns = list(schema.keys()) if usecols else None
+    expression = None if filters is None else parse_filter_expression(filters, dataset.schema)
+
+    batches_read = 0
+    for batch in rebatch(dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size), batch_size):
+        batches_read += 1
+        yield parquet_batch_to_pandas(batch, schema)
+
+    # Always return at least one batch so an empty file yields an empty dataframe with the schema columns
+    if batches_read == 0:
+        yield parquet_batch_to_pandas(dataset.schema.empty_table().select(columns or dataset.schema.names), schema)
+
+
+def read_parquet_to_pandas(path: str, schema: dict, usecols: bool = True, batch_size: int = None,
+                           filters: str = None) -> pd.DataFrame | Iterator[pd.DataFrame]:
+    """
+    Loads a parquet into a pandas dataframe object
+    :param path: path to parquet
+    :param schema: dictionary containing column datatypes
+    :param usecols: Boolean to choose only loading columns defined in the schema
+    :param batch_size: number of rows to stream at a time, the whole file is loaded when not defined
+    :param filters: filter expression pushed down to skip row groups and partitions, see parse_filter_expression
+    :return: pandas dataframe object containing the parquet data, or an iterator of dataframes when streaming
+    """
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+
+    # Stream the parquet data in batches of rows
+    if batch_size is not None:
+        logger.info(f"Streaming in batches of {batch_size} rows.")
+        return read_parquet_batches_to_pandas(path, schema, usecols, batch_size, filters)
+
+    # Parquet files store dtypes in metadata so schema is not required when reading. The filter is pushed down so row
+    # groups and partitions which cannot match are never decompressed
+    dataset = open_parquet_dataset(path, schema)
+    expression = None if filters is None else parse_filter_expression(filters, dataset.schema)
+
+    # Read the parquet data into a pandas dataframe object
+    table = dataset.to_table(columns=list(schema.keys()) if usecols else None, filter=expression)
+    data = table.to_pandas(types_mapper=pandas_types_mapper(schema))
+
+    # Ensure dataframe datatypes match the schema in case parquet file was created incorrectly
+    data = enforce_data_types(data, schema)
+
+    # Return the pandas dataframe object
+    return data
+
+
+# DuckDB datatypes keyed by the schema file datatypes, categories are held as strings
+DUCKDB_TYPES = {
+    'integer': "BIGINT", 'int32': "INTEGER", 'int16': "SMALLINT", 'int8': "TINYINT", 'float': "DOUBLE",
+    'float32': "FLOAT", 'bool': "BOOLEAN", 'date': "DATE", 'string': "VARCHAR", 'category': "VARCHAR",
+}
+
+
+def convert_schema_duckdb(schema: dict) -> dict:
+    """
+    Converts schema values into duckdb datatypes
+    :param schema: dictionary containing columns and datatypes, this is not changed
+    :return: dictionary containing columns and duckdb datatype names
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_duckdb)
+
+    unsupported = {key: val for key, val in schema.items() if schema_type(val) not in DUCKDB_TYPES}
+    if unsupported:
+        raise ValueError(f"Schema datatypes {unsupported} are not supported by duckdb.")
+
+    return {key: DUCKDB_TYPES[schema_type(val)] for key, val in schema.items()}
+
+
+def quote_identifier(name: str) -> str:
+    # Column names are quoted within duckdb sql so any column name can be used
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def enforce_data_types_duckdb(data: any, schema: dict, dataframe_name: str = "") -> any:
+    """
+    Selects the schema columns of a duckdb relation, casting each to its schema datatype and standardising null values
+    in the same way as enforce_data_types
+    :param data: duckdb relation
+    :param schema: dictionary containing column datatypes
+    :param dataframe_name: Name of the dataset
+    :return: duckdb relation containing only the schema columns
+    """
+    duckdb_schema = convert_schema_duckdb(schema)
+    columns = dict(zip(data.columns, [str(data_type) for data_type in data.types]))
+
+    missing_cols = [col for col in duckdb_schema if col not in columns]
+    if missing_cols:
+        raise ValueError(f"Dataset {dataframe_name} is missing the following columns {missing_cols}.")
+
+    expressions = []
+    for col, data_type in duckdb_schema.items():
+        column = quote_identifier(col)
+
+        # Dates held as strings are parsed with the framework date format, values which are not dates become null
+        if data_type == "DATE" and columns[col] == "VARCHAR":
+            expression = f"try_strptime({column}, {quote_literal(DATE_FORMAT)})::DATE"
+
+        # Empty strings and "nan" are nulls within string fields
+        elif data_type == "VARCHAR" and columns[col] == "VARCHAR":
+            expression = (f"CASE WHEN {column} IN ({', '.join(quote_literal(val) for val in NULL_STRINGS)}) THEN NULL "
+                          f"ELSE {column} END")
+
+        else:
+            expression = f"CAST({column} AS {data_type})"
+
+        expressions.append(f"{expression} AS {column}")
+
+    return data.select(", ".join(expressions))
+
+
+def schema_conformance_duckdb(data: any, schema: dict, dataframe_name: str = "") -> dict:
+    """
+    Checks that the passed dataset has datatypes matching the passed schema, without running the relation's query
+    :param data: duckdb relation
+    :param schema: dictionary containing column names and duckdb datatype names
+    :param dataframe_name: Name of the dataset
+    :return: errors in dataframe-schema conformance if any
+    """
+    # Create a holding variable to store any found errors
+    errors = {'incorrect_type': [], 'incorrect_values': []}
+
+    columns = dict(zip(data.columns, [str(data_type) for data_type in data.types]))
+
+    # Relations can not be changed in place, extra columns are dropped when the dataset is written
+    extra_cols = [col for col in columns if col not in schema]
+    if extra_cols:
+        logger.warning(f"The following columns will be dropped from dataset {dataframe_name}: {extra_cols}.")
+
+    # Check for columns in the schemas which are missing from the dataset
+    missing_cols = set(schema.keys()).difference(columns)
+    if len(missing_cols) > 0:
+        errors['missing_columns'] = [f"Dataframe {dataframe_name} is missing the following columns {missing_cols}."]
+
+    # Check the datatypes in the dataframe match those defined in the schema
+    correct_types = {}
+    for col, data_type in columns.items():
+        if col not in schema:
+            continue
+
+        if data_type == schema[col]:
+            correct_types[col] = str(data_type)
+
+        # Save to error dictionary if the datatypes do not match
+        else:
+            errors['incorrect_type'] += [f"Dataframe {dataframe_name} has incorrect datatype in {col} expected "
+                                         f"{schema[col]} got {data_type}."]
+
+    log_correct_types(dataframe_name, correct_types)
+
+    # Return a dictionary of errors between the schema and dataframe
+    return errors
+
+
+def schema_conformance_polars(data: any, schema: dict, dataframe_name: str = "") -> dict:
+    """
+    Checks that the passed dataset has datatypes matching the passed schema, without running a lazy query
+    :param data: polars lazyframe or dataframe
+    :param schema: dictionary containing column names and polars datatypes
+    :param dataframe_name: Name of the dataset
+    :return: errors in dataframe-schema conformance if any
+    """
+    # Create a holding variable to store any found errors
+    errors = {'incorrect_type': [], 'incorrect_values': []}
+
+    # The datatypes of a lazy query are resolved from its plan
+    columns = data.collect_schema()
+
+    # Polars dataframes can not be changed in place, extra columns are dropped when the dataset is written
+    extra_cols = [col for col in columns if col not in schema]
+    if extra_cols:
+        logger.warning(f"The following columns will be dropped from dataset {dataframe_name}: {extra_cols}.")
+
+    # Check for columns in the schemas which are missing from the dataset
+    missing_cols = set(schema.keys()).difference(columns)
+    if len(missing_cols) > 0:
+        errors['missing_columns'] = [f"Dataframe {dataframe_name} is missing the following columns {missing_cols}."]
+
+    # Check the datatypes in the dataframe match those defined in the schema
+    correct_types = {}
+    for col, data_type in columns.items():
+        if col not in schema:
+            continue
+
+        if data_type == schema[col]:
+            correct_types[col] = str(data_type)
+
+        # Save to error dictionary if the datatypes do not match
+        else:
+            errors['incorrect_type'] += [f"Dataframe {dataframe_name} has incorrect datatype in {col} expected "
+                                         f"{schema[col]} got {data_type}."]
+
+    log_correct_types(dataframe_name, correct_types)
+
+    # Return a dictionary of errors between the schema and dataframe
+    return errors
+
+
+@contextmanager
+def extract_zip_member(path: str) -> str:
+    """
+    Extracts the csv within a zip file to a temporary folder, which is removed once the read of the csv finishes
+    :param path: path to zip file
+    :return: path to the extracted csv
+    """
+    with tempfile.TemporaryDirectory(prefix="zip_data_") as folder, zipfile.ZipFile(path) as archive:
+        yield archive.extract(archive.namelist()[0], folder)
+
+
+def read_csv_to_spark(path: str, schema: dict, filters: str = None) -> SparkDataFrame:
+    """
+    Loads a csv or zipped csv into a spark dataframe object
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param filters: filter expression applied as the file is read, see build_filter_expression
+    :return: spark dataframe object containing the csv data
+    """
+    # Spark can not read zip files, so the csv is extracted and read into spark's storage before it is removed
+    if path.split(".")[-1].lower() == "zip":
+        with extract_zip_member(path) as csv_path:
+            return read_csv_to_spark(csv_path, schema, filters).localCheckpoint(eager=True)
+
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    # Columns are read as strings and matched to the schema by name, so the column order of the file does not matter
+    data = get_spark_session().read.csv(path, header=True, inferSchema=False, escape='"')
+
+    # Ensure dataframe datatypes match the schema
+    data = enforce_data_types_spark(data, schema, dataframe_name=path)
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+        data = data.filter(parse_filter_expression_spark(filters, convert_schema_spark(schema)))
+
+    # Return the spark dataframe object
+    return data
+
+
+def read_parquet_to_spark(path: str, schema: dict, filters: str = None) -> SparkDataFrame:
+    """
+    Loads a parquet file or directory of parquet files into a spark dataframe object, partition columns are read from
+    the partition directory names
+    :param path: path to parquet file or directory
+    :param schema: dictionary containing column datatypes
+    :param filters: filter expression applied as the files are read, see build_filter_expression
+    :return: spark dataframe object containing the parquet data
+    """
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    data = get_spark_session().read.parquet(path)
+
+    # Ensure dataframe datatypes match the schema in case parquet file was created incorrectly
+    data = enforce_data_types_spark(data, schema, dataframe_name=path)
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+        data = data.filter(parse_filter_expression_spark(filters, convert_schema_spark(schema)))
+
+    # Return the spark dataframe object
+    return data
+
+
+def read_csv_to_polars(path: str, schema: dict, filters: str = None) -> any:
+    """
+    Scans a csv or zipped csv into a polars lazyframe object, the file is only read once the lazy query is collected.
+    Zipped csvs are extracted and read when scanned, as the extracted csv is removed once read
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param filters: filter expression pushed down into the csv scan, see build_filter_expression
+    :return: polars lazyframe object containing the csv data
+    """
+    # Polars can not scan zip files, so the csv is extracted and the filtered data read before it is removed
+    if path.split(".")[-1].lower() == "zip":
+        with extract_zip_member(path) as csv_path:
+            return read_csv_to_polars(csv_path, schema, filters).collect().lazy()
+
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    # Numeric columns are parsed by the csv reader, the remaining columns are read as strings and parsed after
+    polars_schema = convert_schema_polars(schema)
+    data = pl.scan_csv(path, infer_schema=False, null_values=CSV_NULL_STRINGS,
+                       schema_overrides={key: val for key, val in polars_schema.items() if val.is_numeric()})
+
+    # Ensure dataframe datatypes match the schema
+    data = enforce_data_types_polars(data, schema, dataframe_name=path)
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+        data = data.filter(parse_filter_expression_polars(filters, polars_schema))
+
+    # Return the polars lazyframe object
+    return data
+
+
+def read_parquet_to_polars(path: str, schema: dict, filters: str = None) -> any:
+    """
+    Scans a parquet file or directory of parquet files into a polars lazyframe object, partition columns are read from
+    the partition directory names. The files are only read once the lazy query is collected
+    :param path: path to parquet file or directory
+    :param schema: dictionary containing column datatypes
+    :param filters: filter expression pushed down into the parquet scan, see build_filter_expression
+    :return: polars lazyframe object containing the parquet data
+    """
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    # Directories are scanned for parquet files, skipping any other files saved alongside them
+    source = os.path.join(path, "**", "*.parquet") if os.path.isdir(path) else path
+    data = pl.scan_parquet(source, hive_partitioning=os.path.isdir(path))
+
+    # Ensure dataframe datatypes match the schema in case parquet file was created incorrectly
+    data = enforce_data_types_polars(data, schema, dataframe_name=path)
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+        data = data.filter(parse_filter_expression_polars(filters, convert_schema_polars(schema)))
+
+    # Return the polars lazyframe object
+    return data
+
+
+def read_csv_to_duckdb(connection: any, path: str, schema: dict, filters: str = None) -> any:
+    """
+    Creates a duckdb relation over a csv or zipped csv, the file is only read when the relation's query is run. Zipped
+    csvs are extracted and read into a duckdb table, as the extracted csv is removed once read
+    :param connection: duckdb connection the relation is created in
+    :param path: path to csv
+    :param schema: dictionary containing column datatypes
+    :param filters: filter expression pushed down into the csv reader, see build_filter_expression
+    :return: duckdb relation containing the csv data
+    """
+    # DuckDB can not read zip files, so the csv is extracted and the filtered data read into a table before it is
+    # removed. The table is held by the connection, spilling to its temporary directory when memory is limited
+    if path.split(".")[-1].lower() == "zip":
+        with extract_zip_member(path) as csv_path:
+            table_name = f"zip_data_{uuid.uuid4().hex}"
+            read_csv_to_duckdb(connection, csv_path, schema, filters).to_table(table_name)
+            return connection.table(table_name)
+
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    # Numeric columns are parsed by the csv reader, the remaining schema columns are read as strings and parsed after
+    duckdb_schema = convert_schema_duckdb(schema)
+    types = ", ".join(f"{quote_literal(key)}: {quote_literal(val if val not in ['DATE'] else 'VARCHAR')}"
+                      for key, val in duckdb_schema.items())
+    null_values = ", ".join(quote_literal(val) for val in CSV_NULL_STRINGS)
+
+    data = connection.sql(f"SELECT * FROM read_csv({quote_literal(path)}, header = true, nullstr = [{null_values}], "
+                          f"types = {{{types}}})")
+
+    # Ensure dataframe datatypes match the schema
+    data = enforce_data_types_duckdb(data, schema, dataframe_name=path)
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+        data = data.filter(parse_filter_expression_duckdb(filters, duckdb_schema))
+
+    # Return the duckdb relation
+    return data
+
+
+def read_parquet_to_duckdb(connection: any, path: str, schema: dict, filters: str = None) -> any:
+    """
+    Creates a duckdb relation over a parquet file or directory of parquet files, partition columns are read from the
+    partition directory names. The files are only read when the relation's query is run
+    :param connection: duckdb connection the relation is created in
+    :param path: path to parquet file or directory
+    :param schema: dictionary containing column datatypes
+    :param filters: filter expression pushed down into the parquet reader, see build_filter_expression
+    :return: duckdb relation containing the parquet data
+    """
+    logger.info(f"Loading columns: {list(schema.keys())}")
+
+    # Directories are read for parquet files, skipping any other files saved alongside them
+    source = os.path.join(path, "**", "*.parquet") if os.path.isdir(path) else path
+    data = connection.sql(f"SELECT * FROM read_parquet({quote_literal(source)}, "
+                          f"hive_partitioning = {str(os.path.isdir(path)).lower()}, union_by_name = true)")
+
+    # Ensure dataframe datatypes match the schema in case parquet file was created incorrectly
+    data = enforce_data_types_duckdb(data, schema, dataframe_name=path)
+
+    if filters is not None:
+        logger.info(f"Filtering rows with: {filters}")
+        data = data.filter(parse_filter_expression_duckdb(filters, convert_schema_duckdb(schema)))
+
+    # Return the duckdb relation
+    return data
+
+
+def convert_schema_csv_arrow(schema: dict) -> pa.Schema:
+    """
+    Converts schema values into an arrow schema that is compatible with the pyarrow csv writer, dates are written
+    without a time and categories are written as their values
+    :param schema: dictionary containing columns and datatypes, either as in the schema files or converted for pandas
+    :return: arrow schema containing columns and arrow datatypes
+    """
+    if isinstance(schema, CompiledSchema):
+        return schema.convert(convert_schema_csv_arrow)
+
+    return pa.schema([field.with_type(pa.date32()) if pa.types.is_timestamp(field.type) else
+                      field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field
+                      for field in convert_schema_arrow(schema)])
+
+
+def to_arrow_table(data: pd.DataFrame | pa.Table | pa.RecordBatch, arrow_schema: pa.Schema) -> pa.Table:
+    """
+    Converts data being saved into an arrow table with the column order and datatypes of the arrow schema
+    :param data: pandas dataframe, arrow table, arrow record batch or polars dataframe or lazyframe
+    :param arrow_schema: arrow schema the saved data must follow
+    :return: arrow table
+    """
+    # Polars lazy queries are run here, so only the columns being saved are computed
+    if pl is not None and isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+        data = data.lazy().select(arrow_schema.names).collect().to_arrow()
+
+    if isinstance(data, pd.DataFrame):
+        table = pa.Table.from_pandas(data[arrow_schema.names], preserve_index=False)
+    elif isinstance(data, pa.RecordBatch):
+        table = pa.Table.from_batches([data]).select(arrow_schema.names)
+    else:
+        table = data.select(arrow_schema.names)
+
+    return table.cast(arrow_schema)
+
+
+# Characters which must be quoted in a csv value, as the pandas csv writer quotes them
+CSV_QUOTED_CHARACTERS = r'[,"\r\n]'
+
+
+def csv_write_options(table: pa.Table) -> pa_csv.WriteOptions:
+    """
+    Defines the pyarrow csv writer options for the rows of a table, values are only quoted when a string value in the
+    table contains a separator, quote or line break, so the csv files match those saved by pandas
+    :param table: arrow table to be saved
+    :return: pyarrow csv write options, the header is written separately by write_csv_header
+    """
+    needs_quoting = False
+    for column in table.columns:
+        if needs_quoting:
+            break
+
+        # Category columns are checked on their string values
+        if pa.types.is_dictionary(column.type):
+            column = pc.cast(column, column.type.value_type)
+
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            needs_quoting = bool(pc.any(pc.match_substring_regex(column, CSV_QUOTED_CHARACTERS)).as_py())
+
+    # Arrow quotes every string value when any quoting is used, so the rows are unquoted whenever possible
+    return pa_csv.WriteOptions(include_header=False, quoting_style='needed' if needs_quoting else 'none')
+
+
+def write_csv_header(file: any, names: list) -> None:
+    """
+    Writes the csv header line, column names are only quoted when needed as the pyarrow writer quotes every name
+    :param file: binary file object
+    :param names: column names
+    """
+    header = io.StringIO()
+    csv.writer(header, lineterminator='\n').writerow(names)
+    file.write(header.getvalue().encode('utf-8'))
+
+
+def write_csv_table(table: pa.Table, file: any) -> None:
+    """
+    Writes an arrow table to a csv file in the format saved by pandas, nulls are written as empty values
+    :param table: arrow table
+    :param file: binary file object
+    """
+    write_csv_header(file, table.column_names)
+    pa_csv.write_csv(table, file, write_options=csv_write_options(table))
+
+
+def write_csv_from_pandas(data: pd.DataFrame, path: str, schema: dict) -> None:
+    """
+    Save dataframe data to csv file
+    :param data: pandas dataframe object
+    :param path: path to save csv file
+    :param schema: dictionary containing column datatypes
+    """
+    # Convert the data to arrow so it is formatted by the pyarrow csv writer rather than row by row in python
+    table = to_arrow_table(data, convert_schema_csv_arrow(schema))
+
+    # Save data to csv file
+    with open(path, 'wb') as file:
+        write_csv_table(table, file)
+
+
+def remove_dataset(path: str) -> None:
+    """
+    Removes a previously saved dataset, so partitions which are no longer written are not read back with new data
+    :param path: path to a file or directory of files
+    """
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.isfile(path):
+        os.remove(path)
+
+
+def check_parquet_options(schema: dict, partition_cols: list, compression: str) -> None:
+    """
+    Checks the parquet write options before any previously saved data is removed
+    :param schema: dictionary containing column datatypes
+    :param partition_cols: columns to partition the parquet files on
+    :param compression: compression codec
+    """
+    if compression not in PARQUET_COMPRESSION:
+        raise ValueError(f"Parquet compression '{compression}' is not supported, compression can take values "
+                         f"{PARQUET_COMPRESSION}.")
+
+    missing_cols = set(partition_cols).difference(schema.keys())
+    if missing_cols:
+        raise ValueError(f"Partition columns {missing_cols} are not defined in the schema.")
+
+
+def write_parquet_dataset(table: pa.Table, path: str, partition_cols: list = None, row_group_size: int = None,
+                          compression: str = 'gzip', target_file_size: int = None,
+                          basename_template: str = None) -> None:
+    """
+    Save an arrow table into a directory of parquet files, optionally hive partitioned
+    :param table: arrow table
+    :param path: path to save parquet directory
+    :param partition_cols: columns to partition the parquet files on, each value is saved in its own directory
+    :param row_group_size: maximum number of rows in each parquet row group
+    :param compression: compression codec, one of PARQUET_COMPRESSION
+    :param target_file_size: approximate size in bytes of each parquet file
+    :param basename_template: file name template, files with other names already in the directory are kept
+    """
+    partition_cols = [] if partition_cols is None else list(partition_cols)
+
+    # Date partitions are saved as dates so directories are named e.g. period_date=2024-01-31
+    for column in partition_cols:
+        if pa.types.is_timestamp(table.schema.field(column).type):
+            table = table.set_column(table.schema.get_field_index(column), column,
+                                     pc.cast(table[column], pa.date32()))
+
+    # Define the key word arguments
+    kwargs = {'root_path': path, 'partition_cols': partition_cols or None,
+              'compression': None if compression == 'none' else compression, 'basename_template': basename_template}
+
+    # Files are split by row count, estimated from the in memory size so compressed files are at most the target size
+    if target_file_size is not None and table.num_rows > 0:
+        kwargs['max_rows_per_file'] = max(1, int(target_file_size * table.num_rows / max(table.nbytes, 1)))
+        row_group_size = min(row_group_size or kwargs['max_rows_per_file'], kwargs['max_rows_per_file'])
+
+    if row_group_size is not None:
+        kwargs['row_group_size'] = row_group_size
+
+    # Save data to parquet files
+    pq.write_to_dataset(table, **kwargs)
+
+
+def write_parquet_from_pandas(data: pd.DataFrame, path: str, schema: dict, partition_cols: list = None,
+                              row_group_size: int = None, compression: str = 'gzip',
+                              target_file_size: int = None) -> None:
+    """
+    Save dataframe data to a directory of parquet files, optionally hive partitioned
+    :param data: pandas dataframe object
+    :param path: path to save parquet directory
+    :param schema: dictionary containing column datatypes
+    :param partition_cols: columns to partition the parquet files on, each value is saved in its own directory
+    :param row_group_size: maximum number of rows in each parquet row group
+    :param compression: compression codec, one of PARQUET_COMPRESSION
+    :param target_file_size: approximate size in bytes of each parquet file
+    """
+    partition_cols = [] if partition_cols is None else list(partition_cols)
+
+    # Check the write options before removing any previously saved data
+    check_parquet_options(schema, partition_cols, compression)
+
+    table = to_arrow_table(data, convert_schema_arrow(schema))
+
+    # Save data to parquet files
+    remove_dataset(path)
+    write_parquet_dataset(table, path, partition_cols, row_group_size, compression, target_file_size)
+
+
+def open_zip_member(path: str) -> tuple:
+    """
+    Creates a zip file containing a single csv file, named after the zip file, which can be written to as a stream
+    :param path: path to save zip file
+    :return: the zip file and the opened csv file within it
+    """
+    archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+
+    return archive, archive.open(f"{os.path.splitext(os.path.basename(path))[0]}.csv", 'w')
+
+
+def write_zip_from_pandas(data: pd.DataFrame, path: str, schema: dict) -> None:
+    """
+    Save dataframe data to zip file
+    :param data: pandas dataframe object
+    :param path: path to save zip file
+    :param schema: dictionary containing column datatypes
+    """
+    # Convert the data to arrow so it is formatted by the pyarrow csv writer rather than row by row in python
+    table = to_arrow_table(data, convert_schema_csv_arrow(schema))
+
+    # Save data to zip file
+    archive, file = open_zip_member(path)
+    with archive, file:
+        write_csv_table(table, file)
+
+
+def write_spark_csv_part(data: SparkDataFrame, folder: str, schema: dict) -> str:
+    """
+    Save a spark dataframe as a single csv file within a folder
+    :param data: spark dataframe object
+    :param folder: path to the folder spark saves into, replacing its contents
+    :param schema: dictionary containing column datatypes
+    :return: path to the saved csv file
+    """
+    # Spark saves a file for each partition of the data, which are combined so a single csv file is saved
+    data.select(list(schema.keys())).coalesce(1).write.mode('overwrite') \
+        .csv(folder, header=True, dateFormat="yyyy-MM-dd", escape='"')
+
+    return [os.path.join(folder, name) for name in os.listdir(folder) if name.endswith(".csv")][0]
+
+
+def write_csv_from_spark(data: SparkDataFrame, path: str, schema: dict) -> None:
+    """
+    Save spark dataframe data to csv file
+    :param data: spark dataframe object
+    :param path: path to save csv file
+    :param schema: dictionary containing column datatypes
+    """
+    folder = f"{path}_spark"
+
+    try:
+        os.replace(write_spark_csv_part(data, folder, schema), path)
+    finally:
+        remove_dataset(folder)
+
+
+def write_parquet_from_spark(data: SparkDataFrame, path: str, schema: dict, partition_cols: list = None,
+                             compression: str = 'gzip') -> None:
+    """
+    Save spark dataframe data into a directory of parquet files, optionally hive partitioned, replacing any previously
+    saved data. Spark saves a parquet file for each partition of the data
+    :param data: spark dataframe object
+    :param path: path to save parquet directory
+    :param schema: dictionary containing column datatypes
+    :param partition_cols: columns to partition the parquet files on, each value is saved in its own directory
+    :param compression: compression codec, one of PARQUET_COMPRESSION
+    """
+    partition_cols = [] if partition_cols is None else list(partition_cols)
+
+    # Check the write options before removing any previously saved data
+    check_parquet_options(schema, partition_cols, compression)
+
+    data.select(list(schema.keys())).write.mode('overwrite').partitionBy(*partition_cols) \
+        .parquet(path, compression='uncompressed' if compression == 'none' else compression)
+
+
+def write_zip_from_spark(data: SparkDataFrame, path: str, schema: dict) -> None:
+    """
+    Save spark dataframe data to zip file
+    :param data: spark dataframe object
+    :param path: path to save zip file
+    :param schema: dictionary containing column datatypes
+    """
+    folder = f"{path}_spark"
+
+    try:
+        csv_path = write_spark_csv_part(data, folder, schema)
+
+        # Save data to zip file
+        archive, file = open_zip_member(path)
+        with archive, file, open(csv_path, 'rb') as csv_file:
+            shutil.copyfileobj(csv_file, file)
+    finally:
+        remove_dataset(folder)
+
+
+def write_csv_from_polars(data: any, path: str, schema: dict) -> None:
+    """
+    Save polars dataframe data to csv file, running the query of a polars lazyframe
+    :param data: polars lazyframe or dataframe object
+    :param path: path to save csv file
+    :param schema: dictionary containing column datatypes
+    """
+    # Polars data is converted to arrow and saved by the same writer as pandas data, so both save identical files
+    write_csv_from_pandas(data, path, schema)
+
+
+def write_parquet_from_polars(data: any, path: str, schema: dict, partition_cols: list = None,
+                              row_group_size: int = None, compression: str = 'gzip',
+                              target_file_size: int = None) -> None:
+    """
+    Save polars dataframe data to a directory of parquet files, optionally hive partitioned, running the query of a
+    polars lazyframe
+    :param data: polars lazyframe or dataframe object
+    :param path: path to save parquet directory
+    :param schema: dictionary containing column datatypes
+    :param partition_cols: columns to partition the parquet files on, each value is saved in its own directory
+    :param row_group_size: maximum number of rows in each parquet row group
+    :param compression: compression codec, one of PARQUET_COMPRESSION
+    :param target_file_size: approximate size in bytes of each parquet file
+    """
+    write_parquet_from_pandas(data, path, schema, partition_cols, row_group_size, compression, target_file_size)
+
+
+def write_zip_from_polars(data: any, path: str, schema: dict) -> None:
+    """
+    Save polars dataframe data to zip file, running the query of a polars lazyframe
+    :param data: polars lazyframe or dataframe object
+    :param path: path to save zip file
+    :param schema: dictionary containing column datatypes
+    """
+    write_zip_from_pandas(data, path, schema)
@@ -0,0 +1,65 @@
+import copy
+import logging
+import os
+import threading
+
+from framework.setup import read_write_data
+from framework.setup.meta_classes.singleton import ThreadSafeSingletonMeta
+
+logger = logging.getLogger()
+
+
+class SchemaRegistry(metaclass=ThreadSafeSingletonMeta):
+    """
+    Process wide store of the schema and config files read by the framework. Each file is parsed once and held until
+    its modified time or size changes. Schemas are shared as read only compiled schemas which hold their converted
+    pandas and arrow datatypes, configs are returned as copies so callers can never change the stored config.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(path: str) -> str:
+        return os.path.normcase(os.path.abspath(path))
+
+    def get(self, path: str, parse: callable) -> any:
+        # Entries are checked against the file on every call, so edited files are parsed again
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        key = self.get_key(path)
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is None or entry[0] != version:
+                if entry is not None:
+                    logger.debug(f"File {path} has changed since it was read and will be read again.")
+                entry = (version, parse(path))
+                self.entries[key] = entry
+
+        return entry[1]
+
+    def read_schema(self, path: str | tuple) -> read_write_data.CompiledSchema:
+        """
+        Reads a json schema file into a read only compiled schema
+        :param path: string pointing to a json file, or tuple containing imported module and file name
+        :return: compiled schema shared by every caller reading the same file
+        """
+        if isinstance(path, tuple):
+            path = os.path.join(os.path.dirname(path[0].__file__), path[1])
+
+        return self.get(path, lambda file: read_write_data.CompiledSchema(read_write_data.read_json_abs(path=file)))
+
+    def read_config(self, path: str) -> dict:
+        """
+        Reads a yaml config file into a dictionary
+        :param path: string pointing to a yaml file
+        :return: copy of the dictionary containing yaml file's content
+        """
+        return copy.deepcopy(self.get(path, lambda file: read_write_data.read_yaml(path=file)))
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries = {}
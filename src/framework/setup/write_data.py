@@ -1,6 +1,12 @@
+import os
 from abc import ABC, abstractmethod
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from framework.setup import read_write_data
 
 
 class IWriteData(ABC):
@@ -17,3 +23,137 @@ class IWriteDataFromPandas(IWriteData):
     @abstractmethod
     def schema_conformance(self, data: pd.DataFrame, schema: dict) -> any:
         pass
+
+
+class IStreamWriteData(ABC):
+    """
+    Saves a dataset incrementally, so the full dataset never has to be held in memory. Each call to write appends a
+    pandas dataframe, arrow table or arrow record batch to the dataset, which is complete once the writer is closed
+    """
+
+    def __init__(self, path: str, schema: dict):
+        self.path = path
+        self.schema = schema
+
+    @abstractmethod
+    def write(self, data: pd.DataFrame | pa.Table | pa.RecordBatch) -> None:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class StreamWriteCSV(IStreamWriteData):
+
+    def __init__(self, path: str, schema: dict):
+        super().__init__(path, schema)
+        self.arrow_schema = read_write_data.convert_schema_csv_arrow(schema)
+        self.file = self.open_file()
+
+        # The header is written when the file is opened, so a dataset without any rows still has its columns
+        read_write_data.write_csv_header(self.file, self.arrow_schema.names)
+
+    def open_file(self) -> any:
+        return open(self.path, 'wb')
+
+    def write(self, data: pd.DataFrame | pa.Table | pa.RecordBatch) -> None:
+        table = read_write_data.to_arrow_table(data, self.arrow_schema)
+
+        # Quoting is chosen for each batch, so only batches containing separators or quotes are quoted
+        pa_csv.write_csv(table, self.file, write_options=read_write_data.csv_write_options(table))
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class StreamWriteZip(StreamWriteCSV):
+
+    def __init__(self, path: str, schema: dict):
+        self.archive = None
+        super().__init__(path, schema)
+
+    def open_file(self) -> any:
+        self.archive, file = read_write_data.open_zip_member(self.path)
+
+        return file
+
+    def close(self) -> None:
+        super().close()
+        self.archive.close()
+
+
+class StreamWriteParquet(IStreamWriteData):
+
+    def __init__(self, path: str, schema: dict, partition_cols: list = None, row_group_size: int = None,
+                 compression: str = 'gzip', target_file_size: int = None):
+        super().__init__(path, schema)
+        self.partition_cols = [] if partition_cols is None else list(partition_cols)
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.target_file_size = target_file_size
+        self.arrow_schema = read_write_data.convert_schema_arrow(schema)
+
+        self.writer = None
+        self.files = 0
+        self.file_rows = 0
+        self.rows_per_file = None
+        self.batches = 0
+
+        # Check the write options before removing any previously saved data
+        read_write_data.check_parquet_options(schema, self.partition_cols, compression)
+        read_write_data.remove_dataset(path)
+        os.makedirs(path)
+
+    def open_writer(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+        self.writer = pq.ParquetWriter(os.path.join(self.path, f"part-{self.files}.parquet"), self.arrow_schema,
+                                       compression=None if self.compression == 'none' else self.compression)
+        self.files += 1
+        self.file_rows = 0
+
+    def write(self, data: pd.DataFrame | pa.Table | pa.RecordBatch) -> None:
+        table = read_write_data.to_arrow_table(data, self.arrow_schema)
+        self.batches += 1
+
+        # Partitioned datasets save each batch into the partition directories under a name unique to the batch
+        if self.partition_cols:
+            read_write_data.write_parquet_dataset(table, self.path, self.partition_cols, self.row_group_size,
+                                                  self.compression, self.target_file_size,
+                                                  basename_template=f"part-{self.batches}-{{i}}.parquet")
+            return
+
+        # Rows per file are estimated from the in memory size of the first batch, as in write_parquet_dataset
+        if self.target_file_size is not None and self.rows_per_file is None and table.num_rows > 0:
+            self.rows_per_file = max(1, int(self.target_file_size * table.num_rows / max(table.nbytes, 1)))
+
+        # Append the rows to the open parquet file, starting a new file whenever the current file is full
+        offset = 0
+        while offset < table.num_rows:
+            if self.writer is None or (self.rows_per_file is not None and self.file_rows >= self.rows_per_file):
+                self.open_writer()
+
+            length = table.num_rows - offset if self.rows_per_file is None else \
+                min(table.num_rows - offset, self.rows_per_file - self.file_rows)
+
+            self.writer.write_table(table.slice(offset, length), row_group_size=self.row_group_size)
+            self.file_rows += length
+            offset += length
+
+    def close(self) -> None:
+        # A dataset without any rows is saved as a single empty file so it can still be read with its columns
+        if self.writer is None and not self.partition_cols:
+            self.open_writer()
+        elif self.writer is None and not os.listdir(self.path):
+            pq.write_table(self.arrow_schema.empty_table(), os.path.join(self.path, "part-0.parquet"))
+
+        if self.writer is not None:
+            self.writer.close()
@@ -2,24 +2,24 @@ import logging
 
 import pandas as pd
 
+from framework.joins import left_join
 from framework.model import BaseModel
 
 logger = logging.getLogger()
 
 
 class ExampleModel(BaseModel):
+    # The PD data is left joined onto the other inputs, so each ECL row depends on a single PD row
+    row_local_input = 'pd_data'
+    join_keys = ['customer_id', 'year', 'period_date']
 
     def __init__(self, input_data: dict, parameters: pd.DataFrame = pd.DataFrame()):
         super().__init__(input_data, parameters)
 
     def run(self):
-        logger.info("Joining PD and LGD Datasets.")
-        ecl_data = pd.merge(self.model_data['pd_data'], self.model_data['lgd_data'],
-                            on=['customer_id', 'year', 'period_date'], how='left')
-
-        logger.info("Joining PD and EAD Datasets.")
-        ecl_data = pd.merge(ecl_data, self.model_data['ead_data'],
-                            on=['customer_id', 'year', 'period_date'], how='left')
+        logger.info("Joining PD, LGD and EAD Datasets.")
+        ecl_data = left_join(self.model_data['pd_data'], [self.model_data['lgd_data'], self.model_data['ead_data']],
+                             on=self.join_keys)
 
         logger.info("Calculating ECL.")
         ecl_data['pit_ecl'] = ecl_data['pit_pd'] * ecl_data['pit_lgd'] * ecl_data['pit_ead']
@@ -0,0 +1,30 @@
+import logging
+
+import pandas as pd
+
+from framework.model import BaseModel
+from framework.setup.duckdb_engine import DuckDBEngine
+
+logger = logging.getLogger()
+
+
+class ExampleModelDuckDB(BaseModel):
+    # DuckDB version of ExampleModel. The inputs are views in the duckdb engine named after each input dataset, so the
+    # joins and calculations are expressed as sql which duckdb runs out of core when the outputs are written
+
+    def __init__(self, input_data: dict, engine: DuckDBEngine, parameters: pd.DataFrame = pd.DataFrame()):
+        super().__init__(input_data, parameters)
+        self.engine = engine
+
+    def run(self):
+        logger.info("Joining PD, LGD and EAD Datasets and Calculating ECL.")
+        ecl_data = self.engine.sql("""
+            SELECT *,
+                   pit_pd * pit_lgd * pit_ead AS pit_ecl,
+                   avg_pd * avg_lgd * avg_ead AS avg_ecl
+            FROM pd_data
+            LEFT JOIN lgd_data USING (customer_id, year, period_date)
+            LEFT JOIN ead_data USING (customer_id, year, period_date)
+        """)
+
+        return {'ecl_data': ecl_data}
@@ -0,0 +1,30 @@
+import logging
+
+import pandas as pd
+import polars as pl
+
+from framework.model import BaseModel
+
+logger = logging.getLogger()
+
+
+class ExampleModelPolars(BaseModel):
+    # Polars version of ExampleModel. The inputs are polars lazyframes, so the joins and calculations below only build
+    # a query plan, which is optimised and run on all cores when the outputs are written
+
+    def __init__(self, input_data: dict, parameters: pd.DataFrame = pd.DataFrame()):
+        super().__init__(input_data, parameters)
+
+    def run(self):
+        logger.info("Joining PD and LGD Datasets.")
+        ecl_data = self.model_data['pd_data'].join(self.model_data['lgd_data'],
+                                                   on=['customer_id', 'year', 'period_date'], how='left')
+
+        logger.info("Joining PD and EAD Datasets.")
+        ecl_data = ecl_data.join(self.model_data['ead_data'], on=['customer_id', 'year', 'period_date'], how='left')
+
+        logger.info("Calculating ECL.")
+        ecl_data = ecl_data.with_columns(pit_ecl=pl.col('pit_pd') * pl.col('pit_lgd') * pl.col('pit_ead'),
+                                         avg_ecl=pl.col('avg_pd') * pl.col('avg_lgd') * pl.col('avg_ead'))
+
+        return {'ecl_data': ecl_data}
@@ -1,12 +1,18 @@
 # TODO: To use this template copy and rename this file.
 # TODO: See example_model_chain.py for reference.
+import argparse
+
 from framework.model_chain import ModelChain
 
 if __name__ == "__main__":
     # TODO: Add path to desired model chain yaml config file.
     _config_path = ""
 
+    parser = argparse.ArgumentParser(description="Run the model chain.")
+    parser.add_argument('--force', action='store_true', help="run every model even when its outputs are up to date")
+    args = parser.parse_args()
+
     model_chain = ModelChain(_config_path)
 
-    model_chain.run_chain()
+    model_chain.run_chain(force=args.force)
 # TODO: Delete all TODO comments and format file.
@@ -36,6 +36,11 @@ class TemplateWrapper(ModelWrapper):
             'data': (model_schemas, "data_schema.json"),  # TODO: Delete "data" entry once no longer needed.
         }
 
+    # TODO: Optional: if the model is row-local over one input dataset (see BaseModel.row_local_input) return the
+    # TODO: model's row_local_input to allow batch execution, otherwise delete this method.
+    def define_row_local_input(self) -> str:
+        return Model.row_local_input
+
     def run_model(self) -> dict:
         model_result = Model(input_data=self.data_dict, parameters=self.parameters).run()
 
@@ -1,8 +1,14 @@
+import argparse
+
 from framework.model_chain import ModelChain
 
 if __name__ == "__main__":
     _config_path = "config/model_config/model_chains/example_model_chain_config.yml"
 
+    parser = argparse.ArgumentParser(description="Run the example model chain.")
+    parser.add_argument('--force', action='store_true', help="run every model even when its outputs are up to date")
+    args = parser.parse_args()
+
     model_chain = ModelChain(_config_path)
 
-    model_chain.run_chain()
+    model_chain.run_chain(force=args.force)
@@ -24,12 +24,41 @@ class ExampleModelWrapper(ModelWrapper):
             'ecl_data': (model_schemas, "ecl_data_schema.json")
         }
 
+    def define_row_local_input(self) -> str:
+        return Model.row_local_input
+
+    def define_join_keys(self) -> list:
+        return Model.join_keys
+
     def run_model(self) -> dict:
         model_result = Model(input_data=self.data_dict, parameters=self.parameters).run()
 
         return model_result
 
 
+class ExampleModelPolarsWrapper(ExampleModelWrapper):
+
+    def run_model(self) -> dict:
+        # Imported here so the pandas model can be run without polars installed
+        from models.model_scripts.example_model.example_model_polars import ExampleModelPolars
+
+        model_result = ExampleModelPolars(input_data=self.data_dict, parameters=self.parameters).run()
+
+        return model_result
+
+
+class ExampleModelDuckDBWrapper(ExampleModelWrapper):
+
+    def run_model(self) -> dict:
+        # Imported here so the pandas model can be run without duckdb installed
+        from models.model_scripts.example_model.example_model_duckdb import ExampleModelDuckDB
+
+        model_result = ExampleModelDuckDB(input_data=self.data_dict, engine=self.engine,
+                                          parameters=self.parameters).run()
+
+        return model_result
+
+
 if __name__ == "__main__":
     DeployWrapper(model_wrapper=ExampleModelWrapper, sys_config='config/system_config.yml',
                   model_config='config/model_config/example_model/example_model_config.yml').run_model()
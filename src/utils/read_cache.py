@@ -0,0 +1,39 @@
+"""
+This script inspects and clears the read cache of parsed input datasets, see read_cache in the system config yaml.
+
+Usage from the src directory:
+    python -m utils.read_cache list
+    python -m utils.read_cache clear
+"""
+
+import argparse
+import os
+
+from config import PY_ROOT_DIR
+from framework.setup.read_cache import ReadCache
+from framework.setup.read_write_data import read_yaml
+
+
+def get_read_cache(sys_config: str) -> ReadCache:
+    cache_config = read_yaml(path=os.path.join(PY_ROOT_DIR, sys_config))['read_cache']
+
+    return ReadCache(cache_dir=os.path.join(PY_ROOT_DIR, cache_config['cache_folder']),
+                     max_size=int(float(cache_config['max_size_gb']) * 1000000000))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inspect or clear the read cache of parsed input datasets.")
+    parser.add_argument('command', choices=['list', 'clear'], help="list the cached datasets or clear the cache")
+    parser.add_argument('--sys-config', default="config/system_config.yml", help="path to the system config yaml")
+    args = parser.parse_args()
+
+    read_cache = get_read_cache(args.sys_config)
+
+    if args.command == 'clear':
+        read_cache.clear()
+
+    print(read_cache.describe())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.framework.dataset_registry import DatasetRegistry
+from src.framework.setup.read_write_data import convert_schema_pandas, read_csv_to_pandas, write_csv_from_pandas
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column": 'integer', "float_column": 'float', "string_column": 'string'}
+
+
+@pytest.fixture
+def dataframe(file_schema):
+    # Arrange
+    return pd.DataFrame({"integer_column": [1, 2], "float_column": [1.5, 2.5],
+                         "string_column": ["a", "b"]}).astype(convert_schema_pandas(dict(file_schema)))
+
+
+"""
+Unit tests for the methods contained within the src.framework.dataset_registry.DatasetRegistry class
+"""
+
+
+def test_dataset_registry_1(file_schema, dataframe, tmp_path):
+    """
+    Testing that registered outputs are read from memory as copies and saved in the background
+    """
+    # Arrange
+    path = os.path.join(tmp_path, "output.csv")
+    registry = DatasetRegistry()
+
+    # Act
+    registry.register(path, dataframe, lambda: write_csv_from_pandas(dataframe, path, file_schema))
+    result = registry.read_to_pandas(os.path.join(tmp_path, ".", "output.csv"),
+                                     convert_schema_pandas({"integer_column": 'float', "string_column": 'string'}))
+    result.loc[0, 'string_column'] = "changed"
+    registry.close()
+
+    # Assert
+    assert list(result.columns) == ["integer_column", "string_column"]
+    assert result['integer_column'].dtype == pd.Float64Dtype()
+    assert dataframe.loc[0, 'string_column'] == "a"
+    assert read_csv_to_pandas(path, convert_schema_pandas(dict(file_schema))).equals(dataframe)
+
+
+def test_dataset_registry_2(dataframe, tmp_path, caplog):
+    """
+    Testing that failed background saves are raised when waited on and released outputs are dropped from memory
+    """
+    # Arrange
+    path = os.path.join(tmp_path, "output.csv")
+    registry = DatasetRegistry()
+
+    def save() -> None:
+        raise OSError("Disk full")
+
+    # Act
+    registry.register(path, dataframe, save)
+    registry.release(keep=set())
+
+    # Assert
+    assert path not in registry
+    with pytest.raises(OSError, match="Disk full"):
+        registry.close()
+    assert "Failed to save dataset" in caplog.text
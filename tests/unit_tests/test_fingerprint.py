@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from src.framework.fingerprint import get_source_files, hash_path, is_up_to_date, write_fingerprint
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def folder(tmp_path):
+    # Arrange
+    os.makedirs(os.path.join(tmp_path, "data", "year=2024"))
+    for name in ["part-0.parquet", os.path.join("year=2024", "part-1.parquet")]:
+        with open(os.path.join(tmp_path, "data", name), 'w') as file:
+            file.write(name)
+
+    return os.path.join(tmp_path, "data")
+
+
+"""
+Unit tests for the functions contained within the src.framework.fingerprint module
+"""
+
+
+def test_hash_path_1(folder):
+    """
+    Testing that folders of files are hashed on the contents of every file they contain
+    """
+    # Arrange
+    before = hash_path(folder)
+
+    # Act
+    with open(os.path.join(folder, "year=2024", "part-1.parquet"), 'a') as file:
+        file.write("changed")
+
+    # Assert
+    assert hash_path(folder) != before
+    assert hash_path(os.path.join(folder, "missing.csv")) == "missing"
+
+
+def test_get_source_files_1():
+    """
+    Testing that the source of a model wrapper includes the model scripts it imports, while framework modules are not
+    included
+    """
+    # Act
+    files = [os.path.basename(path) for path in get_source_files("models.model_wrappers.example_model_wrapper")]
+
+    # Assert
+    assert "example_model_wrapper.py" in files
+    assert "example_model.py" in files
+    assert "model_wrapper.py" not in files
+
+
+def test_is_up_to_date_1(folder):
+    """
+    Testing that outputs are only up to date when every output exists with the same fingerprint
+    """
+    # Arrange
+    paths = {folder, os.path.join(folder, "part-0.parquet")}
+    for path in paths:
+        write_fingerprint(path, "fingerprint", "model")
+
+    # Act & Assert
+    assert is_up_to_date(paths, "fingerprint")
+    assert not is_up_to_date(paths, "other")
+    assert not is_up_to_date(paths | {os.path.join(folder, "missing.csv")}, "fingerprint")
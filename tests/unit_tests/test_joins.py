@@ -0,0 +1,107 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.framework.joins import encode_keys, left_join
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def keys():
+    # Arrange
+    return ['customer_id', 'year', 'period_date']
+
+
+@pytest.fixture
+def pd_data():
+    # Arrange
+    return pd.DataFrame({'customer_id': ["C1", "C2", "C3", None, "C5"],
+                         'year': pd.array([2023, 2023, 2024, 2024, 2025], dtype='Int64'),
+                         'period_date': pd.to_datetime(["2023-12-31", "2023-12-31", "2024-12-31", "2024-12-31",
+                                                        "2025-12-31"]),
+                         'pit_pd': [0.1, 0.2, 0.3, 0.4, 0.5]})
+
+
+@pytest.fixture
+def lgd_data():
+    # Arrange
+    return pd.DataFrame({'customer_id': ["C3", "C1", None, "C9"],
+                         'year': pd.array([2024, 2023, 2024, 2023], dtype='Int64'),
+                         'period_date': pd.to_datetime(["2024-12-31", "2023-12-31", "2024-12-31", "2023-12-31"]),
+                         'pit_lgd': pd.array([3, 1, 4, 9], dtype='Int64')})
+
+
+@pytest.fixture
+def ead_data():
+    # Arrange
+    return pd.DataFrame({'customer_id': ["C2", "C2", "C5"],
+                         'year': pd.array([2023, 2023, 2025], dtype='Int64'),
+                         'period_date': pd.to_datetime(["2023-12-31", "2023-12-31", "2025-12-31"]),
+                         'pit_ead': [20.0, 21.0, 50.0]})
+
+
+"""
+Unit tests for the methods contained within the src.framework.joins module
+"""
+
+
+def test_encode_keys_1(pd_data, lgd_data, keys):
+    """
+    Testing that equal keys are given the same surrogate across datasets, whatever the datatype of each key column
+    """
+    # Arrange
+    lgd_data = lgd_data.astype({'customer_id': 'category', 'year': 'Int16'})
+
+    # Act
+    pd_codes, lgd_codes = encode_keys([pd_data, lgd_data], keys)
+
+    # Assert
+    assert pd_codes.dtype == np.int64
+    assert lgd_codes[0] == pd_codes[2] and lgd_codes[1] == pd_codes[0] and lgd_codes[2] == pd_codes[3]
+    assert lgd_codes[3] not in pd_codes
+
+
+def test_left_join_1(pd_data, lgd_data, ead_data, keys):
+    """
+    Testing that a multi-way join gives the same rows, columns and datatypes as chained pandas left merges, including
+    null keys and repeated right keys
+    """
+    # Act
+    data = left_join(pd_data, [lgd_data, ead_data], on=keys)
+    expected = pd.merge(pd.merge(pd_data, lgd_data, on=keys, how='left'), ead_data, on=keys, how='left')
+
+    # Assert
+    assert data.equals(expected)
+
+
+def test_left_join_2(pd_data, lgd_data, ead_data, keys):
+    """
+    Testing that presorted datasets are merge joined with the same result, and unsorted datasets are rejected
+    """
+    # Arrange
+    lgd_data = lgd_data.sort_values(keys, ignore_index=True)
+    ead_data = ead_data.sort_values(keys, ignore_index=True)
+
+    # Act
+    data = left_join(pd_data, [lgd_data, ead_data], on=keys, presorted=True)
+    expected = pd.merge(pd.merge(pd_data, lgd_data, on=keys, how='left'), ead_data, on=keys, how='left')
+
+    # Assert
+    assert data.equals(expected)
+    with pytest.raises(ValueError, match="not sorted"):
+        left_join(pd_data, lgd_data.iloc[::-1], on=keys, presorted=True)
+
+
+def test_left_join_3(pd_data, lgd_data, keys):
+    """
+    Testing that datasets sharing a column which is not a join key are rejected, rather than given suffixes
+    """
+    # Arrange
+    lgd_data = lgd_data.assign(pit_pd=1.0)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="pit_pd"):
+        left_join(pd_data, lgd_data, on=keys)
@@ -0,0 +1,265 @@
+import asyncio
+import logging
+import os
+import threading
+from logging.handlers import QueueHandler
+
+import pytest
+
+from src.framework.setup.log_format import (buffer_logs, build_buffer_filter, create_logging_file,
+                                            create_logging_file_handler_detailed,
+                                            create_logging_sys_handler_detailed, flush_logs, get_handlers, headers,
+                                            is_queue_logging, lines, log_run, remove_handler, replay_logs,
+                                            start_queue_logging, start_run_logging, stop_queue_logging,
+                                            stop_run_logging)
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def root_logger():
+    # Arrange
+    root = logging.getLogger()
+    handlers, filters, level = list(root.handlers), list(root.filters), root.level
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.filters = [build_buffer_filter()]
+    root.setLevel(logging.DEBUG)
+
+    yield root
+
+    stop_queue_logging()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.filters = filters
+    root.setLevel(level)
+
+
+def get_file_handlers() -> list:
+    # Handlers capturing logs for pytest are also added to the root logger while each test runs
+    return [handler for handler in get_handlers() if isinstance(handler, logging.FileHandler)]
+
+
+def read_log(path: str) -> list:
+    with open(path) as file:
+        return file.read().splitlines()
+
+
+def log_records(run_id: str, name: str, barrier: threading.Barrier) -> None:
+    # Each run logs half of its records before the other run logs any more, so the runs interleave
+    with log_run(run_id):
+        for num in range(100):
+            if num == 50:
+                barrier.wait()
+            logging.info(f"{name} record {num}")
+
+
+async def log_records_async(run_id: str, name: str) -> None:
+    with log_run(run_id):
+        for num in range(100):
+            logging.info(f"{name} record {num}")
+            await asyncio.sleep(0)
+
+
+"""
+Unit tests for the methods contained within the src.framework.setup.log_format module
+"""
+
+
+def test_headers_1(root_logger, tmp_path):
+    """
+    Testing that headers and lines are written with the simple layout without changing the file handler's formatter
+    """
+    # Arrange
+    create_logging_file(create_logging_file_handler_detailed, str(tmp_path), "test_log")
+    handler = get_file_handlers()[0]
+    formatter = handler.formatter
+
+    # Act
+    logging.info("detailed record")
+    headers("Header")
+    lines()
+    remove_handler("test_log")
+
+    # Assert
+    result = read_log(os.path.join(tmp_path, "test_log.log"))
+    assert "INFO [root.test_log_format.test_headers_1:" in result[0]
+    assert result[0].endswith("] detailed record")
+    assert result[1:4] == ["", "-" * 72 + " Header " + "-" * 72, ""]
+    assert result[4] == "-" * 152
+    assert handler.formatter is formatter
+
+
+def test_headers_2(root_logger, capsys):
+    """
+    Testing that headers are written to the console without the detailed layout
+    """
+    # Arrange
+    root_logger.addHandler(create_logging_sys_handler_detailed())
+
+    # Act
+    headers("Header")
+
+    # Assert
+    assert capsys.readouterr().out == "\n" + "-" * 72 + " Header " + "-" * 72 + "\n\n"
+
+
+def test_start_queue_logging_1(root_logger, tmp_path):
+    """
+    Testing that the handlers are moved to the queue listener and every queued record is written once a file's
+    handler is removed
+    """
+    # Arrange
+    create_logging_file(create_logging_file_handler_detailed, str(tmp_path), "test_log")
+
+    # Act
+    start_queue_logging()
+    create_logging_file(create_logging_file_handler_detailed, str(tmp_path), "queued_log")
+    for num in range(1000):
+        logging.info(f"record {num}")
+    headers("Header")
+    remove_handler("test_log")
+    remove_handler("queued_log")
+
+    # Assert
+    for name in ["test_log", "queued_log"]:
+        result = read_log(os.path.join(tmp_path, f"{name}.log"))
+        assert [val.split("] ")[-1] for val in result[:1000]] == [f"record {num}" for num in range(1000)]
+        assert result[1001] == "-" * 72 + " Header " + "-" * 72
+    assert is_queue_logging()
+    assert [type(handler) for handler in root_logger.handlers] == [QueueHandler]
+    assert get_file_handlers() == []
+
+
+def test_start_queue_logging_2(root_logger):
+    """
+    Testing that the levels of the handlers are kept and the handlers are given back when queue logging stops
+    """
+    # Arrange
+    console = create_logging_sys_handler_detailed()
+    console.setLevel(logging.WARNING)
+    root_logger.addHandler(console)
+    records = []
+    console.emit = records.append
+
+    # Act
+    start_queue_logging()
+    start_queue_logging()
+    logging.info("info record")
+    logging.warning("warning record")
+    flush_logs()
+    stop_queue_logging()
+
+    # Assert
+    assert [record.getMessage() for record in records] == ["warning record"]
+    assert not is_queue_logging()
+    assert console in root_logger.handlers
+    assert not any(isinstance(handler, QueueHandler) for handler in root_logger.handlers)
+
+
+def test_replay_logs_1(root_logger, tmp_path):
+    """
+    Testing that buffered headers are replayed with the simple layout in their original order
+    """
+    # Arrange
+    start_queue_logging()
+    create_logging_file(create_logging_file_handler_detailed, str(tmp_path), "test_log")
+
+    # Act
+    with buffer_logs() as records:
+        headers("Header")
+        logging.info("buffered record")
+    logging.info("direct record")
+    replay_logs(records)
+    remove_handler("test_log")
+
+    # Assert
+    result = read_log(os.path.join(tmp_path, "test_log.log"))
+    assert result[0].endswith("direct record")
+    assert result[2] == "-" * 72 + " Header " + "-" * 72
+    assert result[4].endswith("buffered record")
+
+
+@pytest.mark.parametrize("queue_logging", [False, True])
+def test_start_run_logging_1(root_logger, tmp_path, queue_logging):
+    """
+    Testing that models run at the same time in threads each write their records to their own log file
+    """
+    # Arrange
+    if queue_logging:
+        start_queue_logging()
+    run_ids = {name: start_run_logging(create_logging_file_handler_detailed, str(tmp_path), f"{name}_log")
+               for name in ["first", "second"]}
+    barrier = threading.Barrier(2)
+
+    # Act
+    threads = [threading.Thread(target=log_records, args=(run_id, name, barrier)) for name, run_id in run_ids.items()]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    logging.info("outside record")
+    for run_id in run_ids.values():
+        stop_run_logging(run_id)
+
+    # Assert
+    for name in run_ids:
+        result = read_log(os.path.join(tmp_path, f"{name}_log.log"))
+        assert [val.split("] ")[-1] for val in result] == [f"{name} record {num}" for num in range(100)]
+
+
+def test_start_run_logging_2(root_logger, tmp_path):
+    """
+    Testing that models run at the same time in asyncio tasks each write their records to their own log file
+    """
+    # Arrange
+    run_ids = {name: start_run_logging(create_logging_file_handler_detailed, str(tmp_path), f"{name}_log")
+               for name in ["first", "second"]}
+
+    async def run_all():
+        await asyncio.gather(*[log_records_async(run_id, name) for name, run_id in run_ids.items()])
+
+    # Act
+    asyncio.run(run_all())
+    for run_id in run_ids.values():
+        stop_run_logging(run_id)
+
+    # Assert
+    for name in run_ids:
+        result = read_log(os.path.join(tmp_path, f"{name}_log.log"))
+        assert [val.split("] ")[-1] for val in result] == [f"{name} record {num}" for num in range(100)]
+
+
+def test_replay_logs_2(root_logger, tmp_path):
+    """
+    Testing that records buffered by a worker thread are written to the log file of the run replaying them, and that
+    runs logging to the same file share it until the last of them stops
+    """
+    # Arrange
+    first = start_run_logging(create_logging_file_handler_detailed, str(tmp_path), "test_log")
+    second = start_run_logging(create_logging_file_handler_detailed, str(tmp_path), "test_log")
+    records = []
+
+    def buffer_records():
+        with buffer_logs() as buffered:
+            logging.info("worker record")
+        records.extend(buffered)
+
+    # Act
+    thread = threading.Thread(target=buffer_records)
+    thread.start()
+    thread.join()
+    with log_run(first):
+        replay_logs(records)
+    stop_run_logging(first)
+    with log_run(second):
+        logging.info("second record")
+    stop_run_logging(second)
+
+    # Assert
+    result = read_log(os.path.join(tmp_path, "test_log.log"))
+    assert [val.split("] ")[-1] for val in result] == ["worker record", "second record"]
@@ -0,0 +1,288 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import yaml
+
+from src.framework import model_chain
+from src.framework.model_chain import ModelChain
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+def write_yaml(path: str, content: dict) -> str:
+    with open(path, 'w') as file:
+        yaml.safe_dump(content, file, sort_keys=False)
+    return path
+
+
+class ModelWrapper:
+    # Stands in for the model wrappers of the chain, which are fingerprinted before they are run
+
+    def define_input_schemas(self) -> dict:
+        return {}
+
+    def define_output_schemas(self) -> dict:
+        return {}
+
+    def define_parameter_schemas(self) -> None:
+        return None
+
+
+def write_outputs(config_path: str) -> None:
+    with open(config_path) as file:
+        config = yaml.safe_load(file)
+    for path in config['model_data']['outputs'].values():
+        with open(os.path.join(os.path.dirname(config_path), path), 'w') as file:
+            file.write(os.path.basename(config_path))
+
+
+@pytest.fixture
+def write_chain(tmp_path, monkeypatch):
+    # Arrange
+    monkeypatch.setattr(ModelChain, "get_model_class",
+                        staticmethod(lambda model_config: type(model_config['model'], (ModelWrapper,), {})))
+    sys_config = write_yaml(os.path.join(tmp_path, "system_config.yml"), {'data': {'data_folder': str(tmp_path)}})
+
+    def write(models: dict, **settings) -> str:
+        chain_models = {}
+        for name, val in models.items():
+            config = write_yaml(os.path.join(tmp_path, f"{name}_config.yml"),
+                                {'model_data': {'inputs': {f"data_{num}": path for num, path in
+                                                           enumerate(val['inputs'])},
+                                                'outputs': {f"data_{num}": path for num, path in
+                                                            enumerate(val['outputs'])}},
+                                 'parameters': {'model_parameters': {'parameters_file': ""}}})
+            chain_models[name] = {'config': config, 'model_path': "models", 'model': name,
+                                  **{key: item for key, item in val.items() if key not in ['inputs', 'outputs']}}
+
+        return write_yaml(os.path.join(tmp_path, "chain_config.yml"),
+                          {'config': {'sys_config': sys_config, **settings}, 'models': chain_models})
+
+    return write
+
+
+class ThreadExecutor(ThreadPoolExecutor):
+    # Runs the chain's worker processes as threads, so the models run can be replaced within the tests
+
+    def __init__(self, max_workers: int, mp_context: any = None, max_tasks_per_child: int = None):
+        super().__init__(max_workers=max_workers)
+
+
+@pytest.fixture
+def run_models(monkeypatch):
+    # Arrange
+    runs = {'order': [], 'running': 0, 'max_running': 0, 'log_paths': {}}
+    lock = threading.Lock()
+
+    def run_model_process(model_path: str, model: str, sys_config_path: str, config_path: str,
+                          log_path: str = None) -> float:
+        with lock:
+            runs['order'].append(model)
+            runs['log_paths'][model] = log_path
+            runs['running'] += 1
+            runs['max_running'] = max(runs['max_running'], runs['running'])
+        time.sleep(0.05)
+        with lock:
+            runs['running'] -= 1
+        if model.startswith("failing"):
+            raise ValueError(f"Model {model} failed.")
+        write_outputs(config_path)
+        return 0.05
+
+    monkeypatch.setattr(model_chain, "ProcessPoolExecutor", ThreadExecutor)
+    monkeypatch.setattr(model_chain, "run_model_process", run_model_process)
+    return runs
+
+
+"""
+Unit tests for the methods contained within the src.framework.model_chain.ModelChain class
+"""
+
+
+def test_get_dependencies_1(write_chain):
+    """
+    Testing that models depend on earlier models whose outputs they read, whose inputs they overwrite or whose outputs
+    they overwrite, along with any models they declare in depends_on
+    """
+    # Arrange
+    path = write_chain({'model_1': {'inputs': ["a.csv"], 'outputs': ["b.csv"]},
+                        'model_2': {'inputs': ["a.csv"], 'outputs': ["c.csv"]},
+                        'model_3': {'inputs': ["b.csv"], 'outputs': ["d.csv"]},
+                        'model_4': {'inputs': ["e.csv"], 'outputs': ["a.csv"]},
+                        'model_5': {'inputs': ["e.csv"], 'outputs': ["c.csv"]},
+                        'model_6': {'inputs': ["e.csv"], 'outputs': ["f.csv"], 'depends_on': "model_2"}})
+
+    # Act
+    dependencies = ModelChain(path).get_dependencies()
+
+    # Assert
+    assert dependencies == {'model_1': set(), 'model_2': set(), 'model_3': {'model_1'},
+                            'model_4': {'model_1', 'model_2'}, 'model_5': {'model_2'}, 'model_6': {'model_2'}}
+
+
+@pytest.mark.parametrize("depends_on, message", [("model_3", "not models in the chain"),
+                                                 ("model_2", "depend on each other")])
+def test_get_dependencies_2(write_chain, depends_on, message):
+    """
+    Testing that dependencies on unknown models, or models depending on each other, are rejected
+    """
+    # Arrange
+    path = write_chain({'model_1': {'inputs': ["a.csv"], 'outputs': ["b.csv"], 'depends_on': depends_on},
+                        'model_2': {'inputs': ["b.csv"], 'outputs': ["c.csv"]}})
+
+    # Act & Assert
+    with pytest.raises(ValueError, match=message):
+        ModelChain(path).get_dependencies()
+
+
+def test_run_chain_parallel_1(write_chain, run_models):
+    """
+    Testing that independent models run side by side, and a failed model only stops the models downstream of it
+    """
+    # Arrange
+    path = write_chain({'failing_model': {'inputs': ["a.csv"], 'outputs': ["b.csv"]},
+                        'downstream_model': {'inputs': ["b.csv"], 'outputs': ["c.csv"]},
+                        'model_1': {'inputs': ["a.csv"], 'outputs': ["d.csv"]},
+                        'model_2': {'inputs': ["d.csv"], 'outputs': ["e.csv"]}}, max_workers=2)
+
+    # Act
+    with pytest.raises(RuntimeError, match="failing_model") as error:
+        ModelChain(path).run_chain()
+
+    # Assert
+    assert isinstance(error.value.__cause__, ValueError)
+    assert run_models['order'] == ["failing_model", "model_1", "model_2"]
+    assert run_models['max_running'] == 2
+
+
+def test_run_chain_parallel_2(write_chain, run_models, tmp_path):
+    """
+    Testing that models are only run side by side within the memory budget
+    """
+    # Arrange
+    path = write_chain({'model_1': {'inputs': ["a.csv"], 'outputs': ["b.csv"], 'memory_gb': 3},
+                        'model_2': {'inputs': ["a.csv"], 'outputs': ["c.csv"], 'memory_gb': 3},
+                        'model_3': {'inputs': ["a.csv"], 'outputs': ["d.csv"], 'memory_gb': 1}},
+                       max_workers=3, memory_budget_gb=4)
+
+    # Act
+    ModelChain(path).run_chain()
+
+    # Assert
+    assert run_models['order'] == ["model_1", "model_3", "model_2"]
+    assert run_models['max_running'] == 2
+
+
+def test_run_chain_parallel_3(write_chain, run_models, tmp_path):
+    """
+    Testing that only models whose outputs are missing are run again, models downstream of them are not as the
+    fingerprints of their inputs are unchanged
+    """
+    # Arrange
+    write_outputs(write_yaml(os.path.join(tmp_path, "input_config.yml"), {'model_data': {'outputs': {'a': "a.csv"}}}))
+    path = write_chain({'model_1': {'inputs': ["a.csv"], 'outputs': ["b.csv"]},
+                        'model_2': {'inputs': ["b.csv"], 'outputs': ["c.csv"]},
+                        'model_3': {'inputs': ["a.csv"], 'outputs': ["d.csv"]}}, max_workers=2)
+    ModelChain(path).run_chain()
+    run_models['order'].clear()
+    os.remove(os.path.join(tmp_path, "b.csv"))
+
+    # Act
+    ModelChain(path).run_chain()
+
+    # Assert
+    assert run_models['order'] == ["model_1"]
+
+
+def test_run_chain_parallel_4(write_chain, run_models):
+    """
+    Testing that the log path given for each model of the chain is passed to its run, and other models use their config
+    """
+    # Arrange
+    path = write_chain({'model_1': {'inputs': ["a.csv"], 'outputs': ["b.csv"]},
+                        'model_2': {'inputs': ["a.csv"], 'outputs': ["c.csv"]}}, max_workers=2)
+
+    # Act
+    ModelChain(path, log_paths={'model_1': "model_1_job1.log"}).run_chain()
+
+    # Assert
+    assert run_models['log_paths'] == {'model_1': "model_1_job1.log", 'model_2': None}
+
+
+@pytest.fixture
+def deploy_models(monkeypatch):
+    # Arrange
+    order = []
+
+    class DeployWrapper:
+
+        def __init__(self, model_wrapper: type, sys_config: str, model_config: str, dataset_registry: any = None,
+                     log_path: str = None):
+            self.model = model_wrapper.__name__
+            self.model_config = model_config
+
+        def run_model(self) -> None:
+            order.append(self.model)
+            if self.model.startswith("failing"):
+                raise ValueError(f"Model {self.model} failed.")
+            write_outputs(self.model_config)
+
+        def stop_logging(self) -> None:
+            pass
+
+    monkeypatch.setattr(model_chain, "DeployWrapper", DeployWrapper)
+    return order
+
+
+def test_run_chain_sequential_1(write_chain, deploy_models):
+    """
+    Testing that models run one at a time in dependency order, and a failed model only stops the models downstream
+    """
+    # Arrange
+    order = deploy_models
+    path = write_chain({'model_1': {'inputs': ["x.csv"], 'outputs': ["c.csv"], 'depends_on': ["model_2"]},
+                        'model_2': {'inputs': ["a.csv"], 'outputs': ["b.csv"]},
+                        'failing_model': {'inputs': ["a.csv"], 'outputs': ["d.csv"]},
+                        'downstream_model': {'inputs': ["d.csv"], 'outputs': ["e.csv"]}})
+
+    # Act
+    with pytest.raises(RuntimeError, match="downstream_model"):
+        ModelChain(path).run_chain()
+
+    # Assert
+    assert order == ["model_2", "model_1", "failing_model"]
+
+
+@pytest.mark.parametrize("change, force, expected", [(None, False, []),
+                                                     (None, True, ["model_1", "model_2"]),
+                                                     ("a.csv", False, ["model_1", "model_2"]),
+                                                     ("model_2_config.yml", False, ["model_2"])])
+def test_run_chain_sequential_2(write_chain, deploy_models, tmp_path, change, force, expected):
+    """
+    Testing that models are only run again when their fingerprint has changed, or when forced, and that a model run
+    again gives the models downstream of it new inputs
+    """
+    # Arrange
+    write_outputs(write_yaml(os.path.join(tmp_path, "input_config.yml"), {'model_data': {'outputs': {'a': "a.csv"}}}))
+    path = write_chain({'model_1': {'inputs': ["a.csv"], 'outputs': ["b.csv"]},
+                        'model_2': {'inputs': ["b.csv"], 'outputs': ["c.csv"]}})
+    ModelChain(path).run_chain()
+    deploy_models.clear()
+
+    if change is not None and change.endswith(".yml"):
+        with open(os.path.join(tmp_path, change)) as file:
+            write_yaml(os.path.join(tmp_path, change), {**yaml.safe_load(file), 'changed': True})
+    elif change is not None:
+        with open(os.path.join(tmp_path, change), 'a') as file:
+            file.write("changed")
+
+    # Act
+    ModelChain(path).run_chain(force=force)
+
+    # Assert
+    assert deploy_models == expected
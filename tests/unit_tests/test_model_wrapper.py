@@ -0,0 +1,133 @@
+import os
+from unittest import mock
+
+import pytest
+
+from src.config import PY_ROOT_DIR
+from src.framework.model_wrapper import DeployWrapper, ModelWrapper
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def test_data_dir():
+    # Arrange
+    return os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data")
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+            "date_column_1": 'date'}
+
+
+"""
+Unit tests for the methods contained within the src.framework.model_wrapper.ModelWrapper class
+"""
+
+
+def test_read_data_to_pandas_1(test_data_dir, file_schema):
+    """
+    Testing that concurrent reads return the same datasets, in the same order, as sequential reads
+    """
+    # Arrange
+    model_config = {'inputs': {'data_1': "test_csv.csv", 'data_2': "test_parquet.parquet", 'data_3': "test_csv.csv"}}
+
+    # Act
+    sequential = ModelWrapper.read_data_to_pandas(model_config, {key: dict(file_schema) for key in model_config[
+        'inputs']}, test_data_dir)
+    concurrent = ModelWrapper.read_data_to_pandas(model_config, {key: dict(file_schema) for key in model_config[
+        'inputs']}, test_data_dir, max_workers=3)
+
+    # Assert
+    assert list(concurrent.keys()) == list(model_config['inputs'].keys())
+    for key, val in sequential.items():
+        assert concurrent[key].equals(val)
+
+
+def test_read_data_to_pandas_2(test_data_dir, file_schema, caplog):
+    """
+    Testing that a failed concurrent read names the dataset that failed
+    """
+    # Arrange
+    model_config = {'inputs': {'data_1': "test_csv.csv", 'missing_data': "missing.csv"}}
+    file_schemas = {key: dict(file_schema) for key in model_config['inputs']}
+
+    # Act
+    with pytest.raises(FileNotFoundError):
+        ModelWrapper.read_data_to_pandas(model_config, file_schemas, test_data_dir, max_workers=2)
+
+    # Assert
+    assert "Failed to read dataset 'missing_data'" in caplog.text
+
+
+def test_read_data_to_pandas_3(test_data_dir, file_schema):
+    """
+    Testing that automatic downcasting compacts the numeric columns without changing their values
+    """
+    # Arrange
+    model_config = {'inputs': {'data_1': "test_csv.csv"}}
+
+    # Act
+    data = ModelWrapper.read_data_to_pandas(model_config, {'data_1': dict(file_schema)}, test_data_dir)
+    downcast = ModelWrapper.read_data_to_pandas(model_config, {'data_1': dict(file_schema)}, test_data_dir,
+                                                downcast='auto')
+
+    # Assert
+    assert downcast['data_1'].memory_usage().sum() < data['data_1'].memory_usage().sum()
+    assert downcast['data_1'].attrs['downcast_bytes_saved'] > 0
+    assert downcast['data_1'].astype(data['data_1'].dtypes.to_dict()).equals(data['data_1'])
+
+
+"""
+Unit tests for the methods contained within the src.framework.model_wrapper.DeployWrapper class
+"""
+
+
+def test_run_model_1():
+    """
+    Testing that the duckdb engine and the run's log file are closed when the model fails
+    """
+    # Arrange
+    deploy = DeployWrapper.__new__(DeployWrapper)
+    deploy.log_run_id = None
+    deploy.model_wrapper = mock.Mock()
+    engine = deploy.model_wrapper.engine
+    deploy.execute_model = mock.Mock(side_effect=RuntimeError("model failed"))
+    deploy.stop_logging = mock.Mock()
+
+    # Act
+    with pytest.raises(RuntimeError, match="model failed"):
+        deploy.run_model()
+
+    # Assert
+    engine.close.assert_called_once()
+    assert deploy.model_wrapper.engine is None
+    deploy.stop_logging.assert_called_once()
+
+
+@pytest.mark.parametrize("log_path, expected", [
+    (None, (os.path.join(PY_ROOT_DIR, "model_logs"), "example_model_{date}")),
+    (os.path.join("logs", "example_model_2024-01-01_job7.log"), ("logs", "example_model_2024-01-01_job7")),
+])
+def test_start_logging_1(log_path, expected):
+    """
+    Testing that a log path given for the run replaces the log location and name of the model config
+    """
+    # Arrange
+    deploy = DeployWrapper.__new__(DeployWrapper)
+    deploy.log_path = log_path
+    deploy.sys_config = {}
+    deploy.model_config = {'parameters': {'model_parameters': {'log_name': "example_model_{date}",
+                                                               'log_location': "model_logs"}}}
+
+    # Act
+    with mock.patch("src.framework.model_wrapper.start_run_logging", return_value="run") as start_run_logging:
+        deploy.start_logging()
+
+    # Assert
+    assert start_run_logging.call_args.args[1:] == expected
+    assert deploy.log_run_id == "run"
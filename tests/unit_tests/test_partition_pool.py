@@ -0,0 +1,173 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.framework.model_wrapper import DeployWrapper, ModelWrapper
+from src.framework.partition_pool import PartitionPool, partition_dataset, restore_row_order
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+class JoinModelWrapper(ModelWrapper):
+
+    def define_input_schemas(self) -> dict:
+        return {}
+
+    def define_output_schemas(self) -> dict:
+        return {}
+
+    def define_parameter_schemas(self) -> tuple:
+        return None
+
+    def define_join_keys(self) -> list:
+        return ['customer_id', 'year']
+
+    def run_model(self) -> dict:
+        data = pd.merge(self.data_dict['left_data'], self.data_dict['right_data'], on=['customer_id', 'year'],
+                        how='left')
+        data['total'] = data['left_value'] * data['right_value'] * self.parameters['multiplier'].iloc[0]
+
+        return {'output_data': data}
+
+
+class ColumnsModelWrapper(JoinModelWrapper):
+
+    def run_model(self) -> dict:
+        # Outputs the columns the model is given, one row for each partition
+        return {'columns': pd.DataFrame({'columns': [",".join(self.data_dict['left_data'].columns)]})}
+
+
+@pytest.fixture
+def input_data():
+    # Arrange
+    left_data = pd.DataFrame({'customer_id': [f"C{num % 50:03d}" for num in range(200)],
+                              'year': pd.array([2023 + num % 3 for num in range(200)], dtype='Int64'),
+                              'left_value': [float(num) for num in range(200)]})
+    right_data = pd.DataFrame({'customer_id': [f"C{num:03d}" for num in range(50)] * 3,
+                               'year': pd.array([2023] * 50 + [2024] * 50 + [2025] * 50, dtype='Int16'),
+                               'right_value': [float(num) for num in range(150)]})
+    return {'left_data': left_data, 'right_data': right_data}
+
+
+@pytest.fixture
+def parameters():
+    # Arrange
+    return pd.DataFrame({'multiplier': [2.0]})
+
+
+"""
+Unit tests for the methods contained within the src.framework.partition_pool module
+"""
+
+
+def test_partition_dataset_1(input_data):
+    """
+    Testing that rows with the same key values are given the same partition, whatever the datatype of the key
+    """
+    # Arrange
+    keys = ['customer_id', 'year']
+    left_data = input_data['left_data']
+    right_data = input_data['right_data'].astype({'customer_id': 'category'})
+
+    # Act
+    left_partitions = partition_dataset(left_data, keys, 4)
+    right_partitions = partition_dataset(right_data, keys, 4)
+
+    # Assert
+    assert sorted(row for rows in left_partitions for row in rows) == list(range(len(left_data)))
+    for left_rows, right_rows in zip(left_partitions, right_partitions):
+        left_keys = set(left_data.iloc[left_rows][keys].astype(str).itertuples(index=False))
+        right_keys = set(right_data.iloc[right_rows][keys].astype(str).itertuples(index=False))
+        assert left_keys <= right_keys
+
+
+@pytest.mark.parametrize("max_workers", [3, None])
+def test_partition_pool_1(input_data, parameters, max_workers):
+    """
+    Testing that running the model in partitions gives the same output, with the same datatypes and row order, as a
+    single run
+    """
+    # Arrange
+    wrapper = JoinModelWrapper()
+    wrapper.data_dict = input_data
+    wrapper.parameters = parameters
+    expected = wrapper.run_model()['output_data']
+
+    # Act
+    output = PartitionPool(partition_keys=['customer_id'], max_workers=max_workers).run(
+        model_wrapper=JoinModelWrapper, input_data=input_data, parameters=parameters)['output_data']
+
+    # Assert
+    assert output.dtypes.equals(expected.dtypes)
+    assert output.equals(expected)
+
+
+def test_partition_pool_2(input_data, parameters):
+    """
+    Testing that inputs missing a partition key are rejected before any partition is run
+    """
+    # Arrange
+    input_data['right_data'] = input_data['right_data'].drop(columns=['customer_id'])
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="right_data"):
+        PartitionPool(partition_keys=['customer_id'], max_workers=2).run(
+            model_wrapper=JoinModelWrapper, input_data=input_data, parameters=parameters)
+
+
+def test_partition_pool_3(input_data, parameters):
+    """
+    Testing that the model is given only the columns of its inputs, without any columns added by the pool
+    """
+    # Act
+    output = PartitionPool(partition_keys=['customer_id'], max_workers=2).run(
+        model_wrapper=ColumnsModelWrapper, input_data=input_data, parameters=parameters)['columns']
+
+    # Assert
+    assert output['columns'].tolist() == ["customer_id,year,left_value"] * 2
+
+
+def test_restore_row_order_1():
+    """
+    Testing that outputs with a row for each driving input row are put back in its order, and others are concatenated
+    """
+    # Arrange
+    rows = [np.array([1, 3]), np.array([0, 2])]
+    outputs = [pd.DataFrame({'row': [1, 3]}), pd.DataFrame({'row': [0, 2]})]
+    aggregated = [pd.DataFrame({'row': [1]}), pd.DataFrame({'row': [0]})]
+
+    # Act & Assert
+    assert restore_row_order(outputs, rows)['row'].tolist() == [0, 1, 2, 3]
+    assert restore_row_order(aggregated, rows)['row'].tolist() == [1, 0]
+
+
+@pytest.mark.parametrize("partition_keys, expected", [(['customer_id'], ['customer_id']), ("year", ['year']),
+                                                      (None, None)])
+def test_get_partition_keys_1(partition_keys, expected):
+    """
+    Testing that partition keys are read from the model config when they are join keys of the model
+    """
+    # Arrange
+    deploy = DeployWrapper.__new__(DeployWrapper)
+    deploy.model_wrapper = JoinModelWrapper()
+    deploy.model_config = {'parameters': {'model_parameters': {'type': "pandas", 'partition_keys': partition_keys}}}
+
+    # Act & Assert
+    assert deploy.get_partition_keys() == expected
+
+
+def test_get_partition_keys_2():
+    """
+    Testing that partition keys which are not join keys of the model are rejected, as they would give incorrect results
+    """
+    # Arrange
+    deploy = DeployWrapper.__new__(DeployWrapper)
+    deploy.model_wrapper = JoinModelWrapper()
+    deploy.model_config = {'parameters': {'model_parameters': {'type': "pandas",
+                                                               'partition_keys': ['customer_id', 'period_date']}}}
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="period_date"):
+        deploy.get_partition_keys()
@@ -0,0 +1,101 @@
+import os
+import time
+
+import pytest
+
+from src.config import PY_ROOT_DIR
+from src.framework.setup.read_cache import ReadCache
+from src.framework.setup.read_write_data import convert_schema_pandas, read_csv_to_pandas
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return convert_schema_pandas({"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+                                  "date_column_1": 'date'})
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    # Arrange
+    path = os.path.join(tmp_path, "input.csv")
+    with open(os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")) as source:
+        with open(path, 'w') as file:
+            file.write(source.read())
+    return path
+
+
+"""
+Unit tests for the methods contained within the src.framework.setup.read_cache.ReadCache class
+"""
+
+
+def test_read_cache_1(file_schema, csv_path, tmp_path):
+    """
+    Testing that a second read of an unchanged file is served from the cache without parsing
+    """
+    # Arrange
+    cache_dir = os.path.join(tmp_path, "cache")
+    expected = read_csv_to_pandas(csv_path, file_schema)
+
+    def fail() -> None:
+        raise AssertionError("The cached dataset was parsed again.")
+
+    # Act
+    ReadCache(cache_dir, 10 ** 9).read_to_pandas(csv_path, file_schema, lambda: read_csv_to_pandas(csv_path,
+                                                                                                   file_schema))
+    read_cache = ReadCache(cache_dir, 10 ** 9)
+    result = read_cache.read_to_pandas(csv_path, file_schema, fail)
+
+    # Assert
+    assert result.equals(expected)
+    assert (read_cache.hits, read_cache.misses) == (1, 0)
+
+
+def test_read_cache_2(file_schema, csv_path, tmp_path):
+    """
+    Testing that changes to the file contents or reader options are cache misses
+    """
+    # Arrange
+    read_cache = ReadCache(os.path.join(tmp_path, "cache"), 10 ** 9)
+
+    def read() -> None:
+        return read_csv_to_pandas(csv_path, file_schema)
+
+    # Act
+    read_cache.read_to_pandas(csv_path, file_schema, read)
+    read_cache.read_to_pandas(csv_path, file_schema, read, filters="integer_column_1 > 0")
+    with open(csv_path, 'a') as file:
+        file.write("\n")
+    read_cache.read_to_pandas(csv_path, file_schema, read)
+
+    # Assert
+    assert (read_cache.hits, read_cache.misses) == (0, 3)
+
+
+def test_read_cache_3(file_schema, csv_path, tmp_path):
+    """
+    Testing that the least recently used entries are evicted once the cache exceeds its size, and the cache clears
+    """
+    # Arrange
+    read_cache = ReadCache(os.path.join(tmp_path, "cache"), 10 ** 9)
+    read_cache.read_to_pandas(csv_path, file_schema, lambda: read_csv_to_pandas(csv_path, file_schema))
+    first_entry = read_cache.entries()[0]
+    read_cache.max_size = first_entry['size']
+
+    # Act
+    time.sleep(0.01)
+    read_cache.read_to_pandas(csv_path, file_schema, lambda: read_csv_to_pandas(csv_path, file_schema),
+                              filters="integer_column_1 > 0")
+    remaining = [(entry['key'], read_cache.get_source(entry['key'])) for entry in read_cache.entries()]
+    read_cache.clear()
+
+    # Assert
+    assert len(remaining) == 1
+    assert remaining[0][0] != first_entry['key']
+    assert remaining[0][1] == csv_path
+    assert read_cache.entries() == []
@@ -1,3 +1,5 @@
+import logging
+
 import numpy as np
 import pytest
 
@@ -143,9 +145,20 @@ def test_convert_schema_recon_pandas_1(schema):
     assert result == expected
 
 
+def test_convert_schema_arrow_1(schema):
+    # Act
+    result = convert_schema_arrow(schema)
+
+    # Assert
+    expected = pa.schema([("column_1", pa.float64()), ("column_2", pa.string()), ("column_3", pa.int64()),
+                          ("column_4", pa.timestamp('s'))])
+    assert result == expected
+    assert convert_schema_arrow(convert_schema_pandas(dict(schema))) == expected
+
+
 def test_enforce_integers_1(integer_dataframe):
     # Act
-    result = enforce_integers(integer_dataframe)
+    result = enforce_data_types(integer_dataframe, {column: pd.Int64Dtype() for column in integer_dataframe.columns})
 
     # Assert
     expected = {"integer_column_1": 'Int64', "integer_column_2": 'Int64', "integer_column_3": 'Int64'}
@@ -154,7 +167,7 @@ def test_enforce_integers_1(integer_dataframe):
 
 def test_enforce_floats_1(float_dataframe):
     # Act
-    result = enforce_floats(float_dataframe)
+    result = enforce_data_types(float_dataframe, {column: pd.Float64Dtype() for column in float_dataframe.columns})
 
     # Assert
     expected = {"float_column_1": 'Float64', "float_column_2": 'Float64', "float_column_3": 'Float64',
@@ -164,13 +177,45 @@ def test_enforce_floats_1(float_dataframe):
 
 def test_enforce_strings_1(string_dataframe):
     # Act
-    result = enforce_strings(string_dataframe)
+    result = enforce_data_types(string_dataframe, {column: 'string' for column in string_dataframe.columns})
 
     # Assert
     expected = {"string_column_1": 'string', "string_column_2": 'string', "string_column_3": 'string'}
     assert result.dtypes.to_dict() == expected
 
 
+def test_enforce_strings_2():
+    """
+    Testing that empty strings and any casing of "nan" are standardised to null for python and arrow backed strings
+    """
+    # Arrange
+    values = ["", "nan", "NaN", "NAN", "test", None]
+    df = pd.DataFrame({"python_column": pd.Series(values, dtype='string'),
+                       "arrow_column": pd.Series(values, dtype='string[pyarrow]')})
+
+    # Act
+    result = enforce_data_types(df)
+
+    # Assert
+    expected = [True, True, True, True, False, True]
+    assert result['python_column'].isna().tolist() == expected
+    assert result['arrow_column'].isna().tolist() == expected
+
+
+def test_enforce_data_types_2(float_dataframe):
+    """
+    Testing that columns which already have the schema datatype are not cast
+    """
+    # Arrange
+    column = float_dataframe['float_column_1'].array
+
+    # Act
+    result = enforce_data_types(float_dataframe, {column: pd.Float64Dtype() for column in float_dataframe.columns})
+
+    # Assert
+    assert result['float_column_1'].array is column
+
+
 def test_enforce_data_types_1(dataframe):
     # Act
     dataframe.drop(columns=['date_column_1', 'date_column_2'], inplace=True)
@@ -252,3 +297,391 @@ def test_read_parquet_to_pandas_1(dataframe_schema, dataframe):
 
     # Assert
     assert (result.shape == (3, 12)) & ({k: v.name for k, v in result.dtypes.to_dict().items()} == dataframe_schema)
+
+
+def test_read_csv_to_pandas_2(dataframe_schema):
+    """
+    Testing that streaming a csv in batches returns schema conformant batches matching a full read
+    """
+    # Arrange
+    csv_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(dict(dataframe_schema)))
+
+    # Act
+    result = list(read_csv_to_pandas(csv_path, convert_schema_pandas(dict(dataframe_schema)), batch_size=2))
+
+    # Assert
+    assert [len(batch) for batch in result] == [2, 1]
+    assert all((batch.dtypes == expected.dtypes).all() for batch in result)
+    assert pd.concat(result, ignore_index=True).equals(expected)
+
+
+def test_read_parquet_to_pandas_2(dataframe_schema):
+    """
+    Testing that streaming a parquet file in batches returns schema conformant batches matching a full read
+    """
+    # Arrange
+    parquet_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_parquet.parquet")
+    expected = read_parquet_to_pandas(parquet_path, convert_schema_pandas(dict(dataframe_schema)))
+
+    # Act
+    result = list(read_parquet_to_pandas(parquet_path, convert_schema_pandas(dict(dataframe_schema)), batch_size=2))
+
+    # Assert
+    assert [len(batch) for batch in result] == [2, 1]
+    assert pd.concat(result, ignore_index=True).equals(expected)
+
+
+def test_read_csv_to_pandas_3(tmp_path):
+    """
+    Testing that invalid dates and null strings are coerced to null by the arrow csv reader
+    """
+    # Arrange
+    csv_path = os.path.join(tmp_path, "invalid_dates.csv")
+    with open(csv_path, 'w') as file:
+        file.write("date_column,string_column\n2024-01-31,test\n2024-13-40,nan\n,\n")
+    schema = convert_schema_pandas({"date_column": 'date', "string_column": 'string'})
+
+    # Act
+    result = read_csv_to_pandas(csv_path, schema)
+
+    # Assert
+    assert result['date_column'].tolist()[0] == pd.Timestamp("2024-01-31")
+    assert result['date_column'].isna().tolist() == [False, True, True]
+    assert result['string_column'].isna().tolist() == [False, True, True]
+    assert {k: v.name for k, v in result.dtypes.to_dict().items()} == schema
+
+
+def test_read_csv_to_pandas_7(tmp_path, caplog):
+    """
+    Testing that invalid values in columns other than dates are raised without falling back to parsing dates again
+    """
+    # Arrange
+    csv_path = os.path.join(tmp_path, "invalid_numbers.csv")
+    with open(csv_path, 'w') as file:
+        file.write("date_column,float_column\n2024-01-31,1.5\n2024-02-01,abc\n")
+    schema = convert_schema_pandas({"date_column": 'date', "float_column": 'float'})
+
+    # Act & Assert
+    with pytest.raises(pa.ArrowInvalid, match="abc"):
+        read_csv_to_pandas(csv_path, schema)
+    assert "Dates could not be parsed" not in caplog.text
+
+
+@pytest.mark.parametrize("batch_size", [None, 2])
+def test_read_csv_to_pandas_6(tmp_path, batch_size):
+    """
+    Testing that the tokens pandas reads as null by default are read as null in numeric and string columns
+    """
+    # Arrange
+    tokens = ["NA", "N/A", "NULL", "null", "#N/A", "None", "n/a", "<NA>"]
+    csv_path = os.path.join(tmp_path, "null_tokens.csv")
+    with open(csv_path, 'w') as file:
+        file.write("float_column,string_column\n1.5,test\n" + "".join(f"{val},{val}\n" for val in tokens))
+    schema = convert_schema_pandas({"float_column": 'float', "string_column": 'string'})
+
+    # Act
+    result = read_csv_to_pandas(csv_path, schema, batch_size=batch_size)
+    result = result if batch_size is None else pd.concat(result, ignore_index=True)
+
+    # Assert
+    assert result['float_column'].isna().tolist() == [False] + [True] * len(tokens)
+    assert result['string_column'].isna().tolist() == [False] + [True] * len(tokens)
+    assert result['float_column'].iloc[0] == 1.5
+
+
+def test_parse_filter_expression_1():
+    """
+    Testing that filter expressions are converted into arrow expressions with values cast to the column datatypes
+    """
+    # Arrange
+    table = pa.table({"year": pa.array([2023, 2024, 2025], pa.int32()),
+                      "period_date": pa.array([0, 1706659200, 1738281600], pa.timestamp('s'))})
+
+    # Act
+    result = [table.filter(parse_filter_expression(expression, table.schema)).num_rows for expression in
+              ["year == 2024", "2023 < year", "year in [2023, 2025]", "not year != 2024",
+               "period_date >= '2024-01-31' and year <= 2024", "year == 2023 or year == 2025"]]
+
+    # Assert
+    assert result == [1, 2, 2, 1, 1, 2]
+
+
+def test_parse_filter_expression_2():
+    """
+    Testing that filters on columns missing from the dataset raise an error
+    """
+    # Arrange
+    schema = pa.schema([("year", pa.int64())])
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="missing_column"):
+        parse_filter_expression("missing_column == 1", schema)
+
+
+@pytest.mark.parametrize("batch_size", [None, 1])
+def test_read_csv_to_pandas_4(dataframe_schema, batch_size):
+    """
+    Testing that filters are applied to csv files as they are read, both when loading and streaming
+    """
+    # Arrange
+    csv_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+    schema = convert_schema_pandas(dict(dataframe_schema))
+
+    # Act
+    result = read_csv_to_pandas(csv_path, schema, batch_size=batch_size, filters="date_column_1 < '2000-01-01'")
+    result = result if batch_size is None else pd.concat(list(result), ignore_index=True)
+
+    # Assert
+    assert result['integer_column_3'].tolist() == [1, 3]
+
+
+def test_read_parquet_to_pandas_3(dataframe_schema):
+    """
+    Testing that filters are pushed into the parquet reader
+    """
+    # Arrange
+    parquet_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_parquet.parquet")
+    schema = convert_schema_pandas(dict(dataframe_schema))
+
+    # Act
+    result = read_parquet_to_pandas(parquet_path, schema, filters="integer_column_3 in [2, 3]")
+
+    # Assert
+    assert result['integer_column_3'].tolist() == [2, 3]
+
+
+def test_convert_schema_pandas_2(schema):
+    # Act
+    result = convert_schema_pandas(schema, dtype_backend='pyarrow')
+
+    # Assert
+    expected = {"column_1": pd.ArrowDtype(pa.float64()), "column_2": pd.ArrowDtype(pa.string()),
+                "column_3": pd.ArrowDtype(pa.int64()), "column_4": pd.ArrowDtype(pa.timestamp('s'))}
+    assert result == expected
+
+
+def test_schema_conformance_pandas_4(dataframe_schema):
+    """
+    Testing that arrow backed data read with the pyarrow backend conforms with the schema
+    """
+    # Arrange
+    csv_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+    data = read_csv_to_pandas(csv_path, convert_schema_pandas(dict(dataframe_schema), dtype_backend='pyarrow'))
+
+    # Act
+    result = schema_conformance_pandas(data, convert_schema_output_pandas(dict(dataframe_schema), 'pyarrow'))
+    numpy_result = schema_conformance_pandas(data, convert_schema_output_pandas(dict(dataframe_schema)))
+
+    # Assert
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in data.dtypes)
+    assert result['incorrect_type'] == []
+    assert numpy_result['incorrect_type'] == []
+
+
+def test_write_csv_from_pandas_1(dataframe_schema, tmp_path):
+    """
+    Testing that arrow backed dates are written as dates and read back unchanged
+    """
+    # Arrange
+    csv_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+    output_path = os.path.join(tmp_path, "output.csv")
+    data = read_csv_to_pandas(csv_path, convert_schema_pandas(dict(dataframe_schema), dtype_backend='pyarrow'))
+
+    # Act
+    write_csv_from_pandas(data, output_path, dataframe_schema)
+    result = read_csv_to_pandas(output_path, convert_schema_pandas(dict(dataframe_schema), dtype_backend='pyarrow'))
+
+    # Assert
+    assert result.equals(data)
+
+
+def test_write_csv_from_pandas_2(tmp_path):
+    """
+    Testing that csv values are written unquoted, as pandas writes them, unless they contain a separator or quote
+    """
+    # Arrange
+    schema = {"customer_id": 'integer', "name": 'string'}
+    plain_path = os.path.join(tmp_path, "plain.csv")
+    quoted_path = os.path.join(tmp_path, "quoted.csv")
+    plain_data = pd.DataFrame({"customer_id": [1, 2], "name": ["a", None]})
+    quoted_data = pd.DataFrame({"customer_id": [1, 2], "name": ["a, b", 'c "d"']})
+
+    # Act
+    write_csv_from_pandas(plain_data, plain_path, schema)
+    write_csv_from_pandas(quoted_data, quoted_path, schema)
+    result = read_csv_to_pandas(quoted_path, convert_schema_pandas(dict(schema)))
+
+    # Assert
+    with open(plain_path) as file:
+        assert file.read() == plain_data.to_csv(index=False, lineterminator='\n')
+    with open(quoted_path) as file:
+        assert file.read() == 'customer_id,name\n1,"a, b"\n2,"c ""d"""\n'
+    assert result['name'].tolist() == quoted_data['name'].tolist()
+
+
+def test_convert_schema_pandas_3():
+    # Arrange
+    schema = {"column_1": "category", "column_2": {"type": "category", "values": ["stage_1", "stage_2"]}}
+
+    # Act
+    result = convert_schema_pandas(dict(schema))
+    arrow_result = convert_schema_pandas(dict(schema), dtype_backend='pyarrow')
+
+    # Assert
+    expected = {"column_1": pd.CategoricalDtype(), "column_2": pd.CategoricalDtype(["stage_1", "stage_2"])}
+    assert result == expected
+    assert arrow_result == expected
+    assert convert_schema_arrow(schema) == pa.schema([("column_1", pa.dictionary(pa.int32(), pa.string())),
+                                                      ("column_2", pa.dictionary(pa.int32(), pa.string()))])
+
+
+@pytest.mark.parametrize("dtype_backend", ['numpy_nullable', 'pyarrow'])
+def test_read_csv_to_pandas_5(tmp_path, dtype_backend):
+    """
+    Testing that category columns are read as categoricals, filtered on their values and round-tripped through parquet
+    """
+    # Arrange
+    csv_path = os.path.join(tmp_path, "categories.csv")
+    parquet_path = os.path.join(tmp_path, "categories.parquet")
+    with open(csv_path, 'w') as file:
+        file.write("stage,balance\nstage_1,1.5\nstage_2,2.5\n,3.5\nstage_1,4.5\n")
+    schema = {"stage": {"type": "category", "values": ["stage_1", "stage_2"]}, "balance": 'float'}
+
+    # Act
+    result = read_csv_to_pandas(csv_path, convert_schema_pandas(dict(schema), dtype_backend))
+    filtered = read_csv_to_pandas(csv_path, convert_schema_pandas(dict(schema), dtype_backend),
+                                  filters="stage == 'stage_1'")
+    result.to_parquet(parquet_path, index=False)
+    round_trip = read_parquet_to_pandas(parquet_path, convert_schema_pandas(dict(schema), dtype_backend))
+
+    # Assert
+    assert result['stage'].dtype == pd.CategoricalDtype(["stage_1", "stage_2"])
+    assert result['stage'].isna().tolist() == [False, False, True, False]
+    assert filtered['balance'].tolist() == [1.5, 4.5]
+    assert pa.types.is_dictionary(open_parquet_dataset(parquet_path).schema.field("stage").type)
+    assert round_trip.equals(result)
+
+
+def test_schema_conformance_pandas_5(caplog):
+    """
+    Testing that undeclared category values are set to null when enforced and reported by the conformance check
+    """
+    # Arrange
+    schema = {"stage": {"type": "category", "values": ["stage_1", "stage_2"]}}
+    data = pd.DataFrame({"stage": ["stage_1", "stage_3"]}).astype('category')
+
+    # Act
+    result = schema_conformance_pandas(data, convert_schema_output_pandas(dict(schema)))
+    enforced = enforce_data_types(data.copy(), convert_schema_pandas(dict(schema)))
+
+    # Assert
+    assert result['incorrect_type'] == []
+    assert result['incorrect_values'] == ["Dataframe  has values in stage which are not declared in the schema: "
+                                          "['stage_3']."]
+    assert enforced['stage'].isna().tolist() == [False, True]
+    assert "['stage_3']" in caplog.text
+
+
+def test_schema_conformance_pandas_6(dataframe, dataframe_schema, caplog):
+    """
+    Testing that the columns with the correct type are logged as a single record however wide the dataset is
+    """
+    # Arrange
+    caplog.set_level(logging.INFO)
+    dataframe_schema = convert_schema_output_pandas(dataframe_schema)
+
+    # Act
+    result = schema_conformance_pandas(dataframe, dataframe_schema, "wide_data")
+
+    # Assert
+    records = [record for record in caplog.records if "with correct type" in record.getMessage()]
+    assert result['incorrect_type'] == []
+    assert len(records) == 1
+    assert f"wide_data has {len(dataframe.columns)} columns with correct type" in records[0].getMessage()
+
+
+def test_convert_schema_pandas_4():
+    # Arrange
+    schema = {"column_1": "float32", "column_2": "int16", "column_3": "int32", "column_4": "bool"}
+
+    # Act
+    result = convert_schema_pandas(dict(schema))
+    output_result = convert_schema_output_pandas(dict(schema))
+
+    # Assert
+    assert result == {"column_1": pd.Float32Dtype(), "column_2": pd.Int16Dtype(), "column_3": pd.Int32Dtype(),
+                      "column_4": pd.BooleanDtype()}
+    assert output_result == {"column_1": 'Float32', "column_2": 'Int16', "column_3": 'Int32', "column_4": 'boolean'}
+
+
+@pytest.mark.parametrize("dtype_backend", ['numpy_nullable', 'pyarrow'])
+def test_downcast_data_types_1(dtype_backend):
+    """
+    Testing that numeric columns are downcast to the smallest lossless datatype of the same backend
+    """
+    # Arrange
+    schema = convert_schema_pandas({"year": 'integer', "balance": 'integer', "ratio": 'float', "weight": 'float'},
+                                   dtype_backend)
+    data = pd.DataFrame({"year": [2024, None], "balance": [1, 2 ** 40], "ratio": [0.1, 0.2],
+                         "weight": [0.5, 0.25]}).astype(schema)
+    size = data.memory_usage(index=False).sum()
+
+    # Act
+    result = downcast_data_types(data)
+
+    # Assert
+    expected = convert_schema_pandas({"year": 'int16', "balance": 'integer', "ratio": 'float', "weight": 'float32'},
+                                     dtype_backend)
+    assert result.dtypes.to_dict() == expected
+    assert result['year'].isna().tolist() == [False, True]
+    assert result.attrs['downcast_bytes_saved'] == size - result.memory_usage(index=False).sum()
+
+
+def test_write_parquet_from_pandas_1(dataframe_schema, tmp_path):
+    """
+    Testing that partitioned parquet output is read back unchanged, with partition filters pruning directories
+    """
+    # Arrange
+    csv_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+    output_path = os.path.join(tmp_path, "output.parquet")
+    schema = convert_schema_pandas(dict(dataframe_schema))
+    data = read_csv_to_pandas(csv_path, schema)
+
+    # Act
+    write_parquet_from_pandas(data, output_path, dataframe_schema, partition_cols=["date_column_1"],
+                              compression='zstd')
+    result = read_parquet_to_pandas(output_path, schema)
+    filtered = read_parquet_to_pandas(output_path, schema, filters="date_column_1 < '2000-01-01'")
+
+    # Assert
+    assert len(os.listdir(output_path)) == data['date_column_1'].nunique()
+    assert result.sort_values('integer_column_3', ignore_index=True).equals(data)
+    assert sorted(filtered['integer_column_3'].tolist()) == [1, 3]
+
+
+def test_write_parquet_from_pandas_2(dataframe_schema, tmp_path):
+    """
+    Testing that the target file size splits the output into several files and replaces any previous output
+    """
+    # Arrange
+    parquet_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_parquet.parquet")
+    output_path = os.path.join(tmp_path, "output.parquet")
+    schema = convert_schema_pandas(dict(dataframe_schema))
+    data = read_parquet_to_pandas(parquet_path, schema)
+
+    # Act
+    write_parquet_from_pandas(data, output_path, dataframe_schema, partition_cols=["integer_column_3"])
+    write_parquet_from_pandas(data, output_path, dataframe_schema, compression='none', target_file_size=1)
+    result = read_parquet_to_pandas(output_path, schema)
+
+    # Assert
+    assert len(os.listdir(output_path)) == len(data)
+    assert result.sort_values('integer_column_3', ignore_index=True).equals(data)
+
+
+def test_write_parquet_from_pandas_3(dataframe_schema, dataframe, tmp_path):
+    # Act & Assert
+    with pytest.raises(ValueError, match="brotli"):
+        write_parquet_from_pandas(dataframe, os.path.join(tmp_path, "output.parquet"), dataframe_schema,
+                                  compression='brotli')
@@ -0,0 +1,164 @@
+import os
+import tempfile
+import zipfile
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("duckdb")
+
+from src.config import PY_ROOT_DIR
+from src.framework.setup.duckdb_engine import DuckDBEngine
+from src.framework.setup.read_write_data import (convert_schema_duckdb, convert_schema_pandas, read_csv_to_duckdb,
+                                                 read_csv_to_pandas, read_parquet_to_duckdb, read_parquet_to_pandas,
+                                                 schema_conformance_duckdb, write_parquet_from_pandas)
+from src.framework.setup.write_data import StreamWriteCSV
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    # Arrange
+    engine = DuckDBEngine(memory_limit="256MB", temp_directory=os.path.join(tmp_path, "spill"), threads=2,
+                          batch_size=3)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def csv_path():
+    # Arrange
+    return os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+            "string_column_3": 'string', "date_column_1": 'date', "date_column_2": 'date'}
+
+
+"""
+Unit tests for the duckdb methods contained within the src.framework.setup.read_write_data module
+"""
+
+
+def test_duckdb_engine_1(engine, tmp_path):
+    """
+    Testing that the engine is configured with the passed memory limit and spill directory
+    """
+    # Assert
+    assert engine.setting('temp_directory') == os.path.join(tmp_path, "spill")
+    assert engine.setting('threads') == 2
+    assert os.path.isdir(os.path.join(tmp_path, "spill"))
+
+
+def test_read_csv_to_duckdb_1(engine, csv_path, file_schema):
+    """
+    Testing that a csv is read into duckdb with the same values and nulls as the pandas reader
+    """
+    # Act
+    data = read_csv_to_duckdb(engine.connection, csv_path, file_schema)
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+
+    # Assert
+    assert data.columns == list(file_schema.keys())
+    assert schema_conformance_duckdb(data, convert_schema_duckdb(file_schema)) == {'incorrect_type': [],
+                                                                                   'incorrect_values': []}
+    actual = data.df()
+    assert len(actual) == len(expected)
+    for col in file_schema:
+        assert actual[col].isna().sum() == expected[col].isna().sum()
+
+
+def test_read_csv_to_duckdb_2(engine, csv_path, file_schema):
+    """
+    Testing that filter expressions give the same rows as the pandas reader
+    """
+    # Arrange
+    filters = "integer_column_1 in [1, 2, 3] and date_column_1 >= '2000-01-01' or string_column_3 == 'test'"
+
+    # Act
+    data = read_csv_to_duckdb(engine.connection, csv_path, file_schema, filters=filters)
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema), filters=filters)
+
+    # Assert
+    assert sorted(data.df()['integer_column_1'].tolist()) == sorted(expected['integer_column_1'].tolist())
+
+
+def test_read_csv_to_duckdb_3(engine, csv_path, file_schema, tmp_path, monkeypatch):
+    """
+    Testing that a zipped csv is read into a duckdb table and its extracted csv is removed once read
+    """
+    # Arrange
+    zip_path = os.path.join(tmp_path, "test_csv.zip")
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.write(csv_path, "test_csv.csv")
+    os.makedirs(os.path.join(tmp_path, "temp"))
+    monkeypatch.setattr(tempfile, 'tempdir', os.path.join(tmp_path, "temp"))
+
+    # Act
+    data = read_csv_to_duckdb(engine.connection, zip_path, file_schema)
+
+    # Assert
+    assert os.listdir(os.path.join(tmp_path, "temp")) == []
+    assert data.df().equals(read_csv_to_duckdb(engine.connection, csv_path, file_schema).df())
+
+
+def test_read_parquet_to_duckdb_1(engine, csv_path, file_schema, tmp_path):
+    """
+    Testing that partitioned parquet is read into duckdb with its partition columns
+    """
+    # Arrange
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+    path = os.path.join(tmp_path, "input.parquet")
+    write_parquet_from_pandas(expected, path, file_schema, partition_cols=["string_column_2"])
+
+    # Act
+    data = read_parquet_to_duckdb(engine.connection, path, file_schema)
+
+    # Assert
+    assert data.columns == list(file_schema.keys())
+    assert len(data.df()) == len(expected)
+
+
+def test_schema_conformance_duckdb_1(engine, csv_path, file_schema):
+    """
+    Testing that incorrect datatypes in a query are found without running the query
+    """
+    # Arrange
+    engine.create_view("data", read_csv_to_duckdb(engine.connection, csv_path, file_schema))
+    data = engine.sql("SELECT * REPLACE (CAST(integer_column_1 AS DOUBLE) AS integer_column_1) FROM data")
+
+    # Act
+    errors = schema_conformance_duckdb(data, convert_schema_duckdb(file_schema), dataframe_name="data")
+
+    # Assert
+    assert errors['incorrect_type'] == ["Dataframe data has incorrect datatype in integer_column_1 expected BIGINT got "
+                                        "DOUBLE."]
+
+
+def test_write_from_duckdb_1(engine, csv_path, file_schema, tmp_path):
+    """
+    Testing that a join of a file and a registered pandas dataframe is streamed in batches to a csv which the pandas
+    reader reads back unchanged
+    """
+    # Arrange
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+    engine.create_view("file_data", read_csv_to_duckdb(engine.connection, csv_path, file_schema))
+    engine.register("memory_data", pd.DataFrame({'integer_column_1': expected['integer_column_1'].dropna()}))
+    data = engine.sql("SELECT file_data.* FROM file_data SEMI JOIN memory_data USING (integer_column_1)")
+    path = os.path.join(tmp_path, "output.csv")
+
+    # Act
+    with StreamWriteCSV(path, file_schema) as writer:
+        for batch in engine.batches(data):
+            writer.write(batch)
+
+    # Assert
+    actual = read_csv_to_pandas(path, convert_schema_pandas(file_schema))
+    assert actual.sort_values("integer_column_1", ignore_index=True).equals(
+        expected.dropna(subset=["integer_column_1"]).sort_values("integer_column_1", ignore_index=True))
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import zipfile
+
+import pytest
+
+pl = pytest.importorskip("polars")
+
+from src.config import PY_ROOT_DIR
+from src.framework.setup.read_write_data import (convert_schema_pandas, convert_schema_polars, read_csv_to_pandas,
+                                                 read_csv_to_polars, read_parquet_to_pandas, read_parquet_to_polars,
+                                                 schema_conformance_polars, write_csv_from_polars,
+                                                 write_parquet_from_polars)
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def csv_path():
+    # Arrange
+    return os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+            "string_column_3": 'string', "date_column_1": 'date', "date_column_2": 'date'}
+
+
+"""
+Unit tests for the polars methods contained within the src.framework.setup.read_write_data module
+"""
+
+
+def test_read_csv_to_polars_1(csv_path, file_schema):
+    """
+    Testing that a csv is scanned lazily into polars with the same values and nulls as the pandas reader
+    """
+    # Act
+    data = read_csv_to_polars(csv_path, file_schema)
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+
+    # Assert
+    assert isinstance(data, pl.LazyFrame)
+    assert schema_conformance_polars(data, convert_schema_polars(file_schema)) == {'incorrect_type': [],
+                                                                                   'incorrect_values': []}
+    actual = data.collect().to_pandas()
+    assert len(actual) == len(expected)
+    for col in file_schema:
+        assert actual[col].isna().sum() == expected[col].isna().sum()
+
+
+def test_read_csv_to_polars_2(csv_path, file_schema):
+    """
+    Testing that filter expressions give the same rows as the pandas reader
+    """
+    # Arrange
+    filters = "integer_column_1 in [1, 2, 3] and date_column_1 >= '2000-01-01' or string_column_3 == 'test'"
+
+    # Act
+    data = read_csv_to_polars(csv_path, file_schema, filters=filters).collect()
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema), filters=filters)
+
+    # Assert
+    assert sorted(data['integer_column_1'].to_list()) == sorted(expected['integer_column_1'].tolist())
+
+
+def test_read_csv_to_polars_3(csv_path, file_schema, tmp_path, monkeypatch):
+    """
+    Testing that a zipped csv is read into polars and its extracted csv is removed once read
+    """
+    # Arrange
+    zip_path = os.path.join(tmp_path, "test_csv.zip")
+    with zipfile.ZipFile(zip_path, 'w') as archive:
+        archive.write(csv_path, "test_csv.csv")
+    os.makedirs(os.path.join(tmp_path, "temp"))
+    monkeypatch.setattr(tempfile, 'tempdir', os.path.join(tmp_path, "temp"))
+
+    # Act
+    data = read_csv_to_polars(zip_path, file_schema)
+
+    # Assert
+    assert isinstance(data, pl.LazyFrame)
+    assert os.listdir(os.path.join(tmp_path, "temp")) == []
+    assert data.collect().equals(read_csv_to_polars(csv_path, file_schema).collect())
+
+
+def test_schema_conformance_polars_1(csv_path, file_schema):
+    """
+    Testing that incorrect datatypes in a lazy query are found without running the query
+    """
+    # Arrange
+    data = read_csv_to_polars(csv_path, file_schema).with_columns(pl.col("integer_column_1").cast(pl.Float64))
+
+    # Act
+    errors = schema_conformance_polars(data, convert_schema_polars(file_schema), dataframe_name="data")
+
+    # Assert
+    assert errors['incorrect_type'] == ["Dataframe data has incorrect datatype in integer_column_1 expected Int64 got "
+                                        "Float64."]
+
+
+def test_write_from_polars_1(csv_path, file_schema, tmp_path):
+    """
+    Testing that polars outputs are saved to csv and partitioned parquet which the pandas readers read back unchanged
+    """
+    # Arrange
+    data = read_csv_to_polars(csv_path, file_schema)
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+
+    # Act
+    write_csv_from_polars(data, os.path.join(tmp_path, "output.csv"), file_schema)
+    write_parquet_from_polars(data, os.path.join(tmp_path, "output.parquet"), file_schema,
+                              partition_cols=["string_column_2"])
+
+    # Assert
+    assert read_csv_to_pandas(os.path.join(tmp_path, "output.csv"), convert_schema_pandas(file_schema)).equals(expected)
+    actual = read_parquet_to_pandas(os.path.join(tmp_path, "output.parquet"), convert_schema_pandas(file_schema))
+    assert len(actual) == len(expected)
+    assert read_parquet_to_polars(os.path.join(tmp_path, "output.parquet"), file_schema).collect().height == len(
+        expected)
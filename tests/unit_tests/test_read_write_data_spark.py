@@ -0,0 +1,131 @@
+import os
+import shutil
+
+import pytest
+
+# Spark tests need both pyspark and a Java runtime
+pytest.importorskip("pyspark")
+if shutil.which("java") is None and "JAVA_HOME" not in os.environ:
+    pytest.skip("Spark tests require a Java runtime.", allow_module_level=True)
+
+from src.config import PY_ROOT_DIR
+from src.framework.setup.read_write_data import (convert_schema_pandas, convert_schema_spark, get_spark_session,
+                                                 read_csv_to_pandas, read_csv_to_spark, read_parquet_to_pandas,
+                                                 read_parquet_to_spark, schema_conformance_spark,
+                                                 write_csv_from_spark, write_parquet_from_spark, write_zip_from_spark)
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture(scope='module')
+def spark():
+    # Arrange
+    return get_spark_session(config={'master': "local[2]", 'shuffle_partitions': 2})
+
+
+@pytest.fixture
+def csv_path():
+    # Arrange
+    return os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+            "string_column_3": 'string', "date_column_1": 'date', "date_column_2": 'date'}
+
+
+"""
+Unit tests for the spark methods contained within the src.framework.setup.read_write_data module
+"""
+
+
+def test_convert_schema_spark_1(file_schema):
+    """
+    Testing that schema datatypes are converted into a spark schema, without changing the schema passed in
+    """
+    # Arrange
+    original = dict(file_schema)
+
+    # Act
+    schema = convert_schema_spark(file_schema)
+
+    # Assert
+    assert file_schema == original
+    assert schema.fieldNames() == list(file_schema.keys())
+    assert [field.dataType.simpleString() for field in schema] == ['bigint', 'double', 'string', 'string', 'date',
+                                                                    'date']
+
+
+def test_read_csv_to_spark_1(spark, csv_path, file_schema):
+    """
+    Testing that a csv is read into spark with the same values and nulls as the pandas reader
+    """
+    # Act
+    data = read_csv_to_spark(csv_path, file_schema)
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+
+    # Assert
+    assert data.columns == list(file_schema.keys())
+    assert schema_conformance_spark(data, convert_schema_spark(file_schema)) == {'incorrect_type': [],
+                                                                                 'incorrect_values': []}
+    actual = data.toPandas()
+    assert len(actual) == len(expected)
+    for col in file_schema:
+        assert actual[col].isna().sum() == expected[col].isna().sum()
+
+
+def test_read_csv_to_spark_2(spark, csv_path, file_schema):
+    """
+    Testing that filter expressions are applied to spark datasets
+    """
+    # Arrange
+    filters = "integer_column_1 in [1, 2] and date_column_1 >= '2000-01-01'"
+
+    # Act
+    data = read_csv_to_spark(csv_path, file_schema, filters=filters)
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema), filters=filters)
+
+    # Assert
+    assert sorted(row.integer_column_1 for row in data.collect()) == sorted(expected['integer_column_1'].tolist())
+
+
+@pytest.mark.parametrize("write, file_name", [(write_csv_from_spark, "output.csv"),
+                                              (write_zip_from_spark, "output.zip")])
+def test_write_csv_from_spark_1(spark, csv_path, file_schema, tmp_path, write, file_name):
+    """
+    Testing that spark datasets are saved as a single csv file which the pandas reader reads back unchanged
+    """
+    # Arrange
+    data = read_csv_to_spark(csv_path, file_schema)
+    path = os.path.join(tmp_path, file_name)
+
+    # Act
+    write(data.repartition(3), path, file_schema)
+
+    # Assert
+    assert os.listdir(tmp_path) == [file_name]
+    actual = read_csv_to_pandas(path, convert_schema_pandas(file_schema))
+    expected = read_csv_to_pandas(csv_path, convert_schema_pandas(file_schema))
+    assert actual.sort_values("integer_column_1", ignore_index=True).equals(
+        expected.sort_values("integer_column_1", ignore_index=True))
+
+
+def test_write_parquet_from_spark_1(spark, csv_path, file_schema, tmp_path):
+    """
+    Testing that partitioned parquet saved from spark is read back by both the spark and pandas readers
+    """
+    # Arrange
+    data = read_csv_to_spark(csv_path, file_schema)
+    path = os.path.join(tmp_path, "output.parquet")
+
+    # Act
+    write_parquet_from_spark(data, path, file_schema, partition_cols=["string_column_2"], compression='zstd')
+
+    # Assert
+    assert "string_column_2=test" in os.listdir(path)
+    assert read_parquet_to_spark(path, file_schema).count() == data.count()
+    assert len(read_parquet_to_pandas(path, convert_schema_pandas(file_schema))) == data.count()
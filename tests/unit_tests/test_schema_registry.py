@@ -0,0 +1,122 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.framework.setup.schema_registry import SchemaRegistry, read_write_data
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+            "date_column_1": 'date'}
+
+
+@pytest.fixture
+def schema_path(tmp_path, file_schema):
+    # Arrange
+    path = os.path.join(tmp_path, "schema.json")
+    with open(path, 'w') as file:
+        json.dump(file_schema, file)
+    return path
+
+
+@pytest.fixture
+def registry():
+    # Arrange
+    registry = SchemaRegistry()
+    registry.clear()
+    return registry
+
+
+"""
+Unit tests for the methods contained within the src.framework.setup.schema_registry.SchemaRegistry class
+"""
+
+
+def test_read_schema_1(registry, schema_path):
+    """
+    Testing that a schema file is compiled once and shared, along with its converted datatypes
+    """
+    # Act
+    schema_1 = registry.read_schema(path=schema_path)
+    schema_2 = registry.read_schema(path=schema_path)
+
+    # Assert
+    assert schema_1 is schema_2
+    assert read_write_data.convert_schema_pandas(schema_1) is read_write_data.convert_schema_pandas(schema_2)
+    assert read_write_data.convert_schema_arrow(schema_1) is read_write_data.convert_schema_arrow(schema_2)
+    assert read_write_data.convert_schema_arrow(schema_1).field("integer_column_1").type == pa.int64()
+
+
+def test_read_schema_2(registry, schema_path, file_schema):
+    """
+    Testing that a schema file is read again once it has been changed
+    """
+    # Arrange
+    schema_1 = registry.read_schema(path=schema_path)
+    with open(schema_path, 'w') as file:
+        json.dump({**file_schema, "new_column": 'string'}, file)
+    os.utime(schema_path, ns=(os.stat(schema_path).st_atime_ns, os.stat(schema_path).st_mtime_ns + 1000000000))
+
+    # Act
+    schema_2 = registry.read_schema(path=schema_path)
+
+    # Assert
+    assert "new_column" not in schema_1
+    assert schema_2["new_column"] == 'string'
+
+
+def test_read_schema_3(registry, schema_path):
+    """
+    Testing that compiled schemas and their converted datatypes cannot be changed
+    """
+    # Arrange
+    schema = registry.read_schema(path=schema_path)
+
+    # Act & Assert
+    with pytest.raises(TypeError):
+        schema["integer_column_1"] = 'string'
+    with pytest.raises(TypeError):
+        read_write_data.convert_schema_pandas(schema)["integer_column_1"] = 'string'
+
+
+def test_read_config_1(registry, tmp_path):
+    """
+    Testing that configs are returned as copies, so changes by a caller do not reach later callers
+    """
+    # Arrange
+    path = os.path.join(tmp_path, "config.yml")
+    with open(path, 'w') as file:
+        file.write("data:\n  data_folder: data\n")
+
+    # Act
+    config_1 = registry.read_config(path=path)
+    config_1['data']['data_folder'] = "changed"
+    config_2 = registry.read_config(path=path)
+
+    # Assert
+    assert config_2 == {'data': {'data_folder': "data"}}
+
+
+def test_convert_schema_pandas_5(file_schema):
+    """
+    Testing that converting a schema does not change the schema passed in
+    """
+    # Arrange
+    original = dict(file_schema)
+
+    # Act
+    schema = read_write_data.convert_schema_pandas(file_schema)
+
+    # Assert
+    assert file_schema == original
+    assert schema["integer_column_1"] == pd.Int64Dtype()
+    assert dict(read_write_data.CompiledSchema(file_schema)) == original
@@ -0,0 +1,115 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pytest
+
+from src.config import PY_ROOT_DIR
+from src.framework.setup.read_write_data import convert_schema_pandas, read_csv_to_pandas, read_parquet_to_pandas
+from src.framework.setup.write_data import StreamWriteCSV, StreamWriteParquet, StreamWriteZip
+
+"""
+Define fixed data to be used across tests
+"""
+
+
+@pytest.fixture
+def file_schema():
+    # Arrange
+    return {"integer_column_1": 'integer', "float_column_1": 'float', "string_column_2": 'string',
+            "date_column_1": 'date', "integer_column_3": 'integer'}
+
+
+@pytest.fixture
+def data(file_schema):
+    # Arrange
+    csv_path = os.path.join(PY_ROOT_DIR, "tests", "unit_tests", "test_data", "test_csv.csv")
+    return read_csv_to_pandas(csv_path, convert_schema_pandas(dict(file_schema)))
+
+
+"""
+Unit tests for the stream writers contained within src.framework.setup.write_data
+"""
+
+
+@pytest.mark.parametrize("writer, file_name, reader", [(StreamWriteCSV, "output.csv", read_csv_to_pandas),
+                                                       (StreamWriteZip, "output.zip", read_csv_to_pandas),
+                                                       (StreamWriteParquet, "output.parquet", read_parquet_to_pandas)])
+def test_stream_write_1(file_schema, data, tmp_path, writer, file_name, reader):
+    """
+    Testing that dataframes and arrow batches written one at a time are read back as the full dataset
+    """
+    # Arrange
+    path = os.path.join(tmp_path, file_name)
+
+    # Act
+    with writer(path, file_schema) as stream:
+        stream.write(data.iloc[:1])
+        stream.write(pa.RecordBatch.from_pandas(data.iloc[1:], preserve_index=False))
+    result = reader(path, convert_schema_pandas(dict(file_schema)))
+
+    # Assert
+    assert result.sort_values('integer_column_3', ignore_index=True).equals(data)
+
+
+@pytest.mark.parametrize("writer, file_name, reader", [(StreamWriteCSV, "output.csv", read_csv_to_pandas),
+                                                       (StreamWriteParquet, "output.parquet", read_parquet_to_pandas)])
+def test_stream_write_2(file_schema, tmp_path, writer, file_name, reader):
+    """
+    Testing that a dataset without any rows is saved with its columns
+    """
+    # Arrange
+    path = os.path.join(tmp_path, file_name)
+
+    # Act
+    writer(path, file_schema).close()
+    result = reader(path, convert_schema_pandas(dict(file_schema)))
+
+    # Assert
+    assert list(result.columns) == list(file_schema.keys())
+    assert len(result) == 0
+
+
+@pytest.mark.parametrize("writer, file_name", [(StreamWriteCSV, "output.csv"), (StreamWriteZip, "output.zip")])
+def test_stream_write_3(tmp_path, writer, file_name):
+    """
+    Testing that csv batches are only quoted when they contain a separator, and are read back unchanged
+    """
+    # Arrange
+    schema = {"customer_id": 'integer', "name": 'string'}
+    path = os.path.join(tmp_path, file_name)
+    data = pd.DataFrame({"customer_id": [1, 2], "name": ["a", "b, c"]})
+
+    # Act
+    with writer(path, schema) as stream:
+        stream.write(data.iloc[:1])
+        stream.write(data.iloc[1:])
+    result = read_csv_to_pandas(path, convert_schema_pandas(dict(schema)))
+
+    # Assert
+    if writer is StreamWriteCSV:
+        with open(path) as file:
+            assert file.read() == 'customer_id,name\n1,a\n2,"b, c"\n'
+    assert result['name'].tolist() == data['name'].tolist()
+
+
+def test_stream_write_parquet_1(file_schema, data, tmp_path):
+    """
+    Testing that parquet files are rotated at the target file size and partitioned output is written batch by batch
+    """
+    # Arrange
+    path = os.path.join(tmp_path, "output.parquet")
+    partitioned_path = os.path.join(tmp_path, "partitioned.parquet")
+
+    # Act
+    with StreamWriteParquet(path, file_schema, target_file_size=1) as stream:
+        stream.write(data)
+    with StreamWriteParquet(partitioned_path, file_schema, partition_cols=["date_column_1"]) as stream:
+        stream.write(data.iloc[:2])
+        stream.write(data.iloc[2:])
+    result = read_parquet_to_pandas(partitioned_path, convert_schema_pandas(dict(file_schema)))
+
+    # Assert
+    assert sorted(os.listdir(path)) == [f"part-{num}.parquet" for num in range(len(data))]
+    assert len(os.listdir(partitioned_path)) == data['date_column_1'].nunique()
+    assert result.sort_values('integer_column_3', ignore_index=True).equals(data)